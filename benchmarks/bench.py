@@ -0,0 +1,219 @@
+"""
+SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+SPDX-License-Identifier: LGPL-3.0-only
+
+Benchmarks the bindings of the stub Rizin in fixture/ (built
+with -Dbenchmarks=true), and writes the results as JSON
+"""
+
+from typing import List, Dict, Tuple, Union, Optional, cast
+
+import os
+import sys
+import json
+import timeit
+import argparse
+import platform
+import statistics
+
+from startup import time_script
+
+Result = Dict[str, Union[float, int, str]]
+
+# Number of items in the containers of the RzBench
+COUNT = 1000
+
+# Run once, as directors hold on to a plugin slot
+SETUP = f"""
+import array
+import rizin
+
+bench = rizin.RzBench({COUNT})
+item = bench.item
+
+rz_list = bench.list
+rz_vector = bench.vector
+rz_pvector = bench.pvector
+
+buf = bench.buf
+slice_buf = bench.slice
+
+addrs = array.array("Q", range({COUNT}))
+names = ["item"] * {COUNT}
+
+def append_items():
+    items = rizin.RzList_RzBenchItem()
+    for addr, name in zip(addrs, names):
+        item = rizin.RzBenchItem()
+        item.thisown = False
+        item.name = name
+        items.append(item)
+
+class Plugin(rizin.RzBenchPluginDirector):
+    def callback(self, bench, value):
+        return value
+
+builder = rizin.RzBenchPluginBuilder()
+builder.enable_callback = True
+director = Plugin()
+plugin = builder.build(director)
+
+def command(value: int):
+    return True
+
+core = rizin.RzCore()
+core.register_command("b", command)
+"""
+
+# name: script run in a new interpreter
+IMPORT_CASES: Dict[str, str] = {
+    "import.rizin": "import rizin",
+    "import.rizin_star": "from rizin import *",
+}
+
+# name: (statement, operations per statement)
+CASES: Dict[str, Tuple[str, int]] = {
+    "call.method": ("bench.get_value()", 1),
+    "call.pointer_arg": ("bench.item_addr(item)", 1),
+    "call.pointer_arg_contract": ("bench.item_addr_nonnull(item)", 1),
+    "field.get_int": ("bench.value", 1),
+    "field.set_int": ("bench.value = 1", 1),
+    "field.get_ut64": ("bench.addr", 1),
+    "field.get_string": ("bench.name", 1),
+    "field.get_struct": ("bench.item", 1),
+    "field.get_generic": ("bench.list", 1),
+    "iter.RzList": ("for _ in rz_list: pass", COUNT),
+    "iter.RzVector": ("for _ in rz_vector: pass", COUNT),
+    "iter.RzPVector": ("for _ in rz_pvector: pass", COUNT),
+    "to_list.RzList": ("rz_list.to_list()", COUNT),
+    "to_list.RzVector": ("rz_vector.to_list()", COUNT),
+    "to_list.RzPVector": ("rz_pvector.to_list()", COUNT),
+    "slice.RzList": ("rz_list[::2]", COUNT // 2),
+    "fields.RzList": ("[(item.addr, item.name) for item in rz_list]", COUNT),
+    "to_columns.RzList": ("rz_list.to_columns()", COUNT),
+    "memoryview.RzVector": ("rz_vector.memoryview().tolist()", COUNT),
+    "memoryview.RzBuffer": ("buf.memoryview()", 1),
+    "memoryview.RzBuffer_copy": ("slice_buf.memoryview()", 1),
+    "file.RzBuffer_read": ("buf.file().read()", 1),
+    "file.RzBuffer_readinto": ("slice_buf.file().readinto(bytearray(64))", 1),
+    "build.RzList_append": ("append_items()", COUNT),
+    "build.RzList_columns": (
+        "rizin.RzList_RzBenchItem().extend_columns(addr=addrs, name=names)",
+        COUNT,
+    ),
+    "director.callback": (f"bench.call_plugin(plugin, {COUNT})", COUNT),
+    "director.command": (f'core.cmd_repeat("b", {COUNT})', COUNT),
+}
+
+
+def summarize(times: List[float], number: int) -> Result:
+    """
+    Get statistics in nanoseconds per operation
+    """
+    per_op = [time * 1e9 / number for time in times]
+    return {
+        "median_ns": statistics.median(per_op),
+        "min_ns": min(per_op),
+        "mean_ns": statistics.mean(per_op),
+        "stdev_ns": statistics.stdev(per_op) if len(per_op) > 1 else 0.0,
+        "number": number,
+        "rounds": len(per_op),
+    }
+
+
+def measure(
+    statement: str, operations: int, rounds: int, namespace: Dict[str, object]
+) -> Result:
+    """
+    Time a statement, running it enough times per round to take at least 0.2s
+    """
+    try:
+        timer = timeit.Timer(statement, globals=namespace)
+        number, _ = timer.autorange()
+        times = timer.repeat(repeat=rounds, number=number)
+    except Exception as e:  # pylint: disable=broad-except
+        # Cases which are not supported by the bindings being measured
+        return {"error": f"{type(e).__name__}: {e}"}
+
+    return summarize(times, number * operations)
+
+
+def measure_imports(
+    cases: Dict[str, str], bindings_dir: str, runs: int
+) -> Dict[str, Result]:
+    """
+    Time new interpreters importing the bindings, minus interpreter startup
+    """
+    if not cases:
+        return {}
+
+    baseline = statistics.median(time_script("pass", bindings_dir, runs))
+    results = {}
+    for name, script in cases.items():
+        times = time_script(script, bindings_dir, runs)
+        results[name] = summarize([time - baseline for time in times], 1)
+    return results
+
+
+def main() -> None:
+    """
+    Run all benchmarks
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-b",
+        "--bindings-dir",
+        default=".",
+        help="Directory with the built rizin.py and extension module(s)",
+    )
+    parser.add_argument("-o", "--output", help="JSON file, defaults to stdout")
+    parser.add_argument("-r", "--rounds", type=int, default=5)
+    parser.add_argument("--import-runs", type=int, default=10)
+    parser.add_argument(
+        "-k", "--filter", default="", help="Only run benchmarks containing this"
+    )
+    args = parser.parse_args()
+    bindings_dir = os.path.abspath(cast(str, args.bindings_dir))
+    output = cast(Optional[str], args.output)
+    rounds = cast(int, args.rounds)
+    name_filter = cast(str, args.filter)
+
+    sys.path.insert(0, bindings_dir)
+
+    import_cases = {
+        name: script for name, script in IMPORT_CASES.items() if name_filter in name
+    }
+    benchmarks = measure_imports(
+        import_cases, bindings_dir, cast(int, args.import_runs)
+    )
+
+    namespace: Dict[str, object] = {}
+    setup_error: Optional[Result] = None
+    try:
+        exec(SETUP, namespace)  # pylint: disable=exec-used
+    except Exception as e:  # pylint: disable=broad-except
+        setup_error = {"error": f"{type(e).__name__}: {e}"}
+
+    for name, (statement, operations) in CASES.items():
+        if name_filter in name:
+            benchmarks[name] = setup_error or measure(
+                statement, operations, rounds, namespace
+            )
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "split_modules": os.path.exists(os.path.join(bindings_dir, "rizin_util.py")),
+        "count": COUNT,
+        "benchmarks": benchmarks,
+    }
+
+    text = json.dumps(results, indent=1)
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+SPDX-License-Identifier: LGPL-3.0-only
+
+Binding specification of the stub Rizin in include/
+
+The generics mirror those of src/bindings.py, so that
+their generated wrappers are the ones being measured
+"""
+
+from cparser_header import Header
+from binding_header import threaded_header
+from binding_class import Class
+from binding_director import Director
+from binding_enum import Enum, MacroEnum
+from binding_generic import Generic
+
+
+@threaded_header("rz_list.h", module="util")
+def bind_list(list_h: Header) -> None:
+    """
+    RzListIter, RzList
+    """
+    rz_list_iter = Generic(list_h, "RzListIter", pointer=True)
+    rz_list_iter.add_method("rz_list_iter_get_next", rename="next", generic_ret=True)
+    rz_list_iter.add_method("rz_list_iter_get_data", rename="data", generic_ret=True)
+
+    rz_list = Generic(list_h, "RzList", dependencies=[rz_list_iter], pointer=True)
+    rz_list.add_method("rz_list_length", rename="length")
+    rz_list.add_method("rz_list_first", rename="first", generic_ret=True)
+    rz_list.add_method("rz_list_last", rename="last", generic_ret=True)
+    rz_list.add_method("rz_list_iterator", rename="iterator", generic_ret=True)
+    rz_list.add_method(
+        "rz_list_prepend", rename="prepend", generic_ret=True, generic_args={"data"}
+    )
+    rz_list.add_method(
+        "rz_list_append", rename="append", generic_ret=True, generic_args={"data"}
+    )
+
+    rz_list.add_python_method("__len__(self)", "return self.length()")
+    rz_list.set_elements(
+        "rz_list_iterator($self)",
+        "rz_list_length($self)",
+        "RzListIter *iter = (RzListIter *)*cursor;",
+        "*cursor = rz_list_iter_get_next(iter);",
+        "return rz_list_iter_get_data(iter);",
+    )
+    rz_list.set_append("rz_list_append((RzList *)container, element);")
+    rz_list.add_specialization_extension(
+        "RzBenchItem",
+        "RzList_RzBenchItem() {",
+        "    return rz_list_newf((RzListFree)rz_bench_item_free);",
+        "}",
+    )
+
+
+@threaded_header("rz_vector.h", module="util")
+def bind_vector(vector_h: Header) -> None:
+    """
+    RzVector, RzPVector
+    """
+    rz_vector = Generic(vector_h, "RzVector")
+    rz_vector.add_method("rz_vector_len", rename="length")
+    rz_vector.add_method("rz_vector_head", rename="head", generic_ret=True)
+    rz_vector.add_method("rz_vector_tail", rename="tail", generic_ret=True)
+    rz_vector.add_method("rz_vector_index_ptr", rename="at", generic_ret=True)
+    rz_vector.add_method(
+        "rz_vector_push", rename="push", generic_ret=True, generic_args={"x"}
+    )
+
+    rz_vector.add_python_method("__len__(self)", "return self.length()")
+    rz_vector.set_elements(
+        "$self->a",
+        "rz_vector_len($self)",
+        "TYPE *element = (TYPE *)*cursor;",
+        "*cursor = element + 1;",
+        "return element;",
+    )
+    rz_vector.set_buffer("$self->a", "rz_vector_len($self)")
+
+    rz_pvector = Generic(vector_h, "RzPVector", pointer=True)
+    rz_pvector.add_method("rz_pvector_len", rename="length")
+    rz_pvector.add_method("rz_pvector_head", rename="head", generic_ret=True)
+    rz_pvector.add_method("rz_pvector_tail", rename="tail", generic_ret=True)
+    rz_pvector.add_method("rz_pvector_at", rename="at", generic_ret=True)
+    rz_pvector.add_method(
+        "rz_pvector_push", rename="push", generic_ret=True, generic_args={"x"}
+    )
+
+    rz_pvector.add_python_method("__len__(self)", "return self.length()")
+    rz_pvector.set_elements(
+        "$self->v.a",
+        "rz_pvector_len($self)",
+        "void **element = (void **)*cursor;",
+        "*cursor = element + 1;",
+        "return *element;",
+    )
+    rz_pvector.set_append("rz_pvector_push((RzPVector *)container, element);")
+
+
+@threaded_header("rz_util/rz_buf.h", module="util")
+def bind_buf(buf_h: Header) -> None:
+    """
+    RzBuf
+    """
+    rz_buf = Class(buf_h, typedef="RzBuffer")
+    rz_buf.add_prefixed_methods("rz_buf_")
+
+    MacroEnum(buf_h, "RZ_BUF_SET", "RZ_BUF_CUR", "RZ_BUF_END")
+
+
+@threaded_header("rz_util/rz_num.h", module="util")
+def bind_num(num_h: Header) -> None:
+    """
+    RzNum
+    """
+    rz_num = Class(num_h, typedef="RzNum")
+    rz_num.add_prefixed_methods("rz_num_")
+
+
+@threaded_header("rz_bench.h", module="bench")
+def bind_bench(bench_h: Header) -> None:
+    """
+    RzBench
+    """
+    rz_bench = Class(bench_h, typedef="RzBench")
+    rz_bench.add_constructor("rz_bench_new")
+    rz_bench.add_destructor("rz_bench_free")
+    rz_bench.add_prefixed_methods("rz_bench_", release_gil=("rz_bench_call_plugin",))
+
+    Class(bench_h, typedef="RzBenchItem")
+    Director(bench_h, "RzBenchPlugin")
+
+
+@threaded_header("rz_analysis.h", module="core")
+def bind_analysis(analysis_h: Header) -> None:
+    """
+    RzAnalysis, RzAnalysisFunction
+    """
+    rz_analysis = Class(analysis_h, typedef="RzAnalysis")
+    rz_analysis.add_prefixed_methods("rz_analysis_")
+
+    Class(analysis_h, typedef="RzAnalysisFunction")
+
+
+@threaded_header("rz_flag.h", module="core")
+def bind_flag(flag_h: Header) -> None:
+    """
+    RzFlag, RzFlagItem
+    """
+    Class(flag_h, typedef="RzFlagItem")
+
+    rz_flag = Class(flag_h, typedef="RzFlag")
+    rz_flag.add_prefixed_methods("rz_flag_")
+
+
+@threaded_header("rz_cmd.h", module="core")
+def bind_cmd(cmd_h: Header) -> None:
+    """
+    RzCmd
+    """
+    Class(cmd_h, typedef="RzCmd")
+    Class(cmd_h, typedef="RzCmdDescHelp")
+    Class(cmd_h, typedef="RzCmdDescArg")
+    Enum(cmd_h, typedef="RzCmdArgType")
+    Enum(cmd_h, typedef="RzCmdStatus")
+
+
+@threaded_header("rz_core.h", module="core")
+def bind_core(core_h: Header) -> None:
+    """
+    RzCore
+    """
+    rz_core = Class(core_h, typedef="RzCore", struct="rz_core_t")
+    rz_core.add_constructor("rz_core_new")
+    rz_core.add_destructor("rz_core_free")
+    rz_core.add_prefixed_methods("rz_core_", release_gil=("rz_core_cmd",))
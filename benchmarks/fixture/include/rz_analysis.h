@@ -0,0 +1,34 @@
+// SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+// SPDX-License-Identifier: LGPL-3.0-only
+
+#ifndef RZ_ANALYSIS_H
+#define RZ_ANALYSIS_H
+
+#include <rz_types.h>
+#include <rz_list.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+// Used by register_command
+typedef struct rz_analysis_function_t {
+        char *name;
+        ut64 addr;
+} RzAnalysisFunction;
+
+typedef struct rz_analysis_t {
+        RzList /*<RzAnalysisFunction *>*/ *fcns;
+} RzAnalysis;
+
+RZ_API RzAnalysisFunction *rz_analysis_get_function_byname(RzAnalysis *analysis,
+                                                           const char *name);
+RZ_API RzAnalysisFunction *rz_analysis_create_function(RzAnalysis *analysis,
+                                                       const char *name,
+                                                       ut64 addr);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
@@ -0,0 +1,62 @@
+// SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+// SPDX-License-Identifier: LGPL-3.0-only
+
+// Declarations exercising each kind of generated wrapper
+
+#ifndef RZ_BENCH_H
+#define RZ_BENCH_H
+
+#include <rz_types.h>
+#include <rz_list.h>
+#include <rz_vector.h>
+#include <rz_util/rz_buf.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+typedef struct rz_bench_item_t {
+        ut64 addr;
+        char *name;
+} RzBenchItem;
+
+typedef struct rz_bench_t {
+        int value;
+        ut64 addr;
+        char *name;
+        RzBenchItem *item;
+        RzList /*<RzBenchItem *>*/ *list;
+        RzVector /*<ut64>*/ *vector;
+        RzPVector /*<RzBenchItem *>*/ *pvector;
+        RzBuffer *buf; // 16 bytes per item
+        RzBuffer *slice; // All of buf, without direct access to its bytes
+} RzBench;
+
+typedef struct rz_bench_plugin_t {
+        int priority;
+        int (*callback)(RzBench *bench, int value);
+} RzBenchPlugin;
+
+/**
+ * Create a bench with count items in each container
+ */
+RZ_API RZ_OWN RzBench *rz_bench_new(int count);
+RZ_API void rz_bench_free(RzBench *bench);
+RZ_API void rz_bench_item_free(RzBenchItem *item);
+
+RZ_API int rz_bench_get_value(RZ_NONNULL RzBench *bench);
+RZ_API ut64 rz_bench_item_addr(RZ_NONNULL RzBench *bench, RzBenchItem *item);
+RZ_API ut64 rz_bench_item_addr_nonnull(RZ_NONNULL RzBench *bench,
+                                       RZ_NONNULL RzBenchItem *item);
+
+/**
+ * Call plugin->callback count times, returning the sum of the results
+ */
+RZ_API int rz_bench_call_plugin(RZ_NONNULL RzBench *bench,
+                                RZ_NONNULL RzBenchPlugin *plugin, int count);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
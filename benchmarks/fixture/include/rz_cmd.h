@@ -0,0 +1,97 @@
+// SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+// SPDX-License-Identifier: LGPL-3.0-only
+
+#ifndef RZ_CMD_H
+#define RZ_CMD_H
+
+#include <rz_types.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+struct rz_core_t;
+
+typedef enum {
+        RZ_CMD_STATUS_OK = 0,
+        RZ_CMD_STATUS_WRONG_ARGS,
+        RZ_CMD_STATUS_ERROR,
+        RZ_CMD_STATUS_INVALID,
+} RzCmdStatus;
+
+typedef enum {
+        RZ_CMD_ARG_TYPE_STRING,
+        RZ_CMD_ARG_TYPE_RZNUM,
+        RZ_CMD_ARG_TYPE_NUM,
+        RZ_CMD_ARG_TYPE_FILE,
+        RZ_CMD_ARG_TYPE_FLAG,
+        RZ_CMD_ARG_TYPE_FCN,
+} RzCmdArgType;
+
+typedef enum {
+        RZ_CMD_DESC_TYPE_ARGV = 0,
+        RZ_CMD_DESC_TYPE_GROUP,
+} RzCmdDescType;
+
+typedef RzCmdStatus (*RzCmdArgvCb)(struct rz_core_t *core, int argc,
+                                   const char **argv);
+
+typedef struct rz_cmd_desc_detail_t {
+        const char *name;
+} RzCmdDescDetail;
+
+typedef struct rz_cmd_desc_arg_t {
+        const char *name;
+        const char *default_value;
+        RzCmdArgType type;
+} RzCmdDescArg;
+
+typedef struct rz_cmd_desc_help_t {
+        const char *summary;
+        const char *description;
+        const char *args_str;
+        const char *usage;
+        const char *options;
+        const RzCmdDescDetail *details;
+        const RzCmdDescArg *args;
+} RzCmdDescHelp;
+
+typedef struct rz_cmd_desc_t {
+        RzCmdDescType type;
+        char *name;
+        struct rz_cmd_desc_t *parent;
+        const RzCmdDescHelp *help;
+        RzCmdArgvCb cb;
+} RzCmdDesc;
+
+// Linear lookup table, in place of the hashtable of Rizin
+typedef struct ht_sp_t {
+        const char **keys;
+        void **values;
+        size_t count;
+        size_t capacity;
+} HtSP;
+
+typedef struct rz_cmd_t {
+        HtSP *ht_cmds;
+        RzCmdDesc *root_cmd_desc;
+} RzCmd;
+
+RZ_API void *ht_sp_find(HtSP *ht, const char *key, bool *found);
+
+RZ_API RzCmdDesc *rz_cmd_get_root(RzCmd *cmd);
+RZ_API RzCmdDesc *rz_cmd_desc_argv_new(RzCmd *cmd, RzCmdDesc *parent,
+                                       const char *name, RzCmdArgvCb cb,
+                                       const RzCmdDescHelp *help);
+RZ_API RzCmdDesc *rz_cmd_desc_group_new(RzCmd *cmd, RzCmdDesc *parent,
+                                        const char *name, RzCmdArgvCb cb,
+                                        const RzCmdDescHelp *help,
+                                        const RzCmdDescHelp *group_help);
+RZ_API bool rz_cmd_desc_remove(RzCmd *cmd, RzCmdDesc *cd);
+RZ_API void rz_cmd_desc_details_free(RzCmdDescDetail *details);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
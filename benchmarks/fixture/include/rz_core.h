@@ -0,0 +1,37 @@
+// SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+// SPDX-License-Identifier: LGPL-3.0-only
+
+#ifndef RZ_CORE_H
+#define RZ_CORE_H
+
+#include <rz_types.h>
+#include <rz_cmd.h>
+#include <rz_flag.h>
+#include <rz_analysis.h>
+#include <rz_util/rz_num.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+typedef struct rz_core_t {
+        RzCmd *rcmd;
+        RzNum *num;
+        RzFlag *flags;
+        RzAnalysis *analysis;
+} RzCore;
+
+RZ_API RzCore *rz_core_new(void);
+RZ_API void rz_core_free(RzCore *core);
+
+/**
+ * Run a command count times with a single "1" argument
+ */
+RZ_API RzCmdStatus rz_core_cmd_repeat(RzCore *core, const char *name,
+                                      int count);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
@@ -0,0 +1,31 @@
+// SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+// SPDX-License-Identifier: LGPL-3.0-only
+
+#ifndef RZ_FLAG_H
+#define RZ_FLAG_H
+
+#include <rz_types.h>
+#include <rz_list.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+// Used by register_command
+typedef struct rz_flag_item_t {
+        char *name;
+        ut64 offset;
+} RzFlagItem;
+
+typedef struct rz_flag_t {
+        RzList /*<RzFlagItem *>*/ *flags;
+} RzFlag;
+
+RZ_API RzFlagItem *rz_flag_get(RzFlag *f, const char *name);
+RZ_API RzFlagItem *rz_flag_set(RzFlag *f, const char *name, ut64 addr);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
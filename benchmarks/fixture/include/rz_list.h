@@ -0,0 +1,43 @@
+// SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+// SPDX-License-Identifier: LGPL-3.0-only
+
+#ifndef RZ_LIST_H
+#define RZ_LIST_H
+
+#include <rz_types.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+typedef void (*RzListFree)(void *ptr);
+
+typedef struct rz_list_iter_t {
+        void *data;
+        struct rz_list_iter_t *n, *p;
+} RzListIter;
+
+typedef struct rz_list_t {
+        RzListIter *head;
+        RzListIter *tail;
+        RzListFree free;
+        ut32 length;
+} RzList;
+
+RZ_API RZ_OWN RzList *rz_list_new(void);
+RZ_API RZ_OWN RzList *rz_list_newf(RzListFree f);
+RZ_API void rz_list_free(RzList *list);
+RZ_API ut32 rz_list_length(RZ_NONNULL const RzList *list);
+RZ_API void *rz_list_first(RZ_NONNULL const RzList *list);
+RZ_API void *rz_list_last(RZ_NONNULL const RzList *list);
+RZ_API RzListIter *rz_list_iterator(const RzList *list);
+RZ_API RzListIter *rz_list_iter_get_next(RzListIter *list);
+RZ_API void *rz_list_iter_get_data(RzListIter *list);
+RZ_API RZ_BORROW RzListIter *rz_list_append(RZ_NONNULL RzList *list, void *data);
+RZ_API RZ_BORROW RzListIter *rz_list_prepend(RZ_NONNULL RzList *list, void *data);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
@@ -0,0 +1,39 @@
+// SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+// SPDX-License-Identifier: LGPL-3.0-only
+
+// Stub of the Rizin declarations used by the benchmark fixture
+
+#ifndef RZ_TYPES_H
+#define RZ_TYPES_H
+
+#include <stdbool.h>
+#include <stddef.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+#ifdef RZ_BINDINGS
+#define RZ_API __attribute__((annotate("RZ_API")))
+#define RZ_NONNULL __attribute__((annotate("RZ_NONNULL")))
+#define RZ_NULLABLE __attribute__((annotate("RZ_NULLABLE")))
+#define RZ_OWN __attribute__((annotate("RZ_OWN")))
+#define RZ_BORROW __attribute__((annotate("RZ_BORROW")))
+#else
+#define RZ_API
+#define RZ_NONNULL
+#define RZ_NULLABLE
+#define RZ_OWN
+#define RZ_BORROW
+#endif
+
+typedef unsigned char ut8;
+typedef unsigned int ut32;
+typedef unsigned long long ut64;
+typedef long long st64;
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
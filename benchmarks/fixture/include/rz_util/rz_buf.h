@@ -0,0 +1,48 @@
+// SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+// SPDX-License-Identifier: LGPL-3.0-only
+
+#ifndef RZ_BUF_H
+#define RZ_BUF_H
+
+#include <rz_types.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+#define RZ_BUF_SET 0
+#define RZ_BUF_CUR 1
+#define RZ_BUF_END 2
+
+typedef struct rz_buf_t RzBuffer;
+
+typedef struct rz_buffer_methods_t {
+        st64 (*read)(RzBuffer *b, ut8 *buf, ut64 len);
+        ut64 (*get_size)(RzBuffer *b);
+        st64 (*seek)(RzBuffer *b, st64 addr, int whence);
+        ut8 *(*get_whole_buf)(RzBuffer *b, ut64 *size);
+} RzBufferMethods;
+
+struct rz_buf_t {
+        const RzBufferMethods *methods;
+        void *priv;
+        ut8 *whole_buf;
+};
+
+RZ_API RZ_OWN RzBuffer *rz_buf_new_with_bytes(RZ_NULLABLE const ut8 *bytes,
+                                              ut64 len);
+RZ_API RZ_OWN RzBuffer *rz_buf_new_slice(RzBuffer *b, ut64 offset, ut64 size);
+RZ_API void rz_buf_free(RzBuffer *b);
+RZ_API ut64 rz_buf_size(RZ_NONNULL RzBuffer *b);
+RZ_API st64 rz_buf_seek(RZ_NONNULL RzBuffer *b, st64 addr, int whence);
+RZ_API st64 rz_buf_read(RZ_NONNULL RzBuffer *b, RZ_NONNULL ut8 *buf, ut64 len);
+RZ_API st64 rz_buf_read_at(RZ_NONNULL RzBuffer *b, ut64 addr,
+                           RZ_NONNULL ut8 *buf, ut64 len);
+RZ_API RZ_BORROW const ut8 *rz_buf_data(RZ_NONNULL RzBuffer *b,
+                                        RZ_NONNULL ut64 *size);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
@@ -0,0 +1,24 @@
+// SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+// SPDX-License-Identifier: LGPL-3.0-only
+
+#ifndef RZ_NUM_H
+#define RZ_NUM_H
+
+#include <rz_types.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+typedef struct rz_num_t {
+        ut64 value; // Result of the last rz_num_math
+} RzNum;
+
+RZ_API bool rz_num_is_valid_input(RzNum *num, const char *input_value);
+RZ_API ut64 rz_num_math(RzNum *num, const char *str);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
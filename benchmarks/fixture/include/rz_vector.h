@@ -0,0 +1,49 @@
+// SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+// SPDX-License-Identifier: LGPL-3.0-only
+
+#ifndef RZ_VECTOR_H
+#define RZ_VECTOR_H
+
+#include <rz_types.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+typedef void (*RzVectorFree)(void *e, void *user);
+typedef void (*RzPVectorFree)(void *e);
+
+typedef struct rz_vector_t {
+        void *a;
+        size_t len;
+        size_t capacity;
+        size_t elem_size;
+        RzVectorFree free;
+        void *free_user;
+} RzVector;
+
+typedef struct rz_pvector_t {
+        RzVector v;
+} RzPVector;
+
+RZ_API RzVector *rz_vector_new(size_t elem_size, RzVectorFree free, void *free_user);
+RZ_API void rz_vector_free(RzVector *vec);
+RZ_API size_t rz_vector_len(RZ_NONNULL const RzVector *vec);
+RZ_API void *rz_vector_head(RZ_NONNULL RzVector *vec);
+RZ_API void *rz_vector_tail(RZ_NONNULL RzVector *vec);
+RZ_API void *rz_vector_index_ptr(RZ_NONNULL RzVector *vec, size_t index);
+RZ_API void *rz_vector_push(RZ_NONNULL RzVector *vec, void *x);
+
+RZ_API RzPVector *rz_pvector_new(RzPVectorFree free);
+RZ_API void rz_pvector_free(RzPVector *vec);
+RZ_API size_t rz_pvector_len(RZ_NONNULL const RzPVector *vec);
+RZ_API void *rz_pvector_head(RZ_NONNULL RzPVector *vec);
+RZ_API void *rz_pvector_tail(RZ_NONNULL RzPVector *vec);
+RZ_API void *rz_pvector_at(RZ_NONNULL const RzPVector *vec, size_t index);
+RZ_API void **rz_pvector_push(RZ_NONNULL RzPVector *vec, void *x);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
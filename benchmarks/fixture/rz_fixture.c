@@ -0,0 +1,687 @@
+// SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+// SPDX-License-Identifier: LGPL-3.0-only
+
+// Minimal implementations of the functions declared in include/,
+// so that the bindings can be built and benchmarked without Rizin
+
+#include <stdlib.h>
+#include <string.h>
+
+#include <rz_bench.h>
+#include <rz_core.h>
+#include <rz_util/rz_buf.h>
+
+/* RzList */
+
+RZ_API RzList *rz_list_newf(RzListFree f) {
+        RzList *list = calloc(1, sizeof(RzList));
+        if (list) {
+                list->free = f;
+        }
+        return list;
+}
+
+RZ_API RzList *rz_list_new(void) { return rz_list_newf(NULL); }
+
+RZ_API void rz_list_free(RzList *list) {
+        if (!list) {
+                return;
+        }
+        RzListIter *iter = list->head;
+        while (iter) {
+                RzListIter *next = iter->n;
+                if (list->free) {
+                        list->free(iter->data);
+                }
+                free(iter);
+                iter = next;
+        }
+        free(list);
+}
+
+RZ_API ut32 rz_list_length(const RzList *list) { return list->length; }
+
+RZ_API void *rz_list_first(const RzList *list) {
+        return list->head ? list->head->data : NULL;
+}
+
+RZ_API void *rz_list_last(const RzList *list) {
+        return list->tail ? list->tail->data : NULL;
+}
+
+RZ_API RzListIter *rz_list_iterator(const RzList *list) {
+        return list ? list->head : NULL;
+}
+
+RZ_API RzListIter *rz_list_iter_get_next(RzListIter *list) { return list->n; }
+
+RZ_API void *rz_list_iter_get_data(RzListIter *list) { return list->data; }
+
+RZ_API RzListIter *rz_list_append(RzList *list, void *data) {
+        RzListIter *iter = calloc(1, sizeof(RzListIter));
+        if (!iter) {
+                return NULL;
+        }
+        iter->data = data;
+        iter->p = list->tail;
+        if (list->tail) {
+                list->tail->n = iter;
+        } else {
+                list->head = iter;
+        }
+        list->tail = iter;
+        list->length++;
+        return iter;
+}
+
+RZ_API RzListIter *rz_list_prepend(RzList *list, void *data) {
+        RzListIter *iter = calloc(1, sizeof(RzListIter));
+        if (!iter) {
+                return NULL;
+        }
+        iter->data = data;
+        iter->n = list->head;
+        if (list->head) {
+                list->head->p = iter;
+        } else {
+                list->tail = iter;
+        }
+        list->head = iter;
+        list->length++;
+        return iter;
+}
+
+/* RzVector */
+
+static void vector_init(RzVector *vec, size_t elem_size, RzVectorFree free,
+                        void *free_user) {
+        memset(vec, 0, sizeof(RzVector));
+        vec->elem_size = elem_size;
+        vec->free = free;
+        vec->free_user = free_user;
+}
+
+static void vector_fini(RzVector *vec) {
+        for (size_t i = 0; vec->free && i < vec->len; i++) {
+                vec->free(rz_vector_index_ptr(vec, i), vec->free_user);
+        }
+        free(vec->a);
+}
+
+RZ_API RzVector *rz_vector_new(size_t elem_size, RzVectorFree free,
+                               void *free_user) {
+        RzVector *vec = malloc(sizeof(RzVector));
+        if (vec) {
+                vector_init(vec, elem_size, free, free_user);
+        }
+        return vec;
+}
+
+RZ_API void rz_vector_free(RzVector *vec) {
+        if (vec) {
+                vector_fini(vec);
+                free(vec);
+        }
+}
+
+RZ_API size_t rz_vector_len(const RzVector *vec) { return vec->len; }
+
+RZ_API void *rz_vector_index_ptr(RzVector *vec, size_t index) {
+        return (char *)vec->a + index * vec->elem_size;
+}
+
+RZ_API void *rz_vector_head(RzVector *vec) {
+        return vec->len ? rz_vector_index_ptr(vec, 0) : NULL;
+}
+
+RZ_API void *rz_vector_tail(RzVector *vec) {
+        return vec->len ? rz_vector_index_ptr(vec, vec->len - 1) : NULL;
+}
+
+RZ_API void *rz_vector_push(RzVector *vec, void *x) {
+        if (vec->len == vec->capacity) {
+                size_t capacity = vec->capacity ? vec->capacity * 2 : 4;
+                void *a = realloc(vec->a, capacity * vec->elem_size);
+                if (!a) {
+                        return NULL;
+                }
+                vec->a = a;
+                vec->capacity = capacity;
+        }
+        void *elem = rz_vector_index_ptr(vec, vec->len++);
+        if (x) {
+                memcpy(elem, x, vec->elem_size);
+        }
+        return elem;
+}
+
+static void pvector_free_elem(void *e, void *user) {
+        ((RzPVectorFree)user)(*(void **)e);
+}
+
+RZ_API RzPVector *rz_pvector_new(RzPVectorFree free) {
+        RzPVector *vec = malloc(sizeof(RzPVector));
+        if (vec) {
+                vector_init(&vec->v, sizeof(void *),
+                            free ? pvector_free_elem : NULL, (void *)free);
+        }
+        return vec;
+}
+
+RZ_API void rz_pvector_free(RzPVector *vec) {
+        if (vec) {
+                vector_fini(&vec->v);
+                free(vec);
+        }
+}
+
+RZ_API size_t rz_pvector_len(const RzPVector *vec) { return vec->v.len; }
+
+RZ_API void *rz_pvector_at(const RzPVector *vec, size_t index) {
+        return ((void **)vec->v.a)[index];
+}
+
+RZ_API void *rz_pvector_head(RzPVector *vec) {
+        return vec->v.len ? rz_pvector_at(vec, 0) : NULL;
+}
+
+RZ_API void *rz_pvector_tail(RzPVector *vec) {
+        return vec->v.len ? rz_pvector_at(vec, vec->v.len - 1) : NULL;
+}
+
+RZ_API void **rz_pvector_push(RzPVector *vec, void *x) {
+        return (void **)rz_vector_push(&vec->v, &x);
+}
+
+/* RzCmd */
+
+RZ_API void *ht_sp_find(HtSP *ht, const char *key, bool *found) {
+        for (size_t i = 0; i < ht->count; i++) {
+                if (!strcmp(ht->keys[i], key)) {
+                        if (found) {
+                                *found = true;
+                        }
+                        return ht->values[i];
+                }
+        }
+        if (found) {
+                *found = false;
+        }
+        return NULL;
+}
+
+static bool ht_sp_insert(HtSP *ht, const char *key, void *value) {
+        if (ht->count == ht->capacity) {
+                size_t capacity = ht->capacity ? ht->capacity * 2 : 8;
+                const char **keys = realloc(ht->keys, capacity * sizeof(char *));
+                if (!keys) {
+                        return false;
+                }
+                ht->keys = keys;
+                void **values = realloc(ht->values, capacity * sizeof(void *));
+                if (!values) {
+                        return false;
+                }
+                ht->values = values;
+                ht->capacity = capacity;
+        }
+        ht->keys[ht->count] = key;
+        ht->values[ht->count] = value;
+        ht->count++;
+        return true;
+}
+
+static RzCmdDesc *cmd_desc_new(RzCmd *cmd, RzCmdDesc *parent, RzCmdDescType type,
+                               const char *name, RzCmdArgvCb cb,
+                               const RzCmdDescHelp *help) {
+        RzCmdDesc *cd = calloc(1, sizeof(RzCmdDesc));
+        if (!cd) {
+                return NULL;
+        }
+        cd->type = type;
+        cd->name = strdup(name);
+        cd->parent = parent;
+        cd->help = help;
+        cd->cb = cb;
+        if (!cd->name || !ht_sp_insert(cmd->ht_cmds, cd->name, cd)) {
+                free(cd->name);
+                free(cd);
+                return NULL;
+        }
+        return cd;
+}
+
+RZ_API RzCmdDesc *rz_cmd_get_root(RzCmd *cmd) { return cmd->root_cmd_desc; }
+
+RZ_API RzCmdDesc *rz_cmd_desc_argv_new(RzCmd *cmd, RzCmdDesc *parent,
+                                       const char *name, RzCmdArgvCb cb,
+                                       const RzCmdDescHelp *help) {
+        return cmd_desc_new(cmd, parent, RZ_CMD_DESC_TYPE_ARGV, name, cb, help);
+}
+
+RZ_API RzCmdDesc *rz_cmd_desc_group_new(RzCmd *cmd, RzCmdDesc *parent,
+                                        const char *name, RzCmdArgvCb cb,
+                                        const RzCmdDescHelp *help,
+                                        const RzCmdDescHelp *group_help) {
+        return cmd_desc_new(cmd, parent, RZ_CMD_DESC_TYPE_GROUP, name, cb,
+                            group_help);
+}
+
+static bool cmd_desc_is_in(const RzCmdDesc *cd, const RzCmdDesc *ancestor) {
+        for (; cd; cd = cd->parent) {
+                if (cd == ancestor) {
+                        return true;
+                }
+        }
+        return false;
+}
+
+RZ_API bool rz_cmd_desc_remove(RzCmd *cmd, RzCmdDesc *cd) {
+        if (!cd || cd == cmd->root_cmd_desc) {
+                return false;
+        }
+        // Children are inserted after their parent, so removing from the
+        // end never walks through the parent of an already freed child
+        HtSP *ht = cmd->ht_cmds;
+        for (size_t i = ht->count; i-- > 0;) {
+                RzCmdDesc *other = ht->values[i];
+                if (!cmd_desc_is_in(other, cd)) {
+                        continue;
+                }
+                ht->count--;
+                memmove(ht->keys + i, ht->keys + i + 1,
+                        (ht->count - i) * sizeof(char *));
+                memmove(ht->values + i, ht->values + i + 1,
+                        (ht->count - i) * sizeof(void *));
+                free(other->name);
+                free(other);
+        }
+        return true;
+}
+
+RZ_API void rz_cmd_desc_details_free(RzCmdDescDetail *details) {
+        free(details);
+}
+
+/* RzNum */
+
+RZ_API bool rz_num_is_valid_input(RzNum *num, const char *input_value) {
+        char *end;
+        strtoull(input_value, &end, 0);
+        return *input_value && !*end;
+}
+
+RZ_API ut64 rz_num_math(RzNum *num, const char *str) {
+        num->value = strtoull(str, NULL, 0);
+        return num->value;
+}
+
+/* RzFlag */
+
+static void flag_item_free(RzFlagItem *item) {
+        free(item->name);
+        free(item);
+}
+
+RZ_API RzFlagItem *rz_flag_get(RzFlag *f, const char *name) {
+        for (RzListIter *iter = f->flags->head; iter; iter = iter->n) {
+                RzFlagItem *item = iter->data;
+                if (!strcmp(item->name, name)) {
+                        return item;
+                }
+        }
+        return NULL;
+}
+
+RZ_API RzFlagItem *rz_flag_set(RzFlag *f, const char *name, ut64 addr) {
+        RzFlagItem *item = rz_flag_get(f, name);
+        if (!item) {
+                item = calloc(1, sizeof(RzFlagItem));
+                if (!item) {
+                        return NULL;
+                }
+                item->name = strdup(name);
+                rz_list_append(f->flags, item);
+        }
+        item->offset = addr;
+        return item;
+}
+
+/* RzAnalysis */
+
+static void analysis_function_free(RzAnalysisFunction *fcn) {
+        free(fcn->name);
+        free(fcn);
+}
+
+RZ_API RzAnalysisFunction *rz_analysis_get_function_byname(RzAnalysis *analysis,
+                                                           const char *name) {
+        for (RzListIter *iter = analysis->fcns->head; iter; iter = iter->n) {
+                RzAnalysisFunction *fcn = iter->data;
+                if (!strcmp(fcn->name, name)) {
+                        return fcn;
+                }
+        }
+        return NULL;
+}
+
+RZ_API RzAnalysisFunction *rz_analysis_create_function(RzAnalysis *analysis,
+                                                       const char *name,
+                                                       ut64 addr) {
+        if (rz_analysis_get_function_byname(analysis, name)) {
+                return NULL;
+        }
+        RzAnalysisFunction *fcn = calloc(1, sizeof(RzAnalysisFunction));
+        if (!fcn) {
+                return NULL;
+        }
+        fcn->name = strdup(name);
+        fcn->addr = addr;
+        rz_list_append(analysis->fcns, fcn);
+        return fcn;
+}
+
+/* RzCore */
+
+RZ_API RzCore *rz_core_new(void) {
+        RzCore *core = calloc(1, sizeof(RzCore));
+        if (!core) {
+                return NULL;
+        }
+        core->rcmd = calloc(1, sizeof(RzCmd));
+        core->rcmd->ht_cmds = calloc(1, sizeof(HtSP));
+        core->rcmd->root_cmd_desc = calloc(1, sizeof(RzCmdDesc));
+        core->num = calloc(1, sizeof(RzNum));
+        core->flags = calloc(1, sizeof(RzFlag));
+        core->flags->flags = rz_list_newf((RzListFree)flag_item_free);
+        core->analysis = calloc(1, sizeof(RzAnalysis));
+        core->analysis->fcns =
+                rz_list_newf((RzListFree)analysis_function_free);
+        return core;
+}
+
+RZ_API void rz_core_free(RzCore *core) {
+        if (!core) {
+                return;
+        }
+        HtSP *ht = core->rcmd->ht_cmds;
+        for (size_t i = 0; i < ht->count; i++) {
+                RzCmdDesc *cd = ht->values[i];
+                free(cd->name);
+                free(cd);
+        }
+        free(ht->keys);
+        free(ht->values);
+        free(ht);
+        free(core->rcmd->root_cmd_desc);
+        free(core->rcmd);
+        free(core->num);
+        rz_list_free(core->flags->flags);
+        free(core->flags);
+        rz_list_free(core->analysis->fcns);
+        free(core->analysis);
+        free(core);
+}
+
+RZ_API RzCmdStatus rz_core_cmd_repeat(RzCore *core, const char *name,
+                                      int count) {
+        RzCmdDesc *cd = ht_sp_find(core->rcmd->ht_cmds, name, NULL);
+        if (!cd || !cd->cb) {
+                return RZ_CMD_STATUS_INVALID;
+        }
+
+        const char *argv[] = {name, "1"};
+        for (int i = 0; i < count; i++) {
+                RzCmdStatus status = cd->cb(core, 2, argv);
+                if (status != RZ_CMD_STATUS_OK) {
+                        return status;
+                }
+        }
+        return RZ_CMD_STATUS_OK;
+}
+
+/* RzBuffer */
+
+// Common to the priv of bytes and slice buffers
+typedef struct {
+        ut64 size;
+        ut64 cursor;
+} BufCursor;
+
+typedef struct {
+        BufCursor cursor;
+        ut8 *data;
+} BufBytes;
+
+typedef struct {
+        BufCursor cursor;
+        RzBuffer *parent;
+        ut64 offset;
+} BufSlice;
+
+static ut64 buf_cursor_get_size(RzBuffer *b) {
+        return ((BufCursor *)b->priv)->size;
+}
+
+static st64 buf_cursor_seek(RzBuffer *b, st64 addr, int whence) {
+        BufCursor *cursor = b->priv;
+        st64 base = whence == RZ_BUF_CUR   ? (st64)cursor->cursor
+                    : whence == RZ_BUF_END ? (st64)cursor->size
+                                           : 0;
+        if (base + addr < 0) {
+                return -1;
+        }
+        cursor->cursor = base + addr;
+        return cursor->cursor;
+}
+
+// Number of bytes from the cursor which can be read, at most len
+static ut64 buf_cursor_readable(BufCursor *cursor, ut64 len) {
+        if (cursor->cursor >= cursor->size) {
+                return 0;
+        }
+        ut64 left = cursor->size - cursor->cursor;
+        return len < left ? len : left;
+}
+
+static st64 buf_bytes_read(RzBuffer *b, ut8 *buf, ut64 len) {
+        BufBytes *bytes = b->priv;
+        ut64 readable = buf_cursor_readable(&bytes->cursor, len);
+        memcpy(buf, bytes->data + bytes->cursor.cursor, readable);
+        bytes->cursor.cursor += readable;
+        return readable;
+}
+
+static ut8 *buf_bytes_get_whole_buf(RzBuffer *b, ut64 *size) {
+        BufBytes *bytes = b->priv;
+        *size = bytes->cursor.size;
+        return bytes->data;
+}
+
+static st64 buf_slice_read(RzBuffer *b, ut8 *buf, ut64 len) {
+        BufSlice *slice = b->priv;
+        ut64 readable = buf_cursor_readable(&slice->cursor, len);
+        st64 read = rz_buf_read_at(
+            slice->parent, slice->offset + slice->cursor.cursor, buf, readable);
+        if (read > 0) {
+                slice->cursor.cursor += read;
+        }
+        return read;
+}
+
+static const RzBufferMethods buf_bytes_methods = {
+    .read = buf_bytes_read,
+    .get_size = buf_cursor_get_size,
+    .seek = buf_cursor_seek,
+    .get_whole_buf = buf_bytes_get_whole_buf,
+};
+
+// Without get_whole_buf, like buffers over io or files in Rizin
+static const RzBufferMethods buf_slice_methods = {
+    .read = buf_slice_read,
+    .get_size = buf_cursor_get_size,
+    .seek = buf_cursor_seek,
+};
+
+static RzBuffer *buf_new(const RzBufferMethods *methods, void *priv) {
+        RzBuffer *b = calloc(1, sizeof(RzBuffer));
+        if (!b) {
+                free(priv);
+                return NULL;
+        }
+        b->methods = methods;
+        b->priv = priv;
+        return b;
+}
+
+RZ_API RzBuffer *rz_buf_new_with_bytes(const ut8 *bytes, ut64 len) {
+        BufBytes *priv = calloc(1, sizeof(BufBytes));
+        if (!priv) {
+                return NULL;
+        }
+        priv->cursor.size = len;
+        priv->data = malloc(len ? len : 1);
+        if (bytes) {
+                memcpy(priv->data, bytes, len);
+        }
+        return buf_new(&buf_bytes_methods, priv);
+}
+
+RZ_API RzBuffer *rz_buf_new_slice(RzBuffer *b, ut64 offset, ut64 size) {
+        BufSlice *priv = calloc(1, sizeof(BufSlice));
+        if (!priv) {
+                return NULL;
+        }
+        priv->cursor.size = size;
+        priv->parent = b;
+        priv->offset = offset;
+        return buf_new(&buf_slice_methods, priv);
+}
+
+RZ_API void rz_buf_free(RzBuffer *b) {
+        if (!b) {
+                return;
+        }
+        if (b->methods == &buf_bytes_methods) {
+                free(((BufBytes *)b->priv)->data);
+        }
+        free(b->priv);
+        free(b->whole_buf);
+        free(b);
+}
+
+RZ_API ut64 rz_buf_size(RzBuffer *b) { return b->methods->get_size(b); }
+
+RZ_API st64 rz_buf_seek(RzBuffer *b, st64 addr, int whence) {
+        return b->methods->seek(b, addr, whence);
+}
+
+RZ_API st64 rz_buf_read(RzBuffer *b, ut8 *buf, ut64 len) {
+        return b->methods->read(b, buf, len);
+}
+
+RZ_API st64 rz_buf_read_at(RzBuffer *b, ut64 addr, ut8 *buf, ut64 len) {
+        st64 cur = rz_buf_seek(b, 0, RZ_BUF_CUR);
+        if (rz_buf_seek(b, addr, RZ_BUF_SET) < 0) {
+                return -1;
+        }
+        st64 read = rz_buf_read(b, buf, len);
+        rz_buf_seek(b, cur, RZ_BUF_SET);
+        return read;
+}
+
+RZ_API const ut8 *rz_buf_data(RzBuffer *b, ut64 *size) {
+        if (b->methods->get_whole_buf) {
+                return b->methods->get_whole_buf(b, size);
+        }
+
+        // Copied, as done by Rizin
+        *size = rz_buf_size(b);
+        free(b->whole_buf);
+        b->whole_buf = malloc(*size ? *size : 1);
+        if (b->whole_buf) {
+                rz_buf_read_at(b, 0, b->whole_buf, *size);
+        }
+        return b->whole_buf;
+}
+
+/* RzBench */
+
+RZ_API void rz_bench_item_free(RzBenchItem *item) {
+        if (item) {
+                free(item->name);
+                free(item);
+        }
+}
+
+static RzBenchItem *bench_item_new(ut64 addr) {
+        RzBenchItem *item = calloc(1, sizeof(RzBenchItem));
+        if (item) {
+                item->addr = addr;
+                item->name = strdup("item");
+        }
+        return item;
+}
+
+RZ_API RzBench *rz_bench_new(int count) {
+        RzBench *bench = calloc(1, sizeof(RzBench));
+        if (!bench) {
+                return NULL;
+        }
+        bench->value = 42;
+        bench->addr = 0x1000;
+        bench->name = strdup("bench");
+        bench->item = bench_item_new(bench->addr);
+        bench->list = rz_list_newf((RzListFree)rz_bench_item_free);
+        bench->vector = rz_vector_new(sizeof(ut64), NULL, NULL);
+        bench->pvector = rz_pvector_new((RzPVectorFree)rz_bench_item_free);
+
+        for (int i = 0; i < count; i++) {
+                ut64 addr = bench->addr + i;
+                rz_list_append(bench->list, bench_item_new(addr));
+                rz_vector_push(bench->vector, &addr);
+                rz_pvector_push(bench->pvector, bench_item_new(addr));
+        }
+
+        ut64 size = (ut64)count * 16;
+        bench->buf = rz_buf_new_with_bytes(NULL, size);
+        BufBytes *bytes = bench->buf->priv;
+        for (ut64 i = 0; i < size; i++) {
+                bytes->data[i] = i & 0xff;
+        }
+        bench->slice = rz_buf_new_slice(bench->buf, 0, size);
+        return bench;
+}
+
+RZ_API void rz_bench_free(RzBench *bench) {
+        if (!bench) {
+                return;
+        }
+        free(bench->name);
+        rz_bench_item_free(bench->item);
+        rz_list_free(bench->list);
+        rz_vector_free(bench->vector);
+        rz_pvector_free(bench->pvector);
+        rz_buf_free(bench->slice);
+        rz_buf_free(bench->buf);
+        free(bench);
+}
+
+RZ_API int rz_bench_get_value(RzBench *bench) { return bench->value; }
+
+RZ_API ut64 rz_bench_item_addr(RzBench *bench, RzBenchItem *item) {
+        return item ? item->addr : bench->addr;
+}
+
+RZ_API ut64 rz_bench_item_addr_nonnull(RzBench *bench, RzBenchItem *item) {
+        return item->addr;
+}
+
+RZ_API int rz_bench_call_plugin(RzBench *bench, RzBenchPlugin *plugin,
+                                int count) {
+        int result = 0;
+        for (int i = 0; i < count; i++) {
+                result += plugin->callback(bench, i);
+        }
+        return result;
+}
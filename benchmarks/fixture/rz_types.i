@@ -0,0 +1,11 @@
+// SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+// SPDX-License-Identifier: LGPL-3.0-only
+
+// Integer typedefs of include/rz_types.h, included by every SWIG module
+// (swig -l), so that their values are converted to Python ints rather
+// than wrapped as opaque pointers
+
+typedef unsigned char ut8;
+typedef unsigned int ut32;
+typedef unsigned long long ut64;
+typedef long long st64;
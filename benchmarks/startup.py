@@ -0,0 +1,84 @@
+"""
+SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+SPDX-License-Identifier: LGPL-3.0-only
+
+Measures the time taken by a fresh Python interpreter to import
+the rizin bindings, and to first use some of their names
+"""
+
+from typing import List, Dict, cast
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+
+def time_script(script: str, bindings_dir: str, runs: int) -> List[float]:
+    """
+    Run script in new interpreters, returning the wall time of each run
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [bindings_dir] + ([env["PYTHONPATH"]] if "PYTHONPATH" in env else [])
+    )
+    # Bytecode is cached by the first run
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    times = []
+    for _ in range(runs + 1):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", script], env=env, check=True)
+        times.append(time.perf_counter() - start)
+    return times[1:]
+
+
+def main() -> None:
+    """
+    Print the median and minimum time of each case
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-b",
+        "--bindings-dir",
+        default=".",
+        help="Directory with the built rizin.py and extension module(s)",
+    )
+    parser.add_argument("-n", "--runs", type=int, default=20)
+    parser.add_argument(
+        "--names",
+        default="RzList_char,RzAnalysisFunction,RzCore",
+        help="Comma-separated names to access after importing rizin",
+    )
+    args = parser.parse_args()
+    bindings_dir = os.path.abspath(cast(str, args.bindings_dir))
+    runs = cast(int, args.runs)
+    names = cast(str, args.names).split(",")
+
+    cases: Dict[str, str] = {
+        "python": "pass",
+        "import rizin": "import rizin",
+    }
+    for name in names:
+        cases[f"rizin.{name}"] = f"import rizin; rizin.{name}"
+    cases["from rizin import *"] = "from rizin import *"
+
+    baseline = None
+    for case, script in cases.items():
+        times = time_script(script, bindings_dir, runs)
+        median = statistics.median(times)
+        if baseline is None:
+            baseline = median
+            print(f"{case:<32} {median * 1000:8.1f} ms (baseline)")
+            continue
+
+        print(
+            f"{case:<32} {(median - baseline) * 1000:8.1f} ms"
+            f" (min {(min(times) - baseline) * 1000:.1f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,24 +8,6 @@ import sys
 import cle  # https://github.com/angr/cle
 
 
-class RzBufferWrapper:
-    def __init__(self, buf):
-        self.buf = buf
-
-    def seek(self, where):
-        self.buf.seek(where, 0)
-
-    def read(self, length=None):
-        if length is None:
-            cur = self.buf.seek(0, rizin.RZ_BUF_CUR)  # save pos
-            end = self.buf.seek(0, rizin.RZ_BUF_END)
-            length = end - cur
-            self.buf.seek(cur, rizin.RZ_BUF_SET)  # restore pos
-        b = bytearray(length)
-        self.buf.read(b)
-        return b
-
-
 class CLEBinPlugin(rizin.RzBinPluginDirector):
     name = "CLESWIGPlugin"
     desc = "ELF Binary Loader using the Angr CLE library"
@@ -34,7 +16,7 @@ class CLEBinPlugin(rizin.RzBinPluginDirector):
 
     def load_buffer(self, bf, obj, buf, sdb):
         try:
-            loader = cle.Loader(RzBufferWrapper(buf))
+            loader = cle.Loader(buf.file())
         except Exception as e:
             print(e)
             return False
@@ -45,44 +27,41 @@ class CLEBinPlugin(rizin.RzBinPluginDirector):
         return self.loader.main_object.linked_base
 
     def symbols(self, bf):
+        symbols = self.loader.main_object.symbols
         syms = rizin.RzList_RzBinSymbol()
-
-        for sym in self.loader.main_object.symbols:
-            binsym = rizin.RzBinSymbol()
-            binsym.thisown = False
-            binsym.name = sym.name
-            binsym.type = rizin.RZ_BIN_TYPE_FUNC_STR
-            binsym.paddr = sym.linked_addr
-            binsym.vaddr = sym.rebased_addr
-            binsym.size = sym.size
-            syms.append(binsym)
+        # one call for all symbols, instead of a struct per symbol
+        syms.extend_columns(
+            name=[sym.name for sym in symbols],
+            type=[rizin.RZ_BIN_TYPE_FUNC_STR] * len(symbols),
+            paddr=[sym.linked_addr for sym in symbols],
+            vaddr=[sym.rebased_addr for sym in symbols],
+            size=[sym.size for sym in symbols],
+        )
         return syms
 
     def sections(self, bf):
-        sections = rizin.RzList_RzBinSection()
-        for section in self.loader.main_object.sections:
-            binsection = rizin.RzBinSection()
-            binsection.thisown = False
-            binsection.name = section.name
-            binsection.size = section.filesize
-            binsection.vsize = section.memsize
-            binsection.paddr = section.offset
-            binsection.vaddr = section.vaddr
-            sections.append(binsection)
-        return sections
+        sections = self.loader.main_object.sections
+        binsections = rizin.RzList_RzBinSection()
+        binsections.extend_columns(
+            name=[section.name for section in sections],
+            size=[section.filesize for section in sections],
+            vsize=[section.memsize for section in sections],
+            paddr=[section.offset for section in sections],
+            vaddr=[section.vaddr for section in sections],
+        )
+        return binsections
 
     def maps(self, bf):
         # virtual memory mappings
+        segments = self.loader.main_object.segments
         maps = rizin.RzList_RzBinMap()
-        for segment in self.loader.main_object.segments:
-            binmap = rizin.RzBinMap()
-            binmap.thisown = False
-            binmap.perm = segment.flags  # must be readable
-            binmap.paddr = segment.offset
-            binmap.psize = segment.filesize
-            binmap.vaddr = segment.vaddr
-            binmap.vsize = segment.memsize
-            maps.append(binmap)
+        maps.extend_columns(
+            perm=[segment.flags for segment in segments],  # must be readable
+            paddr=[segment.offset for segment in segments],
+            psize=[segment.filesize for segment in segments],
+            vaddr=[segment.vaddr for segment in segments],
+            vsize=[segment.memsize for segment in segments],
+        )
         return maps
 
     def strings(self, bf):
@@ -8,6 +8,11 @@
 
 static PyObject *rizin_module = NULL;
 
+// Thread state of the interpreter started by the plugin, if it was not
+// already running. Each entry point takes the GIL, since Rizin can call
+// them from Python, eg. with core.cmd(". script.py") which releases it.
+static PyThreadState *main_thread_state = NULL;
+
 #define ABORT_IF(cond, ...)                                                    \
         if (cond) {                                                            \
                 printf(__VA_ARGS__);                                           \
@@ -29,15 +34,20 @@ static PyObject *rizin_module = NULL;
         }                                                                      \
         return result;
 
-static int rz_bindings_run_file(RzLang *lang, const char *filename) {
+static int run_file(const char *filename) {
         FILE *file = fopen(filename, "rb");
         return PyRun_SimpleFile(file, filename) == 0;
 }
 
-static int rz_bindings_init(RzLang *lang) {
-        DEFER_SETUP;
+static int rz_bindings_run_file(RzLang *lang, const char *filename) {
+        PyGILState_STATE gil = PyGILState_Ensure();
+        int result = run_file(filename);
+        PyGILState_Release(gil);
+        return result;
+}
 
-        Py_Initialize();
+static int init(RzLang *lang) {
+        DEFER_SETUP;
 
         // Update PYTHONPATH
         char *plugins_dir = rz_path_home_prefix(RZ_PLUGINS);
@@ -62,6 +72,11 @@ static int rz_bindings_init(RzLang *lang) {
         rizin_module = DEFER_DECREF(PyImport_ImportModule("rizin"));
         ABORT_IF(!rizin_module, "Could not import rizin.py\n");
 
+        // Split bindings only import the module defining RzCore on use
+        PyObject *py_rz_core_class =
+            DEFER_DECREF(PyObject_GetAttrString(rizin_module, "RzCore"));
+        ABORT_IF(!py_rz_core_class, "Could not get RzCore class\n");
+
         swig_type_info *rz_core_type_info = SWIG_Python_TypeQuery("RzCore *");
         ABORT_IF(!rz_core_type_info, "Could not get RzCore* swig_type_info\n");
 
@@ -81,7 +96,7 @@ static int rz_bindings_init(RzLang *lang) {
         char *filename;
 
         rz_list_foreach(files, it, filename) {
-                rz_bindings_run_file(lang, filename);
+                run_file(filename);
         }
         free(globpath);
         rz_list_free(files);
@@ -89,12 +104,35 @@ static int rz_bindings_init(RzLang *lang) {
         DEFER_CLEANUP;
 }
 
+static int rz_bindings_init(RzLang *lang) {
+        if (!Py_IsInitialized()) {
+                Py_Initialize();
+                // Release the GIL held since initialization
+                main_thread_state = PyEval_SaveThread();
+        }
+
+        PyGILState_STATE gil = PyGILState_Ensure();
+        int result = init(lang);
+        PyGILState_Release(gil);
+        return result;
+}
+
 static int rz_bindings_fini(RzLang *lang) {
+        PyGILState_STATE gil = PyGILState_Ensure();
         Py_XDECREF(rizin_module);
+        rizin_module = NULL;
+        PyGILState_Release(gil);
+
+        // Only finalize the interpreter started by the plugin
+        if (!main_thread_state) {
+                return true;
+        }
+        PyEval_RestoreThread(main_thread_state);
+        main_thread_state = NULL;
         return Py_FinalizeEx() == 0;
 }
 
-static int rz_bindings_prompt(RzLang *lang) {
+static int prompt(RzLang *lang) {
         DEFER_SETUP;
 
         // Create console
@@ -170,6 +208,13 @@ static int rz_bindings_prompt(RzLang *lang) {
         DEFER_CLEANUP;
 }
 
+static int rz_bindings_prompt(RzLang *lang) {
+        PyGILState_STATE gil = PyGILState_Ensure();
+        int result = prompt(lang);
+        PyGILState_Release(gil);
+        return result;
+}
+
 RzLangPlugin rz_lang_plugin_bindings = {
     .name = "python",
     .desc = "Python SWIG bindings",
@@ -3,14 +3,18 @@ SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
 SPDX-License-Identifier: LGPL-3.0-only
 """
 
-from typing import List, Dict, OrderedDict, Set, Optional, overload
+from typing import List, Dict, OrderedDict, Set, Tuple, Optional, overload
 
 from dataclasses import dataclass
 
-from clang.cindex import CursorKind
-
-from cparser_header import Header
-from cparser_types import CType, CPointerType, CTypedefType, CRecordType, wrap_type
+from cparser_header import Header, CStruct
+from cparser_types import (
+    CType,
+    CPointerType,
+    CTypedefType,
+    CRecordType,
+    CPrimitiveType,
+)
 from binding_func import Func
 from binding_generic_specializations import gen_ctype_specializations
 from binding_typemap import Typemap
@@ -18,6 +22,25 @@ from binding_typemap import Typemap
 classes: OrderedDict[str, "Class"] = OrderedDict()
 class_structs: Dict[str, "Class"] = {}
 
+# Kinds of primitive fields which can be converted to and from columns
+COLUMN_KINDS = {
+    "BOOL",
+    "CHAR_U",
+    "UCHAR",
+    "USHORT",
+    "UINT",
+    "ULONG",
+    "ULONGLONG",
+    "CHAR_S",
+    "SCHAR",
+    "SHORT",
+    "INT",
+    "LONG",
+    "LONGLONG",
+    "FLOAT",
+    "DOUBLE",
+}
+
 
 @dataclass
 class Field:
@@ -85,44 +108,40 @@ class Class:
         self.constructor = None
         self.destructor = None
 
-        # Get struct cursor from header
+        # Get struct from header
         if not struct:
-            typedef_cursor = header.pop(CursorKind.TYPEDEF_DECL, typedef)
-            struct_cursor = typedef_cursor.underlying_typedef_type.get_declaration()
-            assert (
-                struct_cursor.kind == CursorKind.STRUCT_DECL
-            ), "Typedef underlying declaration was {struct_cursor.kind}, not STRUCT_DECL"
+            typedef_decl = header.pop_typedef(typedef)
+            cstruct = typedef_decl.underlying
+            assert isinstance(
+                cstruct, CStruct
+            ), f"Typedef underlying declaration was {typedef_decl.underlying_kind}, not STRUCT_DECL"
         else:
-            struct_cursor = header.pop(CursorKind.STRUCT_DECL, struct)
+            cstruct = header.pop_struct(struct)
 
-        self.struct_name = struct_cursor.spelling or typedef
+        self.struct_name = cstruct.name or typedef
 
         assert typedef not in classes
         classes[typedef] = self
         class_structs[self.struct_name] = self
 
         # Parse struct fields
-        for field in struct_cursor.get_children():
-            if field.kind == CursorKind.FIELD_DECL:
-                name = field.spelling
-                if ignore_fields and name in ignore_fields:
-                    ignore_fields.remove(name)
-                    continue
-
-                if rename_fields:
-                    rename = rename_fields.pop(name, None)
-                else:
-                    rename = None
-
-                assert name not in self.fields
-                ctype = wrap_type(field.type)
-                gen_ctype_specializations([field], ctype)
-                self.fields[name] = Field(name, rename, ctype)
-
-            elif field.kind not in [CursorKind.STRUCT_DECL, CursorKind.UNION_DECL]:
-                raise Exception(
-                    f"Unexpected struct child of kind: {field.kind} at {field.location}"
-                )
+        if cstruct.errors:
+            raise Exception(cstruct.errors[0])
+
+        for field in cstruct.fields:
+            name = field.name
+            if ignore_fields and name in ignore_fields:
+                ignore_fields.remove(name)
+                continue
+
+            if rename_fields:
+                rename = rename_fields.pop(name, None)
+            else:
+                rename = None
+
+            assert name not in self.fields
+            ctype = gen_ctype_specializations([field.decl], field.ctype)
+            self.fields[name] = Field(name, rename, ctype)
 
         # Ensure all ignore_fields and rename_fields are for valid fields
         if ignore_fields and len(ignore_fields) != 0:
@@ -136,6 +155,32 @@ class Class:
                 ", ".join(rename_fields),
             )
 
+    def column_fields(self) -> List[Field]:
+        """
+        Get the fields which can be converted to and from
+        columns of values: numbers, booleans and strings
+        """
+        fields = []
+        for field in self.fields.values():
+            ctype = field.ctype
+            if isinstance(ctype, CTypedefType):
+                ctype = ctype.canonical
+            if ctype.const:
+                continue
+
+            if isinstance(ctype, CPointerType):
+                ctype = ctype.pointee
+                if isinstance(ctype, CTypedefType):
+                    ctype = ctype.canonical
+                if isinstance(ctype, CPrimitiveType) and ctype.kind in [
+                    "CHAR_S",
+                    "CHAR_U",
+                ]:
+                    fields.append(field)
+            elif isinstance(ctype, CPrimitiveType) and ctype.kind in COLUMN_KINDS:
+                fields.append(field)
+        return fields
+
     def add_constructor(self, name: str) -> None:
         """
         Set C function with name as class constructor
@@ -157,6 +202,7 @@ class Class:
         rename: str,
         default_args: Optional[Dict[str, str]] = None,
         typemaps: Optional[List[Typemap]] = None,
+        release_gil: bool = False,
     ) -> None:
         """
         Add C function with name as static function
@@ -166,6 +212,7 @@ class Class:
             name,
             default_args=default_args,
             typemaps=typemaps,
+            release_gil=release_gil,
         )
 
         assert rename not in self.funcs
@@ -178,6 +225,7 @@ class Class:
         rename: str,
         default_args: Optional[Dict[str, str]] = None,
         typemaps: Optional[List[Typemap]] = None,
+        release_gil: bool = False,
     ) -> None:
         """
         Add C function with name as method
@@ -187,17 +235,22 @@ class Class:
             name,
             default_args=default_args,
             typemaps=typemaps,
+            release_gil=release_gil,
         )
 
         assert rename not in self.methods
         self.methods[rename] = method
 
-    def add_prefixed_methods(self, prefix: str) -> None:
+    def add_prefixed_methods(
+        self, prefix: str, *, release_gil: Tuple[str, ...] = ()
+    ) -> None:
         """
         Add C functions with a given prefix, and that take a
         pointer to this class as the first argument, as methods
 
-        New names will be the function names with the prefix removed
+        New names will be the function names with the prefix removed.
+        Functions whose names start with one of release_gil release the
+        GIL while running (see Func.release_gil)
 
         Note that this may result in names beginning with numbers
         (eg. rz_reg_64_to_32 -> 64_to_32) which need to be manually added
@@ -230,6 +283,7 @@ class Class:
             method = Func(
                 self.header,
                 cfunc=cfunc,
+                release_gil=name.startswith(release_gil),
             )
 
             method_names.add(name)
@@ -238,9 +292,12 @@ class Class:
 
         self.header.ignore(*method_names)
 
-    def add_prefixed_funcs(self, prefix: str) -> None:
+    def add_prefixed_funcs(
+        self, prefix: str, *, release_gil: Tuple[str, ...] = ()
+    ) -> None:
         """
-        Add C functions with a given prefix as static functions
+        Add C functions with a given prefix as static functions,
+        releasing the GIL in those starting with one of release_gil
         """
         func_names = set()
         for name, cfunc in self.header.cfuncs.items():
@@ -253,6 +310,7 @@ class Class:
             func = Func(
                 self.header,
                 cfunc=cfunc,
+                release_gil=name.startswith(release_gil),
             )
 
             func_names.add(name)
@@ -17,7 +17,7 @@ directors: Dict[str, "Director"] = {}
 @dataclass
 class DirectorArg:
     """
-    Groups a parameter cursor and its type
+    Groups a parameter name and its type
     """
 
     name: str
@@ -27,7 +27,7 @@ class DirectorArg:
 @dataclass
 class DirectorFunc:
     """
-    Groups a function cursor's args and return types
+    Groups a function pointer's args and return types
     """
 
     args: List[DirectorArg]
@@ -39,15 +39,19 @@ class Director:
     A struct with function pointers that can be set from the guest language
     """
 
+    header: Header
     name: str
+    slots: int  # Number of directors which can be built at the same time
 
     fields: OrderedDict[str, CType]
     funcs: OrderedDict[str, DirectorFunc]
 
-    def __init__(self, header: Header, typedef: str):
+    def __init__(self, header: Header, typedef: str, *, slots: int = 16):
         cls = Class(header, typedef=typedef)
 
+        self.header = header
         self.name = typedef
+        self.slots = slots
         self.fields = OrderedDict()
         self.funcs = OrderedDict()
 
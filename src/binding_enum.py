@@ -5,9 +5,7 @@ SPDX-License-Identifier: LGPL-3.0-only
 
 from typing import List, OrderedDict, Optional, overload
 
-from clang.cindex import Cursor, CursorKind
-
-from cparser_header import Header
+from cparser_header import Header, CEnum, CMacro
 
 enums: List["Enum"] = []
 macro_enums: List["MacroEnum"] = []
@@ -18,24 +16,23 @@ class Enum:
     A C enum
     """
 
+    header: Header
     typedef_name: str
     fields: OrderedDict[str, str]
 
     def __init__(self, header: Header, *, typedef: str):
         enums.append(self)
+        self.header = header
 
-        typedef_cursor = header.pop(CursorKind.TYPEDEF_DECL, typedef)
-        self.typedef_name = typedef_cursor.spelling
+        typedef_decl = header.pop_typedef(typedef)
+        self.typedef_name = typedef_decl.name
 
-        enum = typedef_cursor.underlying_typedef_type.get_declaration()
-        assert (
-            enum.kind == CursorKind.ENUM_DECL
-        ), "Typedef underlying declaration was {struct_cursor.kind}, not ENUM_DECL"
+        enum = typedef_decl.underlying
+        assert isinstance(
+            enum, CEnum
+        ), f"Typedef underlying declaration was {typedef_decl.underlying_kind}, not ENUM_DECL"
 
-        self.fields = OrderedDict()
-        for field in enum.get_children():
-            assert field.kind == CursorKind.ENUM_CONSTANT_DECL
-            self.fields[field.spelling] = str(field.enum_value)
+        self.fields = OrderedDict(enum.constants)
 
 
 class MacroEnum:
@@ -43,6 +40,7 @@ class MacroEnum:
     A C enum consisting of #define's
     """
 
+    header: Header
     defines: OrderedDict[str, str]
 
     @overload
@@ -58,21 +56,21 @@ class MacroEnum:
         prefix: Optional[str] = None,
     ):
         macro_enums.append(self)
+        self.header = header
 
         self.defines = OrderedDict()
 
-        def add_definition(macro: Cursor) -> None:
-            toks = [tok.spelling for tok in macro.get_tokens()]
-            definition = " ".join(toks[1:])
-            self.defines[macro.spelling] = definition
+        def add_definition(macro: CMacro) -> None:
+            definition = " ".join(macro.tokens[1:])
+            self.defines[macro.name] = definition
 
         if prefix:
             macro_names = []
-            for name, macro in header.cursors[CursorKind.MACRO_DEFINITION].items():
+            for name, macro in header.macros.items():
                 if name.startswith(prefix):
                     macro_names.append(name)
                     add_definition(macro)
             header.ignore(*macro_names)
 
         for define in defines:
-            add_definition(header.pop(CursorKind.MACRO_DEFINITION, define))
+            add_definition(header.pop_macro(define))
@@ -19,6 +19,7 @@ class Func:
 
     cfunc: "CFunc"
     typemaps: List[Typemap]
+    release_gil: bool  # Release the GIL while in the C function
 
     @overload
     def __init__(
@@ -28,6 +29,7 @@ class Func:
         *,
         default_args: Optional[Dict[str, str]] = ...,
         typemaps: Optional[List[Typemap]] = ...,
+        release_gil: bool = ...,
     ): ...
 
     @overload
@@ -38,6 +40,7 @@ class Func:
         cfunc: "CFunc",
         default_args: Optional[Dict[str, str]] = ...,
         typemaps: Optional[List[Typemap]] = ...,
+        release_gil: bool = ...,
     ): ...
 
     def __init__(
@@ -48,13 +51,14 @@ class Func:
         cfunc: Optional["CFunc"] = None,
         default_args: Optional[Dict[str, str]] = None,
         typemaps: Optional[List[Typemap]] = None,
+        release_gil: bool = False,
     ):
         if name:
             cfunc = header.pop_func(name)
         assert cfunc
 
         for arg in cfunc.args:
-            arg_name = arg.cursor.spelling
+            arg_name = arg.name
             if default_args and arg_name in default_args:
                 arg.default = default_args[arg_name]
                 default_args.pop(arg_name)
@@ -62,6 +66,7 @@ class Func:
 
         self.cfunc = cfunc
         self.typemaps = typemaps or []
+        self.release_gil = release_gil
         self.gen_ctype_specializations()
 
         for typemap in self.typemaps:
@@ -71,9 +76,12 @@ class Func:
         """
         Generate generic specializations for args and return type
         """
-        for arg in self.cfunc.args:
-            gen_ctype_specializations([arg.cursor], arg.ctype)
-        gen_ctype_specializations([self.cfunc.cursor], self.cfunc.result_ctype)
+        cfunc = self.cfunc
+        for arg in cfunc.args:
+            arg.wrapped_type = gen_ctype_specializations([arg.decl], arg.ctype)
+        cfunc.wrapped_result_type = gen_ctype_specializations(
+            [cfunc.decl], cfunc.result_ctype
+        )
 
 
 class GenericFunc(Func):
@@ -97,17 +105,20 @@ class GenericFunc(Func):
         super().__init__(header, name)
 
     def gen_ctype_specializations(self) -> None:
+        cfunc = self.cfunc
         if not self.generic_ret:
-            gen_ctype_specializations([self.cfunc.cursor], self.cfunc.result_ctype)
+            cfunc.wrapped_result_type = gen_ctype_specializations(
+                [cfunc.decl], cfunc.result_ctype
+            )
 
         generic_args = self.generic_args.copy()
 
-        for arg in self.cfunc.args[1:]:
-            arg_name = arg.cursor.spelling
+        for arg in cfunc.args[1:]:
+            arg_name = arg.name
             if arg_name in generic_args:
                 generic_args.remove(arg_name)
             else:
-                gen_ctype_specializations([arg.cursor], arg.ctype)
+                arg.wrapped_type = gen_ctype_specializations([arg.decl], arg.ctype)
 
         # Ensure all generic_args are for valid args
         assert len(generic_args) == 0
@@ -3,10 +3,18 @@ SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
 SPDX-License-Identifier: LGPL-3.0-only
 """
 
-from typing import List, OrderedDict, DefaultDict, Set, Optional, TYPE_CHECKING
-
-from clang.cindex import Cursor, CursorKind, SourceRange
-
+from typing import (
+    List,
+    OrderedDict,
+    DefaultDict,
+    Set,
+    Tuple,
+    Optional,
+    TYPE_CHECKING,
+)
+
+from cparser_header import CStruct
+from cparser_types import CDecl
 from binding_func import GenericFunc
 from binding_generic_specializations import generic_structs
 
@@ -32,6 +40,15 @@ class Generic:
     python_methods: OrderedDict[str, List[str]]
     specialization_extensions: DefaultDict[str, List[str]]
 
+    # C element access: (initial cursor, length, body of the step function)
+    elements: Optional[Tuple[str, str, List[str]]]
+
+    # Buffer protocol: (element storage, length)
+    buffer: Optional[Tuple[str, str]]
+
+    # Body of the function appending a new element to a container
+    append: Optional[List[str]]
+
     def __init__(
         self,
         header: "Header",
@@ -51,16 +68,19 @@ class Generic:
 
         self.python_methods = OrderedDict()
         self.specialization_extensions = DefaultDict(list)
+        self.elements = None
+        self.buffer = None
+        self.append = None
 
         assert typedef not in generics
         generics[typedef] = self
 
-        typedef_cursor = header.pop(CursorKind.TYPEDEF_DECL, typedef)
-        struct = typedef_cursor.underlying_typedef_type.get_declaration()
-        assert (
-            struct.kind == CursorKind.STRUCT_DECL
-        ), "Typedef underlying declaration was {struct_cursor.kind}, not STRUCT_DECL"
-        generic_structs[struct.spelling] = self
+        typedef_decl = header.pop_typedef(typedef)
+        struct = typedef_decl.underlying
+        assert isinstance(
+            struct, CStruct
+        ), f"Typedef underlying declaration was {typedef_decl.underlying_kind}, not STRUCT_DECL"
+        generic_structs[struct.name] = self
 
     def add_method(
         self,
@@ -83,23 +103,14 @@ class Generic:
         assert rename not in self.methods
         self.methods[rename] = method
 
-    def add_specialization(self, cursor: Cursor) -> Optional[str]:
+    def add_specialization(self, decl: CDecl) -> Optional[str]:
         """
-        Add specialization from comment at cursor
+        Add specialization from comment at declaration
 
         Returns None if no specialization found
         """
-        # Extract type comment
-        typeref = next(
-            child
-            for child in cursor.get_children()
-            if child.kind == CursorKind.TYPE_REF
-        )
-
-        src_range = SourceRange.from_locations(typeref.extent.end, cursor.location)
-        token = next(cursor.translation_unit.get_tokens(extent=src_range)).spelling
-
-        if not token.startswith("/*<") or not token.endswith(">*/"):
+        token = decl.comment
+        if not token or not token.startswith("/*<") or not token.endswith(">*/"):
             return None
 
         name = token[3:-3]
@@ -110,18 +121,18 @@ class Generic:
         if self.pointer:
             if name[-1] != "*":
                 raise Exception(
-                    f"Annotation for generic {self.name} at {cursor.location} lacks pointer"
+                    f"Annotation for generic {self.name} at {decl.location} lacks pointer"
                 )
             if name[-2] != " ":
                 raise Exception(
                     f"Annotation for generic {self.name} "
-                    f"at {cursor.location} lacks space before pointer"
+                    f"at {decl.location} lacks space before pointer"
                 )
             specialization = name[:-2]
         else:
             if name[-1] == "*":
                 raise Exception(
-                    f"Annotation for generic {self.name} at {cursor.location} has pointer"
+                    f"Annotation for generic {self.name} at {decl.location} has pointer"
                 )
             specialization = name
 
@@ -142,3 +153,47 @@ class Generic:
         Add lines to %extend only for specified specialization
         """
         self.specialization_extensions[specialization] += list(lines)
+
+    def set_elements(self, begin: str, length: str, *step: str) -> None:
+        """
+        Make specializations iterable, indexable and convertible to lists
+        (and, for elements of classes, to columns of their fields) from C,
+        with begin being the initial cursor of $self, length its number of
+        elements, and step the body of:
+        `void *step(void **cursor)`
+
+        step returns the element (of type TYPE *) at the cursor and advances it
+        """
+        self.elements = (begin, length, list(step))
+        self.add_python_method(
+            "to_columns(self, fields=None)",
+            "return _rizin_columns(self._to_columns(fields))",
+        )
+
+    def set_buffer(self, data: str, length: str) -> None:
+        """
+        Expose the elements of primitive specializations as a memoryview,
+        with data being the contiguous element storage of $self, and
+        length its number of elements
+
+        Views are invalidated when the storage is reallocated
+        """
+        self.buffer = (data, length)
+        self.add_python_method("memoryview(self)", "return self._memoryview(self)")
+        # Buffer protocol for python classes (PEP 688, Python 3.12)
+        self.add_python_method(
+            "__buffer__(self, flags)", "return self._memoryview(self)"
+        )
+
+    def set_append(self, *append: str) -> None:
+        """
+        Make specializations of classes extensible from columns of field
+        values, with append being the body of:
+        `void append(void *container, void *element)`
+
+        element is a newly allocated TYPE, to be owned by the container
+        """
+        self.append = list(append)
+        self.add_python_method(
+            "extend_columns(self, **columns)", "self._extend_columns(columns)"
+        )
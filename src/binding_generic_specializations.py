@@ -5,9 +5,10 @@ SPDX-License-Identifier: LGPL-3.0-only
 
 from typing import List, Dict, TYPE_CHECKING
 
-from clang.cindex import Cursor, CursorKind
+from dataclasses import replace
 
 from cparser_types import (
+    CDecl,
     CType,
     CPointerType,
     CRecordType,
@@ -24,55 +25,63 @@ if TYPE_CHECKING:
 generic_structs: Dict[str, "Generic"] = {}
 
 
-def gen_ctype_specializations(cursors: List[Cursor], ctype: CType) -> None:
+def gen_ctype_specializations(decls: List[CDecl], ctype: CType) -> CType:
     """
-    Generates necessary specializations for a cursor and type
+    Generates necessary specializations for a declaration and type
 
-    Multiple cursors are provided as input to accomodate for typedefs
+    Multiple declarations are provided as input to accomodate for typedefs
     which have their own type comments
+
+    Wrapped types are shared between declarations, so the specializations
+    are set on copies of the types leading to generics, and the resulting
+    type is returned. Types without generics are returned as is.
     """
     if isinstance(ctype, CPointerType):
-        gen_ctype_specializations(cursors, ctype.pointee)
+        pointee = gen_ctype_specializations(decls, ctype.pointee)
+        if pointee is not ctype.pointee:
+            return replace(ctype, pointee=pointee)
     elif isinstance(ctype, CTypedefType):
         if isinstance(ctype.canonical, CRecordType):
-            gen_ctype_specializations(cursors, ctype.canonical)
+            canonical = gen_ctype_specializations(decls, ctype.canonical)
         else:
-            # Add typedef cursor for non-struct typedefs
+            # Add typedef declaration for non-struct typedefs
             # so type comments can be processed
             # eg. typedef RzVector /*<ut64>*/ (*func)(void)
-            gen_ctype_specializations(cursors + [ctype.cursor], ctype.canonical)
+            assert ctype.decl
+            canonical = gen_ctype_specializations(decls + [ctype.decl], ctype.canonical)
+        if canonical is not ctype.canonical:
+            return replace(ctype, canonical=canonical)
     elif isinstance(ctype, CFunctionType):
-        gen_ctype_specializations(cursors, ctype.result)
-        cursor_args = [
-            cursor
-            for cursor in cursors[-1].get_children()
-            if cursor.kind == CursorKind.PARM_DECL
-        ]
+        params = decls[-1].params
 
-        assert len(cursor_args) == len(ctype.args)
-        arg_names = []
-        for arg_cursor, arg_ctype in zip(cursor_args, ctype.args):
-            gen_ctype_specializations([arg_cursor], arg_ctype)
-            arg_names.append(arg_cursor.spelling)
-        ctype.arg_names = arg_names
+        assert len(params) == len(ctype.args)
+        return replace(
+            ctype,
+            result=gen_ctype_specializations(decls, ctype.result),
+            args=[
+                gen_ctype_specializations([param], arg_ctype)
+                for param, arg_ctype in zip(params, ctype.args)
+            ],
+            arg_names=[param.name for param in params],
+        )
     elif isinstance(ctype, CRecordType):
-        decl_spelling = ctype.decl_spelling
-        if decl_spelling in generic_structs:
-            ctype.generic = generic_structs[decl_spelling]
-
-            # Search for comment in all active cursors
-            for cursor in cursors:
-                ctype.specialization = ctype.generic.add_specialization(cursor)
-                if ctype.specialization:
-                    break
-            else:
-                raise Exception(
-                    "No /*<type>*/ comment found in cursors at "
-                    + ", ".join(str(cursor.location) for cursor in cursors)
-                )
+        generic = generic_structs.get(ctype.decl_spelling)
+        if generic:
+            # Search for comment in all active declarations
+            for decl in decls:
+                specialization = generic.add_specialization(decl)
+                if specialization:
+                    return replace(
+                        ctype, generic=generic, specialization=specialization
+                    )
+            raise Exception(
+                "No /*<type>*/ comment found in declarations at "
+                + ", ".join(decl.location for decl in decls)
+            )
     elif isinstance(ctype, CArrayType):
         pass
     elif isinstance(ctype, CPrimitiveType):
         pass
     else:
         assert_never(ctype)
+    return ctype
@@ -0,0 +1,152 @@
+"""
+SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+SPDX-License-Identifier: LGPL-3.0-only
+"""
+
+from typing import List, Dict, OrderedDict, Tuple, Callable, Optional
+
+import concurrent.futures
+
+from clang.cindex import Config
+
+import cparser_cache
+import cparser_header
+from cparser_header import HeaderBuilder, UmbrellaBuilder, Header, headers
+
+HeaderFunc = Callable[[Header], None]
+threaded_headers: OrderedDict[str, HeaderFunc] = OrderedDict()
+header_modules: Dict[str, str] = {}
+
+
+def threaded_header(name: str, *, module: str) -> Callable[[HeaderFunc], None]:
+    """
+    Registers a header to be parsed by clang in parallel
+
+    Decorates a function which takes a Header as an argument.
+
+    Only the header parsing is done in parallel; the wrapped
+    functions are called in the order they were registered
+
+    module groups headers into SWIG modules, if the bindings are
+    split (the groups must match swig_modules in meson.build)
+    """
+
+    def decorator(func: HeaderFunc) -> None:
+        assert name not in threaded_headers
+        threaded_headers[name] = func
+        header_modules[name] = module
+
+    return decorator
+
+
+def init_worker(
+    library_path: Optional[str],
+    rizin_include_path: Optional[str],
+    clang_args: List[str],
+    cache_dir: Optional[str],
+) -> None:
+    """
+    Copy parser configuration into a worker process
+    """
+    if not Config.loaded and library_path:
+        Config.set_library_path(library_path)
+    cparser_header.rizin_include_path = rizin_include_path
+    cparser_header.clang_args = clang_args
+    cparser_cache.cache_dir = cache_dir
+
+
+def parse_header(builder: HeaderBuilder) -> Tuple[List[str], Header, int, int]:
+    """
+    Parse a header in a worker thread or process
+
+    Returns diagnostics, the cursor-free Header and the AST cache
+    hits and misses of this parse (only exact in worker processes)
+
+    The translation unit is freed as soon as this returns
+    """
+    hits, misses = cparser_cache.stats.hits, cparser_cache.stats.misses
+    translation_unit = builder.translation_unit()
+    diagnostics = [str(diagnostic) for diagnostic in translation_unit.diagnostics]
+    header = builder.build(translation_unit)
+    return (
+        diagnostics,
+        header,
+        cparser_cache.stats.hits - hits,
+        cparser_cache.stats.misses - misses,
+    )
+
+
+def run(parse_mode: str = "threads") -> None:
+    """
+    Parse headers, then run registered functions sequentially
+
+    parse_mode selects how headers are parsed:
+    - "threads": one translation unit per header, parsed in parallel
+    - "processes": one translation unit per header, parsed and
+      converted to cursor-free Headers in parallel worker processes
+    - "umbrella": a single translation unit including every header,
+      except the ones with an extra file (eg. ht_inc.h)
+    """
+
+    builders = [HeaderBuilder(name, header_modules[name]) for name in threaded_headers]
+
+    def run_func(header: Header, func: HeaderFunc) -> None:
+        headers.append(header)
+        func(header)
+
+    if parse_mode == "umbrella":
+        umbrella = UmbrellaBuilder(builders)
+        translation_unit = umbrella.translation_unit()
+        for diagnostic in translation_unit.diagnostics:
+            print(diagnostic)
+
+        umbrella_headers = dict(
+            zip(umbrella.builders, umbrella.build(translation_unit))
+        )
+        del translation_unit
+
+        for builder, func in zip(builders, threaded_headers.values()):
+            if builder in umbrella_headers:
+                run_func(umbrella_headers[builder], func)
+                continue
+
+            # Left out of the umbrella header (see UmbrellaBuilder)
+            diagnostics, header, _, _ = parse_header(builder)
+            for message in diagnostics:
+                print(message)
+            run_func(header, func)
+        return
+
+    if parse_mode == "processes":
+        with concurrent.futures.ProcessPoolExecutor(
+            initializer=init_worker,
+            initargs=(
+                Config.library_path,
+                cparser_header.rizin_include_path,
+                cparser_header.clang_args,
+                cparser_cache.cache_dir,
+            ),
+        ) as process_executor:
+            results = process_executor.map(parse_header, builders)
+            for (diagnostics, header, hits, misses), func in zip(
+                results, threaded_headers.values()
+            ):
+                for message in diagnostics:
+                    print(message)
+                cparser_cache.stats.merge(hits, misses)
+
+                run_func(header, func)
+        return
+
+    assert parse_mode == "threads", f"Unknown parse mode {parse_mode}"
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        # Headers are built in the worker threads as well, so
+        # that no translation unit outlives its extraction
+        results = executor.map(parse_header, builders)
+        for (diagnostics, header, _, _), func in zip(
+            results, threaded_headers.values()
+        ):
+            for message in diagnostics:
+                print(message)
+
+            run_func(header, func)
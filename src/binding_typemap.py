@@ -38,10 +38,7 @@ class Typemap:
         """
         Check if a typemap applies to a function
         """
-        args = [
-            TypemapArg(arg.ctype.type_.spelling, arg.cursor.spelling)
-            for arg in func.cfunc.args
-        ]
+        args = [TypemapArg(arg.ctype.spelling, arg.name) for arg in func.cfunc.args]
 
         num_args = len(self.args)
         for start in range(len(args) - num_args + 1):
@@ -52,6 +49,6 @@ class Typemap:
                 return
 
         raise Exception(
-            f"Function {func.cfunc.cursor.spelling} did not match typemap `{self.args}`. "
+            f"Function {func.cfunc.name} did not match typemap `{self.args}`. "
             f"Contents were: {args}"
         )
@@ -3,60 +3,19 @@ SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
 SPDX-License-Identifier: LGPL-3.0-only
 """
 
-from typing import OrderedDict, Callable
-
-import concurrent.futures
-
-from cparser_header import HeaderBuilder, Header
+from cparser_header import Header
+from binding_header import threaded_header
 from binding_class import Class
 from binding_director import Director
 from binding_enum import Enum, MacroEnum
 from binding_generic import Generic
 
-HeaderFunc = Callable[[Header], None]
-threaded_headers: OrderedDict[str, HeaderFunc] = OrderedDict()
-
-
-def threaded_header(name: str) -> Callable[[HeaderFunc], None]:
-    """
-    Registers a header to be parsed by clang in parallel
-
-    Decorates a function which takes a Header as an argument.
-
-    Only the header parsing is done in parallel; the wrapped
-    functions are called in the order they were registered
-    """
-
-    def decorator(func: HeaderFunc) -> None:
-        assert name not in threaded_headers
-        threaded_headers[name] = func
-
-    return decorator
-
-
-def run() -> None:
-    """
-    Parse headers in parallel, then run registered functions sequentially
-    """
-
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        builders = [HeaderBuilder(name) for name in threaded_headers]
-        translation_units = executor.map(HeaderBuilder.translation_unit, builders)
-        for translation_unit, builder, func in zip(
-            translation_units, builders, threaded_headers.values()
-        ):
-            for diagnostic in translation_unit.diagnostics:
-                print(diagnostic)
-
-            func(Header(translation_unit, builder))
-
-
 ############
 # GENERICS #
 ############
 
 
-@threaded_header("rz_list.h")
+@threaded_header("rz_list.h", module="util")
 def bind_list(list_h: Header) -> None:
     """
     RzListIter, RzList
@@ -82,7 +41,14 @@ def bind_list(list_h: Header) -> None:
     )
 
     rz_list.add_python_method("__len__(self)", "return self.length()")
-    rz_list.add_python_method("__iter__(self)", "return RzListIterator(self)")
+    rz_list.set_elements(
+        "rz_list_iterator($self)",
+        "rz_list_length($self)",
+        "RzListIter *iter = (RzListIter *)*cursor;",
+        "*cursor = rz_list_iter_get_next(iter);",
+        "return rz_list_iter_get_data(iter);",
+    )
+    rz_list.set_append("rz_list_append((RzList *)container, element);")
 
     # Specialized constructors
     rz_list.add_specialization_extension(
@@ -105,7 +71,7 @@ def bind_list(list_h: Header) -> None:
     )
 
 
-@threaded_header("rz_vector.h")
+@threaded_header("rz_vector.h", module="util")
 def bind_vector(vector_h: Header) -> None:
     """
     RzVector, RzPVector
@@ -121,7 +87,14 @@ def bind_vector(vector_h: Header) -> None:
     )
 
     rz_vector.add_python_method("__len__(self)", "return self.length()")
-    rz_vector.add_python_method("__iter__(self)", "return RzVectorIterator(self)")
+    rz_vector.set_elements(
+        "$self->a",
+        "rz_vector_len($self)",
+        "TYPE *element = (TYPE *)*cursor;",
+        "*cursor = element + 1;",
+        "return element;",
+    )
+    rz_vector.set_buffer("$self->a", "rz_vector_len($self)")
 
     ### RzPVector ###
     rz_pvector = Generic(vector_h, "RzPVector", pointer=True)
@@ -134,7 +107,14 @@ def bind_vector(vector_h: Header) -> None:
     )
 
     rz_pvector.add_python_method("__len__(self)", "return self.length()")
-    rz_pvector.add_python_method("__iter__(self)", "return RzPVectorIterator(self)")
+    rz_pvector.set_elements(
+        "$self->v.a",
+        "rz_pvector_len($self)",
+        "void **element = (void **)*cursor;",
+        "*cursor = element + 1;",
+        "return *element;",
+    )
+    rz_pvector.set_append("rz_pvector_push((RzPVector *)container, element);")
 
 
 ###########
@@ -142,7 +122,7 @@ def bind_vector(vector_h: Header) -> None:
 ###########
 
 
-@threaded_header("rz_analysis.h")
+@threaded_header("rz_analysis.h", module="analysis")
 def bind_analysis(analysis_h: Header) -> None:
     """
     RzAnalysis
@@ -175,7 +155,7 @@ def bind_analysis(analysis_h: Header) -> None:
     Enum(analysis_h, typedef="RzAnalysisXRefType")
 
 
-@threaded_header("rz_asm.h")
+@threaded_header("rz_asm.h", module="analysis")
 def bind_asm(asm_h: Header) -> None:
     """
     RzAsm
@@ -184,7 +164,7 @@ def bind_asm(asm_h: Header) -> None:
     Class(asm_h, typedef="RzAsmPlugin")
 
 
-@threaded_header("rz_bin.h")
+@threaded_header("rz_bin.h", module="bin")
 def bind_bin(bin_h: Header) -> None:
     """
     RzBin
@@ -213,7 +193,7 @@ def bind_bin(bin_h: Header) -> None:
     MacroEnum(bin_h, prefix="RZ_BIN_BIND_")
 
 
-@threaded_header("rz_util/rz_buf.h")
+@threaded_header("rz_util/rz_buf.h", module="util")
 def bind_buf(buf_h: Header) -> None:
     """
     RzBuf
@@ -224,7 +204,7 @@ def bind_buf(buf_h: Header) -> None:
     MacroEnum(buf_h, "RZ_BUF_SET", "RZ_BUF_CUR", "RZ_BUF_END")
 
 
-@threaded_header("rz_cmd.h")
+@threaded_header("rz_cmd.h", module="core")
 def bind_cmd(cmd_h: Header) -> None:
     """
     RzCmd
@@ -235,7 +215,7 @@ def bind_cmd(cmd_h: Header) -> None:
     Enum(cmd_h, typedef="RzCmdArgType")
 
 
-@threaded_header("rz_config.h")
+@threaded_header("rz_config.h", module="core")
 def bind_config(config_h: Header) -> None:
     """
     RzConfig
@@ -246,7 +226,7 @@ def bind_config(config_h: Header) -> None:
     rz_config.add_prefixed_funcs("rz_config_")
 
 
-@threaded_header("rz_cons.h")
+@threaded_header("rz_cons.h", module="core")
 def bind_cons(cons_h: Header) -> None:
     """
     RzCons
@@ -280,14 +260,14 @@ def bind_cons(cons_h: Header) -> None:
     Class(cons_h, typedef="RzLine")
 
 
-@threaded_header("rz_cmp.h")
+@threaded_header("rz_cmp.h", module="core")
 def bind_cmp(_: Header) -> None:
     """
     Needed for RzList_RzCoreCmpWatcher
     """
 
 
-@threaded_header("rz_core.h")
+@threaded_header("rz_core.h", module="core")
 def bind_core(core_h: Header) -> None:
     """
     RzCore
@@ -317,19 +297,24 @@ def bind_core(core_h: Header) -> None:
         "rz_core_file_open_load",
         rename="file_open_load",
         default_args={"addr": "0", "perms": "0", "write_mode": "0"},
+        release_gil=True,
     )
     rz_core.add_method(
         "rz_core_file_open",
         rename="file_open",
         default_args={"flags": "0", "loadaddr": "UT64_MAX"},
     )
-    rz_core.add_prefixed_methods("rz_core_")
+    # Commands and analysis may take long, and only call into
+    # Python through directors, which reacquire the GIL
+    rz_core.add_prefixed_methods(
+        "rz_core_", release_gil=("rz_core_cmd", "rz_core_analysis_")
+    )
     rz_core.add_prefixed_funcs("rz_core_")
 
     Class(core_h, typedef="RzCoreFile")
 
 
-@threaded_header("rz_flag.h")
+@threaded_header("rz_flag.h", module="core")
 def bind_flag(flag_h: Header) -> None:
     """
     RzFlag
@@ -344,7 +329,7 @@ def bind_flag(flag_h: Header) -> None:
     rz_flag.add_prefixed_funcs("rz_flag_")
 
 
-@threaded_header("rz_hash.h")
+@threaded_header("rz_hash.h", module="core")
 def bind_hash(hash_h: Header) -> None:
     """
     RzHash
@@ -352,7 +337,7 @@ def bind_hash(hash_h: Header) -> None:
     Class(hash_h, typedef="RzHash")  # TODO: Add functions
 
 
-@threaded_header("rz_io.h")
+@threaded_header("rz_io.h", module="core")
 def bind_io(io_h: Header) -> None:
     """
     RzIO
@@ -362,7 +347,7 @@ def bind_io(io_h: Header) -> None:
     Class(io_h, typedef="RzIOPlugin")
 
 
-@threaded_header("rz_util/rz_num.h")
+@threaded_header("rz_util/rz_num.h", module="util")
 def bind_num(num_h: Header) -> None:
     """
     RzNum
@@ -372,7 +357,7 @@ def bind_num(num_h: Header) -> None:
     rz_num.add_prefixed_funcs("rz_num_")
 
 
-@threaded_header("rz_reg.h")
+@threaded_header("rz_reg.h", module="analysis")
 def bind_reg(reg_h: Header) -> None:
     """
     RzReg
@@ -386,7 +371,7 @@ def bind_reg(reg_h: Header) -> None:
     rz_reg.add_prefixed_funcs("rz_reg_")
 
 
-@threaded_header("rz_type.h")
+@threaded_header("rz_type.h", module="analysis")
 def bind_type(type_h: Header) -> None:
     """
     RzType
@@ -397,7 +382,7 @@ def bind_type(type_h: Header) -> None:
     rz_type.add_prefixed_funcs("rz_type_")
 
 
-@threaded_header("rz_types.h")
+@threaded_header("rz_types.h", module="util")
 def bind_types(types_h: Header) -> None:
     """
     RZ_PERM_R/W/X
@@ -408,7 +393,7 @@ def bind_types(types_h: Header) -> None:
 #######
 # SDB #
 #######
-@threaded_header("sdb/sdb.h")
+@threaded_header("sdb/sdb.h", module="util")
 def bind_sdb(sdb_h: Header) -> None:
     """
     sdb
@@ -416,7 +401,7 @@ def bind_sdb(sdb_h: Header) -> None:
     Class(sdb_h, typedef="Sdb", ignore_fields={"db", "m"})
 
 
-@threaded_header("rz_util/ht_pp.h")
+@threaded_header("rz_util/ht_pp.h", module="util")
 def bind_ht_pp(ht_pp_h: Header) -> None:
     """
     ht_pp
@@ -424,7 +409,7 @@ def bind_ht_pp(ht_pp_h: Header) -> None:
     Class(ht_pp_h, typedef="HtPP")
 
 
-@threaded_header("rz_util/ht_pu.h")
+@threaded_header("rz_util/ht_pu.h", module="util")
 def bind_ht_pu(ht_pu_h: Header) -> None:
     """
     ht_pu
@@ -432,7 +417,7 @@ def bind_ht_pu(ht_pu_h: Header) -> None:
     Class(ht_pu_h, typedef="HtPU")
 
 
-@threaded_header("rz_util/ht_up.h")
+@threaded_header("rz_util/ht_up.h", module="util")
 def bind_ht_up(ht_up_h: Header) -> None:
     """
     ht_up
@@ -440,7 +425,7 @@ def bind_ht_up(ht_up_h: Header) -> None:
     Class(ht_up_h, typedef="HtUP")
 
 
-@threaded_header("rz_util/ht_uu.h")
+@threaded_header("rz_util/ht_uu.h", module="util")
 def bind_ht_uu(ht_uu_h: Header) -> None:
     """
     ht_uu
@@ -448,7 +433,7 @@ def bind_ht_uu(ht_uu_h: Header) -> None:
     Class(ht_uu_h, typedef="HtUU")
 
 
-@threaded_header("rz_util/ht_sp.h")
+@threaded_header("rz_util/ht_sp.h", module="util")
 def bind_ht_sp(ht_sp_h: Header) -> None:
     """
     ht_sp
@@ -456,7 +441,7 @@ def bind_ht_sp(ht_sp_h: Header) -> None:
     Class(ht_sp_h, typedef="HtSP")
 
 
-@threaded_header("rz_util/ht_ss.h")
+@threaded_header("rz_util/ht_ss.h", module="util")
 def bind_ht_ss(ht_ss_h: Header) -> None:
     """
     ht_ss
@@ -464,7 +449,7 @@ def bind_ht_ss(ht_ss_h: Header) -> None:
     Class(ht_ss_h, typedef="HtSS")
 
 
-@threaded_header("rz_util/ht_su.h")
+@threaded_header("rz_util/ht_su.h", module="util")
 def bind_ht_su(ht_su_h: Header) -> None:
     """
     ht_su
@@ -3,32 +3,61 @@ SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
 SPDX-License-Identifier: LGPL-3.0-only
 """
 
-from typing import List, Tuple, Optional, Iterator
+from typing import Callable, Dict, List, Tuple, Optional, Iterator
 
 from enum import Enum
 
+class Library:
+    def clang_visitChildren(
+        self, parent: Cursor, visitor: object, data: object
+    ) -> int: ...
+
 class Config:
+    library_path: Optional[str]
+    loaded: bool
+    lib: Library
+
     @staticmethod
     def set_library_path(path: str) -> None: ...
 
+conf: Config
+callbacks: Dict[str, Callable[[Callable[[Cursor, Cursor, object], int]], object]]
+
 class Diagnostic:
     spelling: str
     location: SourceLocation
 
+class File:
+    name: str
+
+class FileInclusion:
+    source: File
+    include: File
+    depth: int
+
 class TranslationUnit:
     PARSE_DETAILED_PROCESSING_RECORD: int
 
     @staticmethod
     def from_source(
-        filename: str, args: List[str], options: Optional[int] = ...
+        filename: str,
+        args: List[str],
+        unsaved_files: Optional[List[Tuple[str, str]]] = ...,
+        options: Optional[int] = ...,
     ) -> TranslationUnit: ...
+    @staticmethod
+    def from_ast_file(filename: str) -> TranslationUnit: ...
 
     cursor: Cursor
     diagnostics: List[Diagnostic]
+    spelling: str
 
     def get_tokens(self, *, extent: SourceRange) -> Iterator[Token]: ...
+    def get_includes(self) -> Iterator[FileInclusion]: ...
+    def save(self, filename: str) -> None: ...
 
 class TranslationUnitLoadError(Exception): ...
+class TranslationUnitSaveError(Exception): ...
 
 ### Type ###
 class TypeKind(Enum):
@@ -109,23 +138,32 @@ class Token:
     extent: SourceRange
 
 class CursorKind(Enum):
-    INCLUSION_DIRECTIVE: TypeKind
-    MACRO_INSTANTIATION: TypeKind
-
-    ENUM_DECL: TypeKind
-    MACRO_DEFINITION: TypeKind
-    STRUCT_DECL: TypeKind
-    TYPEDEF_DECL: TypeKind
-    FUNCTION_DECL: TypeKind
-
-    FIELD_DECL: TypeKind
-    UNION_DECL: TypeKind
-    PARM_DECL: TypeKind
-    ENUM_CONSTANT_DECL: TypeKind
-
-    ANNOTATE_ATTR: TypeKind
-    TYPE_REF: TypeKind
-    PACKED_ATTR: TypeKind
+    TRANSLATION_UNIT: CursorKind
+    INCLUSION_DIRECTIVE: CursorKind
+    MACRO_INSTANTIATION: CursorKind
+
+    ENUM_DECL: CursorKind
+    MACRO_DEFINITION: CursorKind
+    STRUCT_DECL: CursorKind
+    TYPEDEF_DECL: CursorKind
+    FUNCTION_DECL: CursorKind
+
+    FIELD_DECL: CursorKind
+    UNION_DECL: CursorKind
+    PARM_DECL: CursorKind
+    ENUM_CONSTANT_DECL: CursorKind
+
+    ANNOTATE_ATTR: CursorKind
+    TYPE_REF: CursorKind
+    PACKED_ATTR: CursorKind
+    VISIBILITY_ATTR: CursorKind
+
+class LinkageKind(Enum):
+    INVALID: LinkageKind
+    NO_LINKAGE: LinkageKind
+    INTERNAL: LinkageKind
+    UNIQUE_EXTERNAL: LinkageKind
+    EXTERNAL: LinkageKind
 
 class Cursor:
     kind: CursorKind
@@ -135,10 +173,14 @@ class Cursor:
     location: SourceLocation
     extent: SourceRange
     translation_unit: TranslationUnit
+    hash: int
+    linkage: LinkageKind
+    _tu: TranslationUnit
 
     def get_children(self) -> Iterator[Cursor]: ...
     def get_arguments(self) -> Iterator[Cursor]: ...
     def get_tokens(self) -> Iterator[Token]: ...
+    def get_usr(self) -> str: ...
 
     underlying_typedef_type: Type
     result_type: Type
@@ -0,0 +1,270 @@
+"""
+SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+SPDX-License-Identifier: LGPL-3.0-only
+"""
+
+from typing import List, Dict, Tuple, TypedDict, Optional, cast
+
+import os
+import json
+import hashlib
+import threading
+
+from clang.cindex import (
+    TranslationUnit,
+    TranslationUnitLoadError,
+    TranslationUnitSaveError,
+)
+
+### Configuration ###
+cache_dir: Optional[str] = None
+
+UnsavedFiles = List[Tuple[str, str]]
+
+
+class CacheStats:
+    """
+    Thread-safe hit/miss counters for the AST cache
+    """
+
+    hits: int
+    misses: int
+    lock: threading.Lock
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def merge(self, hits: int, misses: int) -> None:
+        """
+        Add counts from another process
+        """
+        with self.lock:
+            self.hits += hits
+            self.misses += misses
+
+    def record(self, hit: bool) -> None:
+        """
+        Count a cache lookup
+        """
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+stats = CacheStats()
+
+
+class Dependency(TypedDict):
+    """
+    A file read while parsing a cached translation unit
+    """
+
+    mtime: int
+    sha256: str
+
+
+def hash_file(path: str) -> str:
+    """
+    Get the sha256 hex digest of a file's contents
+    """
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def cache_key(
+    filename: str, args: List[str], options: int, unsaved_files: UnsavedFiles
+) -> str:
+    """
+    Get the cache key for a set of parse inputs
+
+    Included files are not part of the key, but are
+    validated separately when loading from the cache
+    """
+    inputs = json.dumps((filename, args, options, unsaved_files))
+    return hashlib.sha256(inputs.encode("utf-8")).hexdigest()
+
+
+def write_json(path: str, data: object) -> None:
+    """
+    Write JSON through a temporary file, so that an interrupted
+    run never leaves a partially written file behind
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+    os.replace(tmp_path, path)
+
+
+def touched_dependencies(
+    dependencies: Dict[str, Dependency],
+) -> Optional[Dict[str, int]]:
+    """
+    Check that no dependency was changed since it was recorded
+
+    Files with a different mtime are hashed, so that a touched but
+    otherwise unchanged file still counts as valid. Returns the new
+    mtimes of those files, or None if any dependency changed
+    """
+    touched: Dict[str, int] = {}
+    for path, dependency in dependencies.items():
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+        if mtime != dependency["mtime"]:
+            if hash_file(path) != dependency["sha256"]:
+                return None
+            touched[path] = mtime
+    return touched
+
+
+def dependencies_valid(dependencies: Dict[str, Dependency]) -> bool:
+    """
+    Check that no dependency was changed since it was recorded
+    """
+    return touched_dependencies(dependencies) is not None
+
+
+def refresh_manifest(
+    manifest_path: str,
+    manifest: object,
+    dependencies: Dict[str, Dependency],
+    mtimes: Dict[str, int],
+) -> None:
+    """
+    Record the new mtimes of touched dependencies, which are part of
+    manifest, and rewrite it so that later runs need not hash them again
+    """
+    for path, mtime in mtimes.items():
+        dependencies[path]["mtime"] = mtime
+
+    # A read-only cache is still usable, only slower
+    try:
+        write_json(manifest_path, manifest)
+    except OSError:
+        pass
+
+
+def load(key: str) -> Optional[TranslationUnit]:
+    """
+    Load a cached translation unit, or None if it is missing or stale
+    """
+    assert cache_dir
+    manifest_path = os.path.join(cache_dir, f"{key}.json")
+    ast_path = os.path.join(cache_dir, f"{key}.ast")
+
+    try:
+        with open(manifest_path, encoding="utf-8") as manifest:
+            dependencies = cast(Dict[str, Dependency], json.load(manifest))
+    except (OSError, ValueError):
+        return None
+
+    mtimes = touched_dependencies(dependencies)
+    if mtimes is None:
+        return None
+
+    try:
+        translation_unit = TranslationUnit.from_ast_file(ast_path)
+    except TranslationUnitLoadError:
+        return None
+
+    # libclang itself rejects ASTs once the mtime of one of their files
+    # changed, in which case the manifest is rewritten by store instead
+    if mtimes:
+        refresh_manifest(manifest_path, dependencies, dependencies, mtimes)
+    return translation_unit
+
+
+def source_files(translation_unit: TranslationUnit) -> List[str]:
+    """
+    Get the sorted absolute paths of the files read
+    while parsing a translation unit
+
+    In-memory unsaved files are not included
+    """
+    paths = {translation_unit.spelling}
+    for inclusion in translation_unit.get_includes():
+        paths.add(inclusion.include.name)
+
+    return sorted(os.path.abspath(path) for path in paths if os.path.exists(path))
+
+
+def file_dependencies(translation_unit: TranslationUnit) -> Dict[str, Dependency]:
+    """
+    Record the files read while parsing a translation unit,
+    for dependencies_valid to check later
+    """
+    dependencies: Dict[str, Dependency] = {}
+    for path in source_files(translation_unit):
+        dependencies[path] = {
+            "mtime": os.stat(path).st_mtime_ns,
+            "sha256": hash_file(path),
+        }
+    return dependencies
+
+
+def store(key: str, translation_unit: TranslationUnit) -> None:
+    """
+    Save a translation unit and the files it depends on to the cache
+
+    Translation units with errors cannot be saved and are skipped
+    """
+    assert cache_dir
+    os.makedirs(cache_dir, exist_ok=True)
+
+    dependencies = file_dependencies(translation_unit)
+
+    # Write to temporary files first, so that an interrupted
+    # run never leaves a manifest pointing at a partial AST
+    manifest_path = os.path.join(cache_dir, f"{key}.json")
+    ast_path = os.path.join(cache_dir, f"{key}.ast")
+    suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+
+    try:
+        translation_unit.save(ast_path + suffix)
+    except TranslationUnitSaveError:
+        if os.path.exists(ast_path + suffix):
+            os.remove(ast_path + suffix)
+        return
+    os.replace(ast_path + suffix, ast_path)
+
+    write_json(manifest_path, dependencies)
+
+
+def parse(
+    filename: str,
+    args: List[str],
+    options: int,
+    unsaved_files: Optional[UnsavedFiles] = None,
+) -> TranslationUnit:
+    """
+    Parse a translation unit, going through the AST cache if enabled
+    """
+    unsaved_files = unsaved_files or []
+    if not cache_dir:
+        return TranslationUnit.from_source(
+            filename=filename,
+            args=args,
+            unsaved_files=unsaved_files,
+            options=options,
+        )
+
+    key = cache_key(filename, args, options, unsaved_files)
+    cached = load(key)
+    stats.record(cached is not None)
+    if cached is not None:
+        return cached
+
+    result = TranslationUnit.from_source(
+        filename=filename,
+        args=args,
+        unsaved_files=unsaved_files,
+        options=options,
+    )
+    store(key, result)
+    return result
@@ -3,76 +3,279 @@ SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
 SPDX-License-Identifier: LGPL-3.0-only
 """
 
-from typing import List, OrderedDict, DefaultDict, Set, Optional
+from typing import (
+    List,
+    Dict,
+    OrderedDict,
+    DefaultDict,
+    Iterable,
+    Set,
+    Tuple,
+    Union,
+    Optional,
+)
 
-from functools import cached_property
 import os
+from enum import Enum as PyEnum
 
 from clang.cindex import TranslationUnit, Cursor, CursorKind
 
-from cparser_types import CType, wrap_type
+from cparser_types import (
+    CDecl,
+    CType,
+    CTypeResult,
+    CursorIndex,
+    CursorMap,
+    TypeWrapper,
+    checked_ctype,
+)
+import cparser_cache
 
 
-### Cursor wrappers ###
-class AttrCursor:
+### Declaration wrappers ###
+class AttrDecl:
     """
-    Base class for cursor wrapper with attributes
+    Base class for declaration wrapper with attributes
     """
 
-    cursor: Cursor
+    __slots__ = ("decl",)
 
-    def __init__(self, cursor: Cursor):
-        self.cursor = cursor
+    decl: CDecl
 
-    @cached_property
+    def __init__(self, decl: CDecl):
+        self.decl = decl
+
+    @property
+    def name(self) -> str:
+        """
+        Get declaration name
+        """
+        return self.decl.name
+
+    @property
     def attrs(self) -> Set[str]:
         """
-        Get annotation __attribute__'s on cursor
+        Get annotation __attribute__'s on declaration
         """
-        return {
-            child.spelling
-            for child in self.cursor.get_children()
-            if child.kind == CursorKind.ANNOTATE_ATTR
-        }
+        return self.decl.attrs
 
 
-class CFuncArg(AttrCursor):
+class CFuncArg(AttrDecl):
     """
-    Function argument cursor wrapper
+    Function argument wrapper
     """
 
+    __slots__ = ("wrapped_type", "default")
+
+    wrapped_type: CTypeResult
     default: Optional[str]
 
-    def __init__(self, cursor: Cursor):
-        super().__init__(cursor)
+    def __init__(self, decl: CDecl, wrapped_type: CTypeResult):
+        super().__init__(decl)
+        self.wrapped_type = wrapped_type
         self.default = None
 
-    @cached_property
+    @property
     def ctype(self) -> CType:
         """
         Get wrapped arg type
         """
-        return wrap_type(self.cursor.type)
+        return checked_ctype(self.wrapped_type)
 
 
-class CFunc(AttrCursor):
+class CFunc(AttrDecl):
     """
-    Function declaration cursor wrapper
+    Function declaration wrapper
     """
 
-    @cached_property
-    def args(self) -> List[CFuncArg]:
-        """
-        Get function args
-        """
-        return [CFuncArg(arg) for arg in self.cursor.get_arguments()]
+    __slots__ = ("args", "wrapped_result_type")
+
+    args: List[CFuncArg]
+    wrapped_result_type: CTypeResult
 
-    @cached_property
+    def __init__(
+        self, decl: CDecl, args: List[CFuncArg], wrapped_result_type: CTypeResult
+    ):
+        super().__init__(decl)
+        self.args = args
+        self.wrapped_result_type = wrapped_result_type
+
+    @property
     def result_ctype(self) -> CType:
         """
         Get wrapped result type
         """
-        return wrap_type(self.cursor.result_type)
+        return checked_ctype(self.wrapped_result_type)
+
+
+class CField(AttrDecl):
+    """
+    Struct field wrapper
+    """
+
+    __slots__ = ("wrapped_type",)
+
+    wrapped_type: CTypeResult
+
+    def __init__(self, decl: CDecl, wrapped_type: CTypeResult):
+        super().__init__(decl)
+        self.wrapped_type = wrapped_type
+
+    @property
+    def ctype(self) -> CType:
+        """
+        Get wrapped field type
+        """
+        return checked_ctype(self.wrapped_type)
+
+
+class CStruct:
+    """
+    Struct declaration wrapper
+
+    errors holds messages for unexpected children, which are
+    only raised if the struct is bound as a class
+    """
+
+    __slots__ = ("name", "location", "fields", "errors")
+
+    name: str
+    location: str
+    fields: List[CField]
+    errors: List[str]
+
+    def __init__(self, name: str, location: str):
+        self.name = name
+        self.location = location
+        self.fields = []
+        self.errors = []
+
+
+class CEnum:
+    """
+    Enum declaration wrapper
+    """
+
+    __slots__ = ("constants",)
+
+    constants: OrderedDict[str, str]
+
+    def __init__(self) -> None:
+        self.constants = OrderedDict()
+
+
+class CTypedef:
+    """
+    Typedef declaration wrapper
+
+    underlying is set if the underlying declaration is a struct or enum
+    """
+
+    __slots__ = ("name", "underlying_kind", "underlying")
+
+    name: str
+    underlying_kind: str
+    underlying: Union[CStruct, CEnum, None]
+
+    def __init__(
+        self, name: str, underlying_kind: str, underlying: Union[CStruct, CEnum, None]
+    ):
+        self.name = name
+        self.underlying_kind = underlying_kind
+        self.underlying = underlying
+
+
+class CMacro:
+    """
+    Macro definition wrapper
+    """
+
+    __slots__ = ("name", "tokens")
+
+    name: str
+    tokens: List[str]
+
+    def __init__(self, name: str, tokens: List[str]):
+        self.name = name
+        self.tokens = tokens
+
+
+class DeclWrapper(TypeWrapper):
+    """
+    Converts libclang declarations of a translation
+    unit into cursor-free wrappers
+
+    Structs are memoized, since the same struct is usually
+    reached both through its typedef and its STRUCT_DECL
+    """
+
+    structs: CursorMap[CStruct]
+
+    def __init__(self, index: CursorIndex) -> None:
+        super().__init__(index)
+        self.structs = CursorMap()
+
+    def wrap_func(self, cursor: Cursor) -> CFunc:
+        """
+        Wrap a function declaration
+        """
+        decl = self.wrap_decl(cursor)
+        params = [
+            child
+            for child in self.index.get_children(cursor)
+            if child.kind == CursorKind.PARM_DECL
+        ]
+        args = [
+            CFuncArg(arg_decl, self.try_wrap_type(param.type))
+            for arg_decl, param in zip(decl.params, params)
+        ]
+        return CFunc(decl, args, self.try_wrap_type(cursor.result_type))
+
+    def wrap_struct(self, cursor: Cursor) -> CStruct:
+        """
+        Wrap a struct declaration and its fields
+        """
+        struct = self.structs.get(cursor)
+        if struct:
+            return struct
+
+        struct = CStruct(cursor.spelling, str(cursor.location))
+        for child in self.index.get_children(cursor):
+            if child.kind == CursorKind.FIELD_DECL:
+                struct.fields.append(
+                    CField(self.wrap_decl(child), self.try_wrap_type(child.type))
+                )
+            elif child.kind not in [CursorKind.STRUCT_DECL, CursorKind.UNION_DECL]:
+                struct.errors.append(
+                    f"Unexpected struct child of kind: {child.kind} at {child.location}"
+                )
+
+        self.structs.set(cursor, struct)
+        return struct
+
+    def wrap_typedef(self, cursor: Cursor) -> CTypedef:
+        """
+        Wrap a typedef declaration and its underlying struct or enum
+        """
+        underlying_cursor = cursor.underlying_typedef_type.get_declaration()
+
+        underlying: Union[CStruct, CEnum, None] = None
+        if underlying_cursor.kind == CursorKind.STRUCT_DECL:
+            underlying = self.wrap_struct(underlying_cursor)
+        elif underlying_cursor.kind == CursorKind.ENUM_DECL:
+            underlying = CEnum()
+            for constant in self.index.get_children(underlying_cursor):
+                assert constant.kind == CursorKind.ENUM_CONSTANT_DECL
+                underlying.constants[constant.spelling] = str(constant.enum_value)
+
+        return CTypedef(cursor.spelling, str(underlying_cursor.kind), underlying)
+
+    @staticmethod
+    def wrap_macro(cursor: Cursor) -> CMacro:
+        """
+        Wrap a macro definition
+        """
+        return CMacro(cursor.spelling, [tok.spelling for tok in cursor.get_tokens()])
 
 
 ### Configuration ###
@@ -89,11 +292,13 @@ class HeaderBuilder:
     """
 
     name: str
+    module: str
     filename: str
     extra_filename: Optional[str]
 
-    def __init__(self, name: str):
+    def __init__(self, name: str, module: str):
         self.name = name
+        self.module = module
         name_segments = name.split("/")
 
         assert rizin_include_path
@@ -120,52 +325,168 @@ class HeaderBuilder:
 
         TranslationUnit.from_source is parallelizable since ctypes
         releases the GIL, so we leave it to the caller to call this
-        method in parallel and later call build sequentially.
+        method and build in parallel, and to drop the translation
+        unit as soon as build returns.
+
+        If cparser_cache.cache_dir is set, a previously saved AST
+        is loaded instead when none of its inputs have changed.
+        """
+        return cparser_cache.parse(
+            self.filename,
+            clang_args,
+            TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD,
+        )
+
+    def owns_file(self, file_name: str) -> bool:
         """
-        return TranslationUnit.from_source(
-            filename=self.filename,
-            args=clang_args,
-            options=TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD,
+        Check whether declarations of a file belong to the header
+        """
+        return file_name == self.filename or bool(
+            self.extra_filename and file_name.endswith(self.extra_filename)
         )
 
     def build(self, translation_unit: TranslationUnit) -> "Header":
         """
         Build the Header instance
         """
-        return Header(translation_unit, self)
+        index = CursorIndex(translation_unit, self.owns_file)
+        return Header(
+            index.top_level,
+            index,
+            self,
+            cparser_cache.source_files(translation_unit),
+        )
 
 
-class Header:
+class UmbrellaBuilder:
     """
-    A parsed C header file
+    Builder class for Headers sharing a single translation unit
+
+    An in-memory umbrella header includes every header once, so that
+    common dependencies (rz_types.h, rz_list.h, ...) are only
+    preprocessed and analysed once instead of once per header
+
+    Headers with an extra file (eg. ht_inc.h, included once per
+    ht_*.h header) are left out, and must be parsed separately:
+    the cursors of each expansion of the extra file all have the
+    same file, and cannot be told apart in a shared unit
     """
 
-    name: str
+    filename: str
+    source: str
+    builders: List[HeaderBuilder]
 
-    cursors: DefaultDict[CursorKind, OrderedDict[str, Cursor]]
-    cursor_kinds: OrderedDict[str, CursorKind]
-    cfuncs: OrderedDict[str, CFunc]  # Store __attributes__
+    def __init__(self, builders: List[HeaderBuilder]):
+        assert rizin_include_path
+        self.filename = os.path.abspath(
+            os.path.join(rizin_include_path, "rz_bindings_umbrella.h")
+        )
+        self.builders = [builder for builder in builders if not builder.extra_filename]
 
-    def __init__(self, translation_unit: TranslationUnit, builder: HeaderBuilder):
-        headers.append(self)
+        # Include by absolute path so that cursor file names
+        # match HeaderBuilder.filename exactly
+        self.source = "".join(
+            f'#include "{builder.filename}"\n' for builder in builders
+        )
 
+    def translation_unit(self) -> TranslationUnit:
+        """
+        Creates the shared TranslationUnit (for use in the build method)
+        """
+        return cparser_cache.parse(
+            self.filename,
+            clang_args,
+            TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD,
+            [(self.filename, self.source)],
+        )
+
+    def build(self, translation_unit: TranslationUnit) -> List["Header"]:
+        """
+        Build a Header instance for each builder, in order
+
+        Top-level cursors are partitioned by file in a single pass.
+
+        Every header depends on all files of the shared translation unit.
+        """
+        builders_by_file = {builder.filename: builder for builder in self.builders}
+        partitions: Dict[str, List[Tuple[Cursor, Optional[str]]]] = {
+            builder.filename: [] for builder in self.builders
+        }
+
+        index = CursorIndex(
+            translation_unit, lambda file_name: file_name in builders_by_file
+        )
+        for cursor, cursor_file_name in index.top_level:
+            if cursor_file_name in partitions:
+                partitions[cursor_file_name].append((cursor, cursor_file_name))
+
+        dependencies = cparser_cache.source_files(translation_unit)
+        return [
+            Header(partitions[builder.filename], index, builder, dependencies)
+            for builder in self.builders
+        ]
+
+
+class DeclKind(PyEnum):
+    """
+    Python enumeration for kind of header declaration
+    """
+
+    FUNCTION = 1
+    TYPEDEF = 2
+    STRUCT = 3
+    MACRO = 4
+    OTHER = 5
+
+
+class Header:
+    """
+    A parsed C header file
+
+    Headers hold no libclang objects, so that they can be built
+    in worker threads or processes and the translation unit
+    disposed of right after extraction, instead of staying
+    alive until generation finishes
+
+    module is the group of headers it is bound in (eg. "core")
+    dependencies holds the files read while parsing the header
+    """
+
+    name: str
+    module: str
+    dependencies: List[str]
+
+    decl_kinds: OrderedDict[str, DeclKind]
+    cfuncs: OrderedDict[str, CFunc]
+    typedefs: OrderedDict[str, CTypedef]
+    structs: OrderedDict[str, CStruct]
+    macros: OrderedDict[str, CMacro]
+
+    def __init__(
+        self,
+        cursors: Iterable[Tuple[Cursor, Optional[str]]],
+        index: CursorIndex,
+        builder: HeaderBuilder,
+        dependencies: List[str],
+    ):
         self.name = builder.name
+        self.module = builder.module
+        self.dependencies = dependencies
 
-        self.cursors = DefaultDict(OrderedDict)
-        self.cursor_kinds = OrderedDict()
+        self.decl_kinds = OrderedDict()
         self.cfuncs = OrderedDict()
+        self.typedefs = OrderedDict()
+        self.structs = OrderedDict()
+        self.macros = OrderedDict()
 
-        for cursor in translation_unit.cursor.get_children():
-            cursor_file = cursor.location.file
-            if not cursor_file:
-                continue
+        cursor_kinds: OrderedDict[str, CursorKind] = OrderedDict()
+        kind_cursors: DefaultDict[CursorKind, OrderedDict[str, Cursor]] = DefaultDict(
+            OrderedDict
+        )
 
+        for cursor, cursor_file_name in cursors:
             # Skip nodes from other headers
-            cursor_file_name = cursor_file.name
-            if cursor_file_name != builder.filename and not (
-                builder.extra_filename
-                and cursor_file_name.endswith(builder.extra_filename)
-            ):
+            if not cursor_file_name or not builder.owns_file(cursor_file_name):
                 continue
 
             # Skip `#include` and macro expansion
@@ -182,12 +503,13 @@ class Header:
 
             # Check for redefinitions
             if (
-                name in self.cursor_kinds and cursor.kind == self.cursor_kinds[name]
+                name in cursor_kinds and cursor.kind == cursor_kinds[name]
             ):  # Redefinition
-                prev = self.cursors[cursor.kind][name]
+                prev = kind_cursors[cursor.kind][name]
                 if cursor.kind == CursorKind.STRUCT_DECL:
                     assert prev.kind == CursorKind.STRUCT_DECL
-                    assert not any(prev.get_children())  # Should be forward declaration
+                    # Should be forward declaration
+                    assert not index.get_children(prev)
                 elif cursor.kind == CursorKind.MACRO_DEFINITION:
                     assert prev.kind == CursorKind.MACRO_DEFINITION
                     basename = os.path.basename(cursor_file_name)
@@ -200,39 +522,81 @@ class Header:
                         f"of kind: {cursor.kind} at {cursor.location}"
                     )
 
-            self.cursor_kinds[name] = cursor.kind
-            if cursor.kind == CursorKind.FUNCTION_DECL:
-                self.cfuncs[name] = CFunc(cursor)
+            cursor_kinds[name] = cursor.kind
+            kind_cursors[cursor.kind][name] = cursor
+
+        self.wrap_cursors(index, cursor_kinds, kind_cursors)
+
+    def wrap_cursors(
+        self,
+        index: CursorIndex,
+        cursor_kinds: OrderedDict[str, CursorKind],
+        kind_cursors: DefaultDict[CursorKind, OrderedDict[str, Cursor]],
+    ) -> None:
+        """
+        Convert the collected declarations to cursor-free wrappers
+        """
+        wrapper = DeclWrapper(index)
+        for name, kind in cursor_kinds.items():
+            cursor = kind_cursors[kind][name]
+            if kind == CursorKind.FUNCTION_DECL:
+                self.decl_kinds[name] = DeclKind.FUNCTION
+                self.cfuncs[name] = wrapper.wrap_func(cursor)
+            elif kind == CursorKind.TYPEDEF_DECL:
+                self.decl_kinds[name] = DeclKind.TYPEDEF
+                self.typedefs[name] = wrapper.wrap_typedef(cursor)
+            elif kind == CursorKind.STRUCT_DECL:
+                self.decl_kinds[name] = DeclKind.STRUCT
+                self.structs[name] = wrapper.wrap_struct(cursor)
+            elif kind == CursorKind.MACRO_DEFINITION:
+                self.decl_kinds[name] = DeclKind.MACRO
+                self.macros[name] = wrapper.wrap_macro(cursor)
             else:
-                self.cursors[cursor.kind][name] = cursor
+                self.decl_kinds[name] = DeclKind.OTHER
 
-    def pop(self, kind: CursorKind, name: str) -> Cursor:
+    def pop_typedef(self, name: str) -> CTypedef:
         """
-        Remove and return a cursor with the given name and kind
+        Remove and return a CTypedef with the given name
         """
-        return self.cursors[kind].pop(name)
+        return self.typedefs.pop(name)
+
+    def pop_struct(self, name: str) -> CStruct:
+        """
+        Remove and return a CStruct with the given name
+        """
+        return self.structs.pop(name)
+
+    def pop_macro(self, name: str) -> CMacro:
+        """
+        Remove and return a CMacro with the given name
+        """
+        return self.macros.pop(name)
 
     def pop_func(self, name: str) -> CFunc:
         """
-        Remove and return a CFunc with the given name and kind
+        Remove and return a CFunc with the given name
         """
         return self.cfuncs.pop(name)
 
     def ignore(self, *names: str, prefix: Optional[str] = None) -> None:
         """
-        Remove cursors and CFuncs with the given names
+        Remove declarations with the given names
         or that have the given prefix
         """
         names_list = list(names)
 
         if prefix:
-            for name in self.cursor_kinds:
+            for name in self.decl_kinds:
                 if name.startswith(prefix):
                     names_list.append(name)
 
         for name in names_list:
-            kind = self.cursor_kinds.pop(name)
-            if kind == CursorKind.FUNCTION_DECL:
+            kind = self.decl_kinds.pop(name)
+            if kind == DeclKind.FUNCTION:
                 self.pop_func(name)
-            else:
-                self.pop(kind, name)
+            elif kind == DeclKind.TYPEDEF:
+                self.pop_typedef(name)
+            elif kind == DeclKind.STRUCT:
+                self.pop_struct(name)
+            elif kind == DeclKind.MACRO:
+                self.pop_macro(name)
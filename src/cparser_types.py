@@ -3,42 +3,98 @@ SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
 SPDX-License-Identifier: LGPL-3.0-only
 """
 
-from typing import List, Optional, Union, NoReturn, TYPE_CHECKING
+from typing import (
+    Generic as TypingGeneric,
+    TypeVar,
+    Callable,
+    List,
+    Dict,
+    Set,
+    Sequence,
+    Tuple,
+    Optional,
+    Union,
+    NoReturn,
+    TYPE_CHECKING,
+)
 
 from dataclasses import dataclass
 
-from clang.cindex import Cursor, Type, TypeKind
+from clang.cindex import (
+    Cursor,
+    CursorKind,
+    TranslationUnit,
+    Type,
+    TypeKind,
+    SourceRange,
+    conf,
+    callbacks,
+)
 
 if TYPE_CHECKING:
     from binding_generic import Generic
 
 
 @dataclass
+class CDecl:
+    """
+    Cursor-free declaration (function, parameter, field or typedef)
+
+    comment is the first token after the declaration's type reference,
+    which holds the /*<type>*/ comment of generics.
+    params holds the parameters of function (pointer) declarations.
+    """
+
+    __slots__ = ("name", "location", "attrs", "comment", "params")
+
+    name: str
+    location: str
+    attrs: Set[str]
+    comment: Optional[str]
+    params: Sequence["CDecl"]
+
+
+@dataclass(eq=False)
 class CBaseType:
     """
     Base class for type wrapper
+
+    Type wrappers are interned by TypeWrapper and shared between
+    declarations, so they are never modified once created (see
+    gen_ctype_specializations) and compare by identity
     """
 
-    type_: Type
+    __slots__ = ("spelling", "const")
 
+    spelling: str
+    const: bool
 
-@dataclass
+
+@dataclass(eq=False)
 class CPrimitiveType(CBaseType):
     """
     Primitive type wrapper
+
+    kind is the name of the libclang TypeKind (eg. "BOOL")
     """
 
+    __slots__ = ("kind",)
 
-@dataclass
+    kind: str
+
+
+@dataclass(eq=False)
 class CPointerType(CBaseType):
     """
     Pointer type wrapper
     """
 
+    __slots__ = ("pointee",)
+
     pointee: "CType"
 
 
-@dataclass
+@dataclass(eq=False)
 class CArrayType(CBaseType):
     """
     Array type wrapper
@@ -47,43 +103,58 @@ class CArrayType(CBaseType):
     If variable size (eg. char[]), element_count is None.
     """
 
+    __slots__ = ("element", "element_count")
+
     element: "CType"
-    element_count: Optional[int] = None
+    element_count: Optional[int]
 
 
-@dataclass
+@dataclass(eq=False)
 class CTypedefType(CBaseType):
     """
     Typedef type wrapper
+
+    decl is only set for non-struct typedefs, which
+    can have their own type comments
     """
 
+    __slots__ = ("canonical", "name", "decl")
+
     canonical: "CType"
-    cursor: Cursor
+    name: str
+    decl: Optional[CDecl]
 
 
-@dataclass
+@dataclass(eq=False)
 class CRecordType(CBaseType):
     """
     Struct type wrapper
 
     Structs without a name (eg. typedef struct {} AStruct)
     use their typedef name for decl_spelling
+    generic and specialization are set by gen_ctype_specializations
     """
 
+    __slots__ = ("decl_spelling", "generic", "specialization")
+
     decl_spelling: str
-    generic: Optional["Generic"] = None
-    specialization: Optional[str] = None
+    generic: Optional["Generic"]
+    specialization: Optional[str]
 
 
-@dataclass
+@dataclass(eq=False)
 class CFunctionType(CBaseType):
     """
     Function type wrapper
+
+    arg_names is set by gen_ctype_specializations
     """
 
+    __slots__ = ("result", "args", "arg_names")
+
     result: "CType"
     args: List["CType"]
-    arg_names: Optional[List[str]] = None
+    arg_names: Optional[List[str]]
 
 
 CType = Union[
@@ -96,75 +167,310 @@ CType = Union[
 ]
 
 
-def wrap_type(type_: Type) -> CType:
+class UnsupportedTypeError(Exception):
     """
-    Wrap a type
+    Raised when wrapping a type of unknown kind
     """
-    orig_type = type_
-    while type_.kind == TypeKind.ELABORATED:
-        type_ = type_.get_named_type()
 
-    # Complex types
-    if type_.kind == TypeKind.POINTER:
-        return CPointerType(orig_type, pointee=wrap_type(type_.get_pointee()))
 
-    if type_.kind in [TypeKind.CONSTANTARRAY, TypeKind.INCOMPLETEARRAY]:
-        array_t = CArrayType(
-            orig_type, element=wrap_type(type_.get_array_element_type())
-        )
-        if type_.kind == TypeKind.CONSTANTARRAY:
-            array_t.element_count = type_.element_count
-        return array_t
-
-    if type_.kind == TypeKind.TYPEDEF:
-        return CTypedefType(
-            orig_type,
-            canonical=wrap_type(type_.get_canonical()),
-            cursor=type_.get_declaration(),
+@dataclass
+class CUnsupportedType:
+    """
+    Placeholder for a type which could not be wrapped
+
+    Declarations are extracted eagerly, so the error is
+    only raised once the type is actually used
+    """
+
+    __slots__ = ("message",)
+
+    message: str
+
+
+CTypeResult = Union[CType, CUnsupportedType]
+
+
+def checked_ctype(ctype: CTypeResult) -> CType:
+    """
+    Raise if a type could not be wrapped
+    """
+    if isinstance(ctype, CUnsupportedType):
+        raise Exception(ctype.message)
+    return ctype
+
+
+CursorValue = TypeVar("CursorValue")
+
+
+class CursorMap(TypingGeneric[CursorValue]):
+    """
+    Values keyed by cursor
+
+    Cursor.hash (clang_hashCursor) is only 32 bits, so cursors with
+    the same hash are told apart by equality (clang_equalCursors)
+    """
+
+    buckets: Dict[int, List[Tuple[Cursor, CursorValue]]]
+
+    def __init__(self) -> None:
+        self.buckets = {}
+
+    def get(self, cursor: Cursor, known: bool = False) -> Optional[CursorValue]:
+        """
+        Get the value of a cursor, if any
+
+        If the cursor is known to be in the map, it is
+        only compared when other cursors have its hash
+        """
+        bucket = self.buckets.get(cursor.hash)
+        if not bucket:
+            return None
+        if known and len(bucket) == 1:
+            return bucket[0][1]
+
+        for other, value in bucket:
+            if other == cursor:
+                return value
+        return None
+
+    def set(self, cursor: Cursor, value: CursorValue) -> None:
+        """
+        Set the value of a cursor
+        """
+        bucket = self.buckets.setdefault(cursor.hash, [])
+        for index, (other, _) in enumerate(bucket):
+            if other == cursor:
+                bucket[index] = (cursor, value)
+                return
+        bucket.append((cursor, value))
+
+
+class CursorIndex:
+    """
+    Children of the declarations of a translation unit,
+    gathered in a single libclang visitor pass
+
+    Cursor.get_children goes through a ctypes callback per child on
+    every call, so declarations are instead visited once, recursively,
+    and their children are looked up by cursor.
+
+    top_level holds the top-level cursors with the name of their file.
+    Only the declarations of files accepted by visit_file are visited.
+    """
+
+    # Kinds whose children are wrapped (attributes, parameters, fields...)
+    VISITED_KINDS = {
+        CursorKind.FUNCTION_DECL,
+        CursorKind.STRUCT_DECL,
+        CursorKind.ENUM_DECL,
+        CursorKind.TYPEDEF_DECL,
+        CursorKind.FIELD_DECL,
+        CursorKind.PARM_DECL,
+    }
+
+    top_level: List[Tuple[Cursor, Optional[str]]]
+    children: CursorMap[List[Cursor]]
+
+    def __init__(
+        self, translation_unit: TranslationUnit, visit_file: Callable[[str], bool]
+    ):
+        self.top_level = []
+        self.children = CursorMap()
+
+        def visitor(child: Cursor, parent: Cursor, _: object) -> int:
+            # Keep the translation unit alive, as Cursor.get_children does
+            child._tu = translation_unit  # pylint: disable=protected-access
+
+            if parent.kind == CursorKind.TRANSLATION_UNIT:
+                child_file = child.location.file
+                file_name = child_file.name if child_file else None
+                self.top_level.append((child, file_name))
+                if not file_name or not visit_file(file_name):
+                    return 1  # CXChildVisit_Continue
+            else:
+                # Visited parents were added below, before their children
+                siblings = self.children.get(parent, known=True)
+                assert siblings is not None
+                siblings.append(child)
+
+            if child.kind not in self.VISITED_KINDS:
+                return 1  # CXChildVisit_Continue
+            self.children.set(child, [])
+            return 2  # CXChildVisit_Recurse
+
+        conf.lib.clang_visitChildren(
+            translation_unit.cursor, callbacks["cursor_visit"](visitor), None
         )
 
-    if type_.kind == TypeKind.FUNCTIONPROTO:
-        return CFunctionType(
-            orig_type,
-            result=wrap_type(type_.get_result()),
-            args=[wrap_type(arg) for arg in type_.argument_types()],
+    def get_children(self, cursor: Cursor) -> List[Cursor]:
+        """
+        Get the children of a cursor, from the index if it was visited
+        """
+        children = self.children.get(cursor)
+        if children is None:
+            children = list(cursor.get_children())
+        return children
+
+
+class TypeWrapper:
+    """
+    Converts libclang types and declarations of a
+    translation unit into cursor-free wrappers
+
+    Typedef declarations are memoized by name, since the
+    same typedefs (eg. ut64) appear throughout a header.
+    Types are interned by spelling and qualifiers, so that each
+    distinct type (eg. const char *) is only wrapped once
+    """
+
+    index: CursorIndex
+    typedef_decls: Dict[str, CDecl]
+    types: Dict[Tuple[str, bool], CType]
+
+    def __init__(self, index: CursorIndex) -> None:
+        self.index = index
+        self.typedef_decls = {}
+        self.types = {}
+
+    def wrap_decl(self, cursor: Cursor) -> CDecl:
+        """
+        Wrap a declaration's annotations, type comment and parameters
+        """
+        attrs = set()
+        typeref = None
+        params = []
+        for child in self.index.get_children(cursor):
+            if child.kind == CursorKind.ANNOTATE_ATTR:
+                attrs.add(child.spelling)
+            elif child.kind == CursorKind.TYPE_REF:
+                if not typeref:
+                    typeref = child
+            elif child.kind == CursorKind.PARM_DECL:
+                params.append(self.wrap_decl(child))
+
+        comment = None
+        if typeref:
+            src_range = SourceRange.from_locations(typeref.extent.end, cursor.location)
+            token = next(cursor.translation_unit.get_tokens(extent=src_range), None)
+            if token:
+                comment = token.spelling
+
+        return CDecl(
+            name=cursor.spelling,
+            location=str(cursor.location),
+            attrs=attrs,
+            comment=comment,
+            params=params,
         )
 
-    if type_.kind == TypeKind.RECORD:
-        decl_spelling = type_.get_declaration().spelling or type_.spelling
-        if decl_spelling.startswith("const "):
-            decl_spelling = decl_spelling[len("const ") :]
-
-        return CRecordType(orig_type, decl_spelling=decl_spelling)
-
-    # Primitive types
-    if type_.kind in [
-        TypeKind.ENUM,
-        TypeKind.VOID,
-        TypeKind.BOOL,
-        TypeKind.FLOAT,
-        TypeKind.DOUBLE,
-        TypeKind.LONGDOUBLE,
-        # Unsigned
-        TypeKind.CHAR_U,
-        TypeKind.UCHAR,
-        TypeKind.CHAR16,
-        TypeKind.CHAR32,
-        TypeKind.USHORT,
-        TypeKind.UINT,
-        TypeKind.ULONG,
-        TypeKind.ULONGLONG,
-        # Signed
-        TypeKind.CHAR_S,
-        TypeKind.SCHAR,
-        TypeKind.WCHAR,
-        TypeKind.SHORT,
-        TypeKind.INT,
-        TypeKind.LONG,
-        TypeKind.LONGLONG,
-    ]:
-        return CPrimitiveType(type_)
-    raise Exception(f"Unknown type kind {type_.kind}")
+    def try_wrap_type(self, type_: Type) -> CTypeResult:
+        """
+        Wrap a type, deferring errors to when the type is used
+        """
+        try:
+            return self.wrap_type(type_)
+        except UnsupportedTypeError as e:
+            return CUnsupportedType(str(e))
+
+    def wrap_type(self, type_: Type) -> CType:
+        """
+        Wrap a type, sharing the wrapper of an identical type
+        """
+        key = (type_.spelling, type_.is_const_qualified())
+        ctype = self.types.get(key)
+        if not ctype:
+            ctype = self.wrap_new_type(type_, *key)
+            self.types[key] = ctype
+        return ctype
+
+    def wrap_new_type(self, type_: Type, spelling: str, const: bool) -> CType:
+        """
+        Wrap a type which was not wrapped yet
+        """
+        while type_.kind == TypeKind.ELABORATED:
+            type_ = type_.get_named_type()
+
+        # Complex types
+        if type_.kind == TypeKind.POINTER:
+            return CPointerType(
+                spelling, const, pointee=self.wrap_type(type_.get_pointee())
+            )
+
+        if type_.kind in [TypeKind.CONSTANTARRAY, TypeKind.INCOMPLETEARRAY]:
+            element_count = None
+            if type_.kind == TypeKind.CONSTANTARRAY:
+                element_count = type_.element_count
+            return CArrayType(
+                spelling,
+                const,
+                element=self.wrap_type(type_.get_array_element_type()),
+                element_count=element_count,
+            )
+
+        if type_.kind == TypeKind.TYPEDEF:
+            cursor = type_.get_declaration()
+            canonical = self.wrap_type(type_.get_canonical())
+            decl = None
+            if not isinstance(canonical, CRecordType):
+                decl = self.typedef_decls.get(cursor.spelling)
+                if not decl:
+                    decl = self.wrap_decl(cursor)
+                    self.typedef_decls[cursor.spelling] = decl
+
+            return CTypedefType(
+                spelling, const, canonical=canonical, name=cursor.spelling, decl=decl
+            )
+
+        if type_.kind == TypeKind.FUNCTIONPROTO:
+            return CFunctionType(
+                spelling,
+                const,
+                result=self.wrap_type(type_.get_result()),
+                args=[self.wrap_type(arg) for arg in type_.argument_types()],
+                arg_names=None,
+            )
+
+        if type_.kind == TypeKind.RECORD:
+            decl_spelling = type_.get_declaration().spelling or type_.spelling
+            if decl_spelling.startswith("const "):
+                decl_spelling = decl_spelling[len("const ") :]
+
+            return CRecordType(
+                spelling,
+                const,
+                decl_spelling=decl_spelling,
+                generic=None,
+                specialization=None,
+            )
+
+        # Primitive types
+        if type_.kind in [
+            TypeKind.ENUM,
+            TypeKind.VOID,
+            TypeKind.BOOL,
+            TypeKind.FLOAT,
+            TypeKind.DOUBLE,
+            TypeKind.LONGDOUBLE,
+            # Unsigned
+            TypeKind.CHAR_U,
+            TypeKind.UCHAR,
+            TypeKind.CHAR16,
+            TypeKind.CHAR32,
+            TypeKind.USHORT,
+            TypeKind.UINT,
+            TypeKind.ULONG,
+            TypeKind.ULONGLONG,
+            # Signed
+            TypeKind.CHAR_S,
+            TypeKind.SCHAR,
+            TypeKind.WCHAR,
+            TypeKind.SHORT,
+            TypeKind.INT,
+            TypeKind.LONG,
+            TypeKind.LONGLONG,
+        ]:
+            return CPrimitiveType(type_.spelling, const, kind=type_.kind.name)
+        raise UnsupportedTypeError(f"Unknown type kind {type_.kind}")
 
 
 def assert_never(_: NoReturn) -> NoReturn:
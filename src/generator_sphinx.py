@@ -13,17 +13,20 @@ from typing import (
     Optional,
     Iterator,
     TextIO,
+    TypedDict,
+    cast,
 )
 
+import io
 import os
+import json
+import concurrent.futures
 from contextlib import contextmanager, suppress
 from dataclasses import dataclass
 from itertools import chain
 from xml.etree.ElementTree import Element
 import xml.etree.ElementTree as ET
 
-from clang.cindex import TypeKind
-
 from cparser_types import (
     CType,
     CPointerType,
@@ -36,91 +39,273 @@ from cparser_types import (
 )
 from binding_class import Class, classes, class_structs
 from binding_func import Func
+import cparser_cache
 
-from writer import Writer
+from writer import Writer, write_if_changed
 
 doxygen_path: Optional[str] = None
 
-DoxygenElements = Dict[str, Element]
 
+@dataclass
+class DoxygenFile:
+    """
+    Groups a Doxygen XML file's name, refid, and absolute path
+    """
+
+    name: str
+    refid: str
+    path: str
+
+
+@dataclass
+class DoxygenFunction:
+    """
+    Groups a function's Doxygen XML element and the file defining it
+    """
+
+    file: DoxygenFile
+    element: Element
+
+
+# Maps bound functions to their documentation (see index_doxygen)
+doxygen_functions: Dict[str, DoxygenFunction] = {}
+
+
+def iterparse_elements(path: str, tag: str) -> Iterator[Element]:
+    """
+    Stream the elements with the specified tag from an XML file
 
-class DoxygenFiles(Dict[str, DoxygenElements]):
+    Every other element is discarded once parsed, and yielded elements are
+    detached from the tree, so memory does not grow with the size of the file
     """
-    Dictionary wrapper for retrieving XML elements from a filename
+    parser: "ET.XMLPullParser[Element]" = ET.XMLPullParser(events=("start", "end"))
+    parents: List[Element] = []
+    depth = 0  # Nesting within a streamed element
+
+    with open(path, "rb") as file:
+        while True:
+            chunk = file.read(1 << 16)
+            if chunk:
+                parser.feed(chunk)
+            else:
+                parser.close()
+
+            for event in parser.read_events():
+                node = event[-1]
+                assert isinstance(node, Element)
+                if event[0] == "start":
+                    if node.tag == tag:
+                        depth += 1
+                    parents.append(node)
+                    continue
+
+                parents.pop()
+                if node.tag == tag:
+                    depth -= 1
+                elif depth:
+                    continue
+
+                if parents:
+                    parents[-1].remove(node)
+                if node.tag == tag:
+                    yield node
+
+            if not chunk:
+                break
 
-    If a filename is missing, parse and store its elements
 
-    If an element name is duplicated, the element is ignored completely
+def index_doxygen_files(names: Set[str]) -> Dict[str, DoxygenFile]:
     """
+    Find the file defining each function of names in Doxygen's index.xml
 
-    names: Set[str]
+    If a function is found in multiple files, its header declarations are ignored
+    """
+    assert doxygen_path
+    function_files: DefaultDict[str, List[DoxygenFile]] = DefaultDict(list)
 
-    def __init__(self) -> None:
-        self.names = set()
-        super().__init__()
+    for filenode in iterparse_elements(
+        os.path.join(doxygen_path, "xml", "index.xml"), "compound"
+    ):
+        if filenode.attrib["kind"] != "file":
+            continue
 
-    def __missing__(self, path: str) -> DoxygenElements:
-        tree = ET.parse(path)
+        refid = filenode.attrib["refid"]
+        filename = filenode.findtext("name")
+        assert filename
 
-        nodes: DoxygenElements = {}
-        for node in tree.findall(
-            "./compounddef/sectiondef/memberdef[@kind='function']"
-        ):
-            name = node.findtext("name")
+        for membernode in filenode.findall("./member[@kind='function']"):
+            name = membernode.findtext("name")
             assert name
-            if name in self.names:
-                if name in nodes:
-                    del nodes[name]
-            else:
-                self.names.add(name)
-                nodes[name] = node
-                super().__setitem__(path, nodes)
+            if name in names:
+                function_files[name].append(
+                    DoxygenFile(
+                        name=filename,
+                        refid=refid,
+                        path=os.path.join(doxygen_path, "xml", f"{refid}.xml"),
+                    )
+                )
 
-        return nodes
+    files = {}
+    for function, candidates in function_files.items():
+        if len(candidates) > 1:
+            candidates = [f for f in candidates if not f.name.endswith(".h")]
+            assert (
+                len(candidates) == 1
+            ), f"Function {function} is found in multiple files: {candidates}"
+        files[function] = candidates[0]
+    return files
 
 
-@dataclass
-class DoxygenFile:
+def index_doxygen(names: Set[str]) -> None:
     """
-    Groups a Doxygen XML file's name, refid, and absolute path
+    Read the documentation of each function of names into doxygen_functions
+
+    Only the files defining these functions are read, keeping only their
+    function elements. If an element name is duplicated in a file, the
+    element is ignored completely.
+
+    With a cache directory, the index is saved and
+    reused until Doxygen's XML output changes
     """
+    if load_doxygen_index(names):
+        return
 
-    name: str
-    refid: str
-    path: str
+    files = index_doxygen_files(names)
 
+    names_by_path: DefaultDict[str, Set[str]] = DefaultDict(set)
+    for function, doxygen_file in files.items():
+        names_by_path[doxygen_file.path].add(function)
 
-doxygen_files = DoxygenFiles()
+    for path, file_names in names_by_path.items():
+        nodes: Dict[str, Element] = {}
+        duplicates: Set[str] = set()
 
+        for node in iterparse_elements(path, "memberdef"):
+            name = node.findtext("name")
+            if node.attrib["kind"] != "function" or name not in file_names:
+                continue
 
-class DoxygenFunctions:
+            assert name
+            if name in nodes:
+                duplicates.add(name)
+            nodes[name] = node
+
+        for name, node in nodes.items():
+            if name not in duplicates:
+                doxygen_functions[name] = DoxygenFunction(
+                    file=files[name], element=node
+                )
+
+    store_doxygen_index(names, list(names_by_path))
+
+
+class DoxygenIndexFunction(TypedDict):
     """
-    Wrapper for retrieving function XML element from a name
+    A function of the saved Doxygen index, with its element serialized
     """
 
-    # Maps functions to filepaths
-    function_files: DefaultDict[str, List[DoxygenFile]]
+    file: Dict[str, str]
+    element: str
+
 
-    def __init__(self) -> None:
-        self.function_files = DefaultDict(list)
+class DoxygenIndex(TypedDict):
+    """
+    The saved Doxygen index, with the XML files it was read from
+    """
 
-    def __getitem__(self, name: str) -> Element:
-        files = self.function_files[name]
+    doxygen_path: str
+    names: List[str]
+    dependencies: Dict[str, cparser_cache.Dependency]
+    functions: Dict[str, DoxygenIndexFunction]
 
-        if len(files) == 0:
-            raise Exception(f"Function {name} not found in any file")
 
-        if len(files) > 1:
-            files = [f for f in files if not f.name.endswith(".h")]
-            self.function_files[name] = files
-            assert (
-                len(files) == 1
-            ), f"Function {name} is found in multiple files: {files}"
+def doxygen_index_path() -> Optional[str]:
+    """
+    Get the path of the saved Doxygen index, if there is a cache directory
+    """
+    if not cparser_cache.cache_dir:
+        return None
+    return os.path.join(cparser_cache.cache_dir, "doxygen.json")
 
-        return doxygen_files[files[0].path][name]
+
+def load_doxygen_index(names: Set[str]) -> bool:
+    """
+    Load the saved Doxygen index into doxygen_functions
+
+    Returns False if it is missing, stale, or lacks any of names
+    """
+    path = doxygen_index_path()
+    if not path:
+        return False
+
+    try:
+        with open(path, encoding="utf-8") as file:
+            entry = cast(DoxygenIndex, json.load(file))
+    except (OSError, ValueError):
+        return False
+
+    if entry["doxygen_path"] != doxygen_path or not names <= set(entry["names"]):
+        return False
+
+    mtimes = cparser_cache.touched_dependencies(entry["dependencies"])
+    if mtimes is None:
+        return False
+    if mtimes:
+        cparser_cache.refresh_manifest(path, entry, entry["dependencies"], mtimes)
+
+    for name, function in entry["functions"].items():
+        if name in names:
+            doxygen_functions[name] = DoxygenFunction(
+                file=DoxygenFile(
+                    name=function["file"]["name"],
+                    refid=function["file"]["refid"],
+                    path=function["file"]["path"],
+                ),
+                element=ET.fromstring(function["element"]),
+            )
+    return True
 
 
-doxygen_functions = DoxygenFunctions()
+def store_doxygen_index(names: Set[str], paths: List[str]) -> None:
+    """
+    Save doxygen_functions, for the functions of names, with the Doxygen
+    XML files they were read from
+    """
+    path = doxygen_index_path()
+    if not path:
+        return
+
+    assert doxygen_path
+    dependencies: Dict[str, cparser_cache.Dependency] = {}
+    for dependency in [os.path.join(doxygen_path, "xml", "index.xml"), *paths]:
+        dependencies[dependency] = {
+            "mtime": os.stat(dependency).st_mtime_ns,
+            "sha256": cparser_cache.hash_file(dependency),
+        }
+
+    functions: Dict[str, DoxygenIndexFunction] = {
+        name: {
+            "file": {
+                "name": function.file.name,
+                "refid": function.file.refid,
+                "path": function.file.path,
+            },
+            "element": ET.tostring(function.element, encoding="unicode"),
+        }
+        for name, function in doxygen_functions.items()
+    }
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        index: DoxygenIndex = {
+            "doxygen_path": doxygen_path,
+            "names": sorted(names),
+            "dependencies": dependencies,
+            "functions": functions,
+        }
+        json.dump(index, file)
+    os.replace(tmp_path, path)
 
 
 def doxygen_children(node: Element) -> Iterator[Union[str, Element]]:
@@ -197,94 +382,135 @@ class SphinxWriter(Writer):
         self.line("")
 
 
-def generate(output_dir: str) -> None:
+def generate(output_dir: str, *, jobs: Optional[int] = None) -> None:
     """
     Generate sphinx docs and write to sphinx/ directory
+
+    Class pages are written by jobs worker processes (one per core if None)
+
+    Files are only rewritten if their contents changed, so that
+    sphinx-build only rebuilds the pages which changed
     """
     sphinx_dir = os.path.join(output_dir, "sphinx")
 
     with suppress(FileExistsError):
         os.mkdir(sphinx_dir)
 
-    with open(os.path.join(sphinx_dir, "conf.py"), "w", encoding="utf-8") as output:
-        writer = Writer(output)
-        writer.line(
-            "html_theme = 'furo'",
-            "",
-            "import shutil",
-            "import os",
-            "def setup(app):",
-            "    shutil.copytree(",
-            f"        os.path.join('{doxygen_path}', 'html'),",
-            "        os.path.join(app.outdir, 'doxygen'),",
-            "        dirs_exist_ok=True",
-            "    )",
-        )
+    output = io.StringIO()
+    writer = Writer(output)
+    writer.line(
+        "html_theme = 'furo'",
+        "",
+        "import shutil",
+        "import os",
+        "def setup(app):",
+        "    shutil.copytree(",
+        f"        os.path.join('{doxygen_path}', 'html'),",
+        "        os.path.join(app.outdir, 'doxygen'),",
+        "        dirs_exist_ok=True",
+        "    )",
+    )
+    write_if_changed(os.path.join(sphinx_dir, "conf.py"), output.getvalue())
 
-    with open(os.path.join(sphinx_dir, "index.rst"), "w", encoding="utf-8") as output:
-        writer = SphinxWriter(output)
-        writer.title("Rizin Python Bindings")
-        writer.line(
-            ".. toctree::",
-            "   classes",
-        )
+    output = io.StringIO()
+    writer = SphinxWriter(output)
+    writer.title("Rizin Python Bindings")
+    writer.line(
+        ".. toctree::",
+        "   classes",
+    )
+    write_if_changed(os.path.join(sphinx_dir, "index.rst"), output.getvalue())
 
     if doxygen_path:
-        tree = ET.parse(os.path.join(doxygen_path, "xml", "index.xml"))
-
-        for filenode in tree.findall("./compound[@kind='file']"):
-            refid = filenode.attrib["refid"]
-            filename = filenode.findtext("name")
-            assert filename
-
-            for membernode in filenode.findall("./member"):
-                name = membernode.findtext("name")
-                kind = membernode.attrib["kind"]
-                if kind == "function":
-                    assert name
-                    doxygen_functions.function_files[name].append(
-                        DoxygenFile(
-                            name=filename,
-                            refid=refid,
-                            path=os.path.join(doxygen_path, "xml", f"{refid}.xml"),
-                        )
-                    )
+        index_doxygen(
+            {
+                func.cfunc.name
+                for cls in classes.values()
+                for func in chain(cls.funcs.values(), cls.methods.values())
+            }
+        )
 
-    generate_classes(sphinx_dir)
+    generate_classes(sphinx_dir, jobs)
 
 
-def generate_classes(sphinx_dir: str) -> None:
+def generate_classes(sphinx_dir: str, jobs: Optional[int]) -> None:
     """
     Generate sphinx classes docs
 
     Writes documentation for each class
-    in sphinx_output/classes directory
+    in sphinx_output/classes directory,
+    in worker processes if jobs is not 1
 
     Writes each class doc file to the table of contents
     tree in classes.rst
     """
-    with open(os.path.join(sphinx_dir, "classes.rst"), "w", encoding="utf-8") as output:
-        writer = SphinxWriter(output)
-        writer.title("Classes")
+    output = io.StringIO()
+    writer = SphinxWriter(output)
+    writer.title("Classes")
 
-        with writer.directive("toctree"):
-            for classname in sorted(classes):
-                writer.line(f"classes/{classname}")
+    with writer.directive("toctree"):
+        for classname in sorted(classes):
+            writer.line(f"classes/{classname}")
+    write_if_changed(os.path.join(sphinx_dir, "classes.rst"), output.getvalue())
 
     classes_dir = os.path.join(sphinx_dir, "classes")
     with suppress(FileExistsError):
         os.mkdir(classes_dir)
 
-    for name, cls in classes.items():
-        with open(
-            os.path.join(classes_dir, f"{name}.rst"), "w", encoding="utf-8"
-        ) as output:
-            write_class(SphinxWriter(output), cls)
+    # Remove the pages of classes which are no longer bound
+    for filename in os.listdir(classes_dir):
+        name, ext = os.path.splitext(filename)
+        if ext == ".rst" and name not in classes:
+            os.remove(os.path.join(classes_dir, filename))
+
+    names = sorted(classes)
+    paths = [os.path.join(classes_dir, f"{name}.rst") for name in names]
+    pages = [classes[name] for name in names]
+    functions: List[Optional[Dict[str, DoxygenFunction]]] = [
+        (
+            {
+                func.cfunc.name: doxygen_functions[func.cfunc.name]
+                for func in chain(cls.funcs.values(), cls.methods.values())
+                if func.cfunc.name in doxygen_functions
+            }
+            if doxygen_path
+            else None
+        )
+        for cls in pages
+    ]
+
+    if jobs == 1:
+        written = list(map(write_class_page, paths, pages, functions))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            written = list(executor.map(write_class_page, paths, pages, functions))
+
+    print(f"[INFO] Sphinx: {sum(written)} of {len(written)} class pages changed")
+
+
+def write_class_page(
+    path: str, cls: Class, functions: Optional[Dict[str, DoxygenFunction]]
+) -> bool:
+    """
+    Write the page of a class to path, unless it did not change
+
+    functions holds the documentation of the functions of the class
+    (None without Doxygen), since worker processes do not read
+    Doxygen's XML themselves
+
+    Returns whether the page was written
+    """
+    if functions is not None:
+        doxygen_functions.update(functions)
+
+    output = io.StringIO()
+    write_class(SphinxWriter(output), cls, doxygen=functions is not None)
+    return write_if_changed(path, output.getvalue())
 
 
-def write_class(writer: SphinxWriter, cls: Class) -> None:
+def write_class(writer: SphinxWriter, cls: Class, *, doxygen: bool) -> None:
     """
-    Generate sphinx class
+    Generate sphinx class, with the Doxygen documentation of its functions if doxygen
     """
     writer.title(cls.name)
 
@@ -300,7 +526,7 @@ def write_class(writer: SphinxWriter, cls: Class) -> None:
         def stringify_func(name: str, func: Func, method: bool = True) -> str:
             args = []
             for arg in func.cfunc.args[1:] if method else func.cfunc.args:
-                arg_name = arg.cursor.spelling
+                arg_name = arg.name
                 if arg_name == "self":
                     arg_name = "_self"
                 args.append(f"{arg_name}: {stringify_ctype(arg.ctype)}")
@@ -318,11 +544,11 @@ def write_class(writer: SphinxWriter, cls: Class) -> None:
                     if "RZ_DEPRECATE" in func.cfunc.attrs:
                         with writer.directive("warning"):
                             writer.line(
-                                f"Calls deprecated function ``{func.cfunc.cursor.spelling}``"
+                                f"Calls deprecated function ``{func.cfunc.name}``"
                             )
 
-                    if doxygen_path:
-                        write_doxygen_function(writer, func.cfunc.cursor.spelling)
+                    if doxygen:
+                        write_doxygen_function(writer, func.cfunc.name)
 
 
 doxygen_escape_table = str.maketrans({"*": "\\*", "_": "\\_"})
@@ -432,9 +658,11 @@ def write_doxygen_function(writer: SphinxWriter, name: str) -> None:
     """
     Generate documentation for function from doxygen xml
     """
-    element = doxygen_functions[name]
+    if name not in doxygen_functions:
+        raise Exception(f"Function {name} not found in any file")
 
-    doxygen_file = doxygen_functions.function_files[name][0]
+    element = doxygen_functions[name].element
+    doxygen_file = doxygen_functions[name].file
     url_hash = element.attrib["id"][-33:]
     writer.line(
         f"Calls function ``{name}``",
@@ -508,12 +736,11 @@ def stringify_ctype(ctype: CType) -> str:
         else:
             break
 
-        kind = ctype.type_.kind
-        if levels == 0:
-            if kind == TypeKind.VOID:
+        if levels == 0 and isinstance(ctype, CPrimitiveType):
+            if ctype.kind == "VOID":
                 inner = "Any"
                 break
-            if kind in [TypeKind.SCHAR, TypeKind.CHAR_S]:
+            if ctype.kind in ["SCHAR", "CHAR_S"]:
                 inner = "str"
                 break
 
@@ -521,14 +748,14 @@ def stringify_ctype(ctype: CType) -> str:
 
     def stringify_ctype_primitive(ctype: CType) -> str:
         if isinstance(ctype, CPrimitiveType):
-            kind = ctype.type_.kind
-            if kind == TypeKind.VOID:
+            kind = ctype.kind
+            if kind == "VOID":
                 return "None"
 
-            if kind == TypeKind.BOOL:
+            if kind == "BOOL":
                 return "bool"
 
-            if kind in [TypeKind.FLOAT, TypeKind.DOUBLE]:
+            if kind in ["FLOAT", "DOUBLE"]:
                 return "float"
 
             return "int"
@@ -541,7 +768,7 @@ def stringify_ctype(ctype: CType) -> str:
         if isinstance(ctype, CTypedefType):
             if isinstance(ctype.canonical, CRecordType) and ctype.canonical.generic:
                 return stringify_ctype(ctype.canonical)
-            return ctype.cursor.spelling
+            return ctype.name
 
         if isinstance(ctype, CFunctionType):
             result = stringify_ctype(ctype.result)
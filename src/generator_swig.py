@@ -3,11 +3,22 @@ SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
 SPDX-License-Identifier: LGPL-3.0-only
 """
 
+from typing import (
+    Dict,
+    DefaultDict,
+    OrderedDict,
+    Set,
+    TypedDict,
+    Optional,
+    cast,
+)
+
+import io
 import os
+import json
+import hashlib
 from enum import Enum as PyEnum
 
-from clang.cindex import TypeKind
-
 from cparser_header import headers
 from cparser_types import (
     CType,
@@ -25,58 +36,291 @@ from binding_class import Class, classes, class_structs
 from binding_func import Func, GenericFunc
 from binding_director import Director, directors
 from binding_enum import Enum, enums, macro_enums
-from writer import Writer
+from writer import Writer, write_if_changed
+from generator_swig_modules import (
+    Output,
+    module_names,
+    module_dependencies,
+    struct_module,
+    specialization_module,
+)
 
 
-def generate(output_dir: str) -> None:
+class Section(TypedDict):
     """
-    Generate SWIG bindings and write to output_dir/rizin.i
+    Manifest entry for a section of a SWIG interface file
+    """
+
+    header: Optional[str]
+    sha256: str
+
+
+def generate(output_dir: str, *, split_modules: bool = False) -> None:
+    """
+    Generate SWIG bindings and write to output_dir/rizin.i, or
+    output_dir/rizin_<group>.i and a rizin.py facade if split_modules
+    """
+    output = Output(split_modules)
+    write(output)
+
+    for swig_module, writer in output.writers.items():
+        write_interface(
+            output_dir, swig_module, writer, output.section_headers[swig_module]
+        )
+
+    if split_modules:
+        facade = io.StringIO()
+        write_facade(Writer(facade), output)
+        write_if_changed(os.path.join(output_dir, "rizin.py"), facade.getvalue())
+
+
+def write_interface(
+    output_dir: str,
+    swig_module: str,
+    writer: Writer,
+    section_headers: Dict[str, Optional[str]],
+) -> None:
     """
-    output_path = os.path.join(output_dir, "rizin.i")
-    with open(output_path, "w", encoding="utf-8") as output_file:
-        write(Writer(output_file))
+    Write output_dir/<swig_module>.i
+
+    The file is only rewritten if its contents changed, so that its
+    mtime is kept and SWIG and the C++ compiler are not rerun.
+    <swig_module>.i.json records the header each section was generated
+    from, to report which parts of the output were affected by a change.
+    """
+    filename = f"{swig_module}.i"
+    output_path = os.path.join(output_dir, filename)
+    manifest_path = os.path.join(output_dir, f"{filename}.json")
+
+    manifest: OrderedDict[str, Section] = OrderedDict()
+    for name, text in writer.sections.items():
+        manifest[name] = {
+            "header": section_headers[name],
+            "sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        }
+
+    previous: Dict[str, Section] = {}
+    try:
+        with open(manifest_path, encoding="utf-8") as manifest_file:
+            previous = cast(Dict[str, Section], json.load(manifest_file))
+    except (OSError, ValueError):
+        pass
+
+    assert isinstance(writer.output, io.StringIO)
+    if write_if_changed(output_path, writer.output.getvalue()):
+        changed = [
+            section
+            for name, section in manifest.items()
+            if previous.get(name) != section
+        ] + [section for name, section in previous.items() if name not in manifest]
+        changed_headers = sorted(
+            {section["header"] for section in changed if section["header"]}
+        )
+        print(
+            f"[INFO] {filename}: {len(changed)} sections changed, "
+            f"from headers: {', '.join(changed_headers) or '(none)'}"
+        )
+    else:
+        print(f"[INFO] {filename}: unchanged")
+
+    write_if_changed(manifest_path, json.dumps(manifest, indent=1) + "\n")
+
+
+def write_facade(writer: Writer, output: Output) -> None:
+    """
+    Generate the rizin Python module for split SWIG modules
+
+    Modules are only imported once one of their names is used
+    (PEP 562), so scripts only load the groups they need. Names
+    which are not generated from the bindings (eg. cvar) are
+    searched for in all modules, starting with the shared one.
+    """
+    swig_modules = [output.swig_module(module) for module in output.modules]
+    writer.line(
+        '"""',
+        f"Rizin bindings, split into the {', '.join(swig_modules)} modules",
+        "",
+        "Modules are imported on first use of one of their names",
+        '"""',
+        "",
+        "import importlib",
+        "",
+        "_module_names = {",
+    )
+    names = module_names(output)
+    with writer.indent():
+        for module, swig_module in zip(output.modules, swig_modules):
+            writer.line(f'"{swig_module}": (')
+            with writer.indent():
+                writer.line(*(f'"{name}",' for name in names[module]))
+            writer.line("),")
+    writer.line("}", "")
+    writer.snippet("snippets_swig/facade.py")
 
 
-def write(writer: Writer) -> None:
+def write(output: Output) -> None:
     """
     Toplevel SWIG generator
     """
-    writer.line("%module(directors=1) rizin")
-    writer.line("%{")
-    for header in headers:
-        writer.line(f"#include <{header.name}>")
-    writer.line("%}")
+    for module in output.modules:
+        with output.section("prologue", None, module) as writer:
+            write_prologue(writer, output, module)
+
+    # With split modules, each Python module
+    # only imports the modules it depends on
+    if output.split_modules:
+        for module in output.modules:
+            with output.section("proxy imports", None, module) as writer:
+                writer.line("%pythoncode %{")
+                for dependency in module_dependencies(output, module):
+                    writer.line(f"import {output.swig_module(dependency)}")
+                writer.line("%}")
 
-    writer.snippet("snippets_swig/prologue.i")
-    writer.snippet("snippets_swig/cmd_director.i")
+    with output.section("cmd_director", None, struct_module("rz_cmd_t")) as writer:
+        writer.snippet("snippets_swig/cmd_director.i")
 
-    writer.line("%pythoncode %{")
-    writer.snippet("snippets_swig/iterators.py")
-    writer.line("%}")
+    # Generics' methods use the iterators,
+    # so every module needs its own copy
+    for module in output.modules:
+        with output.section("iterators", None, module) as writer:
+            writer.snippet("snippets_swig/native_iterator.i")
+            writer.snippet("snippets_swig/native_buffer.i")
+            writer.snippet("snippets_swig/native_columns.i")
 
     for generic in generics.values():
-        write_generic(writer, generic)
+        with output.section(f"generic {generic.name}", generic.header) as writer:
+            write_generic(writer, generic)
+
+    # Imported modules use the generics' macros, so the shared
+    # module can only import them once those are defined
+    with output.section("imports", None) as writer:
+        write_imports(writer, output, output.shared_module)
+
+    write_all_specializations(output)
 
     for cls in classes.values():
-        write_class(writer, cls)
+        with output.section(f"class {cls.name}", cls.header) as writer:
+            write_class(writer, cls)
 
     for director in directors.values():
-        write_director(writer, director)
+        with output.section(f"director {director.name}", director.header) as writer:
+            write_director(writer, director)
 
     for enum in enums:
-        write_enum(writer, enum)
+        with output.section(f"enum {enum.typedef_name}", enum.header) as writer:
+            write_enum(writer, enum)
 
-    for macro_enum in macro_enums:
-        for name, definition in macro_enum.defines.items():
-            writer.line(f"#define {name} {definition}")
+    for i, macro_enum in enumerate(macro_enums):
+        with output.section(f"defines {i}", macro_enum.header) as writer:
+            for name, definition in macro_enum.defines.items():
+                writer.line(f"#define {name} {definition}")
 
-    writer.line("%extend rz_cmd_t {")
-    writer.snippet("snippets_swig/register_swig_command.cpp")  # TODO: %catches
-    writer.line("}")
+    with output.section("rz_cmd_t", None, struct_module("rz_cmd_t")) as writer:
+        # Errors are thrown as strings
+        writer.line(
+            "%catches(const char *) rz_cmd_t::register_swig_command;",
+            "%catches(const char *) rz_cmd_t::unregister_swig_command;",
+            "%extend rz_cmd_t {",
+        )
+        writer.snippet("snippets_swig/register_swig_command.cpp")
+        writer.line("}")
+
+    # Not all binding specifications bind RzBuffer
+    if "rz_buf_t" in class_structs:
+        with output.section("rz_buf_t", None, struct_module("rz_buf_t")) as writer:
+            writer.line("%extend rz_buf_t {")
+            writer.snippet("snippets_swig/rz_buffer.i")
+            writer.line("}", "%pythoncode %{")
+            writer.snippet("snippets_swig/rz_buffer_file.py")
+            writer.line("%}")
+
+    with output.section("rz_core_t", None, struct_module("rz_core_t")) as writer:
+        writer.line("%extend rz_core_t {", "%pythoncode %{")
+        writer.snippet("snippets_swig/register_command.py")
+        writer.line("%}", "}")
+
+
+def write_all_specializations(output: Output) -> None:
+    """
+    Generate the specializations of all generics, to the modules
+    given by specialization_module, with the declarations they need
+    """
+    # Class specializations are written to the module of their class,
+    # and their methods need its columns to be declared first
+    for cls in classes.values():
+        if any(
+            cls.name in generic.specializations
+            for generic in generics.values()
+            if generic.elements or generic.append
+        ):
+            with output.section(f"columns {cls.name}", cls.header) as writer:
+                write_columns(writer, cls)
+
+    for generic in generics.values():
+        modules: DefaultDict[str, Set[str]] = DefaultDict(set)
+        for specialization in sorted(
+            generic.specializations | generic.specialization_extensions.keys()
+        ):
+            modules[specialization_module(output, generic, specialization)].add(
+                specialization
+            )
+
+        for module, specializations in modules.items():
+            with output.section(
+                f"specializations {generic.name}", generic.header, module
+            ) as writer:
+                write_specializations(writer, generic, specializations)
+
+    # A specialization's C typedef is only emitted by the module
+    # expanding its macro, so give it to the other modules as well
+    if output.split_modules:
+        for module in output.modules:
+            with output.section("specialization typedefs", None, module) as writer:
+                writer.line("%{")
+                for generic in generics.values():
+                    for specialization in sorted(generic.specializations):
+                        writer.line(
+                            f"typedef {generic.name} {generic.name}_{specialization};"
+                        )
+                writer.line("%}")
+
+
+def write_prologue(writer: Writer, output: Output, module: str) -> None:
+    """
+    Generate the start of a SWIG module
 
-    writer.line("%extend rz_core_t {", "%pythoncode %{")
-    writer.snippet("snippets_swig/register_command.py")
-    writer.line("%}", "}")
+    Modules other than the shared one get declarations from
+    the shared prologue and all other modules through %import
+    """
+    # noproxy=1 stops the Python modules %import'ing this one from
+    # importing it, as they only import the modules they depend on
+    options = "directors=1, noproxy=1" if output.split_modules else "directors=1"
+    writer.line(f"%module({options}) {output.swig_module(module)}")
+    writer.line("%{")
+    for header in headers:
+        writer.line(f"#include <{header.name}>")
+    writer.line("%}")
+
+    if module == output.shared_module:
+        writer.snippet("snippets_swig/prologue.i")
+    else:
+        write_imports(writer, output, module)
+
+        shared_extension = f"_{output.swig_module(output.shared_module)}"
+        writer.line("%{", f'#define RIZIN_SHARED_MODULE "{shared_extension}"', "%}")
+        writer.snippet("snippets_swig/module_prologue.i")
+
+    writer.snippet("snippets_swig/threads.i")
+
+
+def write_imports(writer: Writer, output: Output, module: str) -> None:
+    """
+    Generate %import's of all other modules, starting with the
+    shared one, so that types from other modules are known
+    """
+    for other in output.modules:
+        if other != module:
+            writer.line(f'%import "{output.swig_module(other)}.i"')
 
 
 class FuncKind(PyEnum):
@@ -93,7 +337,7 @@ class FuncKind(PyEnum):
 
 def write_generic(writer: Writer, generic: Generic) -> None:
     """
-    Generate generic definition and specializations
+    Generate generic definition
 
     Generics are implemented with a macro definition
     which takes in a TYPE argument
@@ -114,6 +358,58 @@ def write_generic(writer: Writer, generic: Generic) -> None:
             for name, method in generic.methods.items():
                 write_func(writer, method, name, FuncKind.GENERIC)
 
+            # Each element only takes a C step and a conversion,
+            # instead of python calls to the generic's methods
+            if generic.elements:
+                for decl, call in (
+                    ("__iter__()", "rizin_iterator_new(elements)"),
+                    ("to_list()", "rizin_elements_list(elements)"),
+                    (
+                        "__getitem__(PyObject *key)",
+                        "rizin_elements_getitem(elements, key)",
+                    ),
+                ):
+                    writer.line(f"PyObject *{decl} {{")
+                    with writer.indent():
+                        write_elements(writer, generic)
+                        writer.line(f"return {call};")
+                    writer.line("}")
+
+            # Fields of class elements (see native_columns.i)
+            if generic.elements:
+                writer.line("PyObject *_to_columns(PyObject *fields) {")
+                with writer.indent():
+                    write_elements(writer, generic)
+                    writer.line(
+                        "return rizin_columns_get(elements, "
+                        "rizin_columns<TYPE>(), fields);"
+                    )
+                writer.line("}")
+            if generic.append:
+                writer.line("PyObject *_extend_columns(PyObject *columns) {")
+                with writer.indent():
+                    writer.line("auto append = [](void *container, void *element) {")
+                    with writer.indent():
+                        writer.line(*generic.append)
+                    writer.line(
+                        "};",
+                        "return rizin_columns_extend($self, append, "
+                        "rizin_columns<TYPE>(), columns);",
+                    )
+                writer.line("}")
+
+            # The python method passes its self, to be kept alive by the view
+            if generic.buffer:
+                data, length = generic.buffer
+                writer.line("PyObject *_memoryview(PyObject *owner) {")
+                with writer.indent():
+                    writer.line(
+                        f"return rizin_buffer_memoryview(owner, {data}, "
+                        f"(size_t){length},",
+                        "    rizin_buffer_format<TYPE>(), sizeof(TYPE), false);",
+                    )
+                writer.line("}")
+
             for python_lines in generic.python_methods.values():
                 writer.line("%pythoncode %{")
                 with writer.indent():
@@ -122,10 +418,37 @@ def write_generic(writer: Writer, generic: Generic) -> None:
         writer.line("}")
     writer.line("%enddef")
 
-    for specialization in generic.specializations:
+
+def write_elements(writer: Writer, generic: Generic) -> None:
+    """
+    Generate the RizinElements of $self (see native_iterator.i)
+    """
+    assert generic.elements
+    begin, length, step = generic.elements
+    writer.line("auto step = [](void **cursor) -> void * {")
+    with writer.indent():
+        writer.line(*step)
+    writer.line(
+        "};",
+        f"RizinElements elements = {{{begin}, (size_t){length}, step,",
+        "    rizin_element_convert<TYPE>, $descriptor(TYPE *)};",
+    )
+
+
+def write_specializations(
+    writer: Writer, generic: Generic, specializations: Set[str]
+) -> None:
+    """
+    Generate the given specializations of a generic, and
+    their specialization-only extensions
+    """
+    # Sorted so that the output is the same between runs
+    for specialization in sorted(generic.specializations & specializations):
         writer.line(f"%{generic.name}({specialization})")
 
     for specialization, extension in generic.specialization_extensions.items():
+        if specialization not in specializations:
+            continue
         writer.line(f"%extend {generic.name}_{specialization} {{")
         with writer.indent():
             writer.line(*extension)
@@ -140,15 +463,15 @@ def stringify_decl(expr: str, ctype: CType, generic: bool = False) -> str:
     pointing = False
     while True:
         if isinstance(ctype, CPrimitiveType):
-            if ctype.type_.kind == TypeKind.BOOL:
+            if ctype.kind == "BOOL":
                 return f"bool {expr}"
-            if generic and ctype.type_.kind == TypeKind.VOID:
+            if generic and ctype.kind == "VOID":
                 return f"TYPE {expr}"
-            return f"{ctype.type_.spelling} {expr}"
+            return f"{ctype.spelling} {expr}"
 
-        # type_.spelling automatically applies const
+        # spelling automatically applies const
         # for other ctypes, do so manually
-        if ctype.type_.is_const_qualified():
+        if ctype.const:
             expr = "const " + expr
 
         if isinstance(ctype, CPointerType):
@@ -170,7 +493,7 @@ def stringify_decl(expr: str, ctype: CType, generic: bool = False) -> str:
             ):
                 ctype = ctype.canonical
                 continue
-            return f"{ctype.cursor.spelling} {expr}"
+            return f"{ctype.name} {expr}"
 
         # Wrap in parentheses if the previous node
         # was a pointer (to fix precedence)
@@ -235,6 +558,31 @@ def write_class(writer: Writer, cls: Class) -> None:
         writer.line("}")
 
 
+def write_columns(writer: Writer, cls: Class) -> None:
+    """
+    Generate the fields of a class which can be
+    converted to and from columns (see native_columns.i)
+    """
+    writer.line(
+        "%{",
+        "template <>",
+        f"SWIGUNUSED const RizinColumns *rizin_columns<{cls.name}>() {{",
+    )
+    with writer.indent():
+        writer.line("static const RizinColumn fields[] = {")
+        with writer.indent():
+            for field in cls.column_fields():
+                name = field.rename or field.name
+                writer.line(f'RIZIN_COLUMN({cls.name}, "{name}", {field.name}),')
+            writer.line("{NULL},")
+        writer.line(
+            "};",
+            f"static const RizinColumns columns = {{sizeof({cls.name}), fields}};",
+            "return &columns;",
+        )
+    writer.line("}", "%}")
+
+
 def write_func(writer: Writer, func: Func, name: str, kind: FuncKind) -> None:
     """
     Generate SWIG function
@@ -261,14 +609,14 @@ def write_func(writer: Writer, func: Func, name: str, kind: FuncKind) -> None:
     args_nonnull = []  # Used for nullability contract
 
     for arg in args:
-        arg_name = arg.cursor.spelling
+        arg_name = arg.name
         if arg_name == "self":
             arg_name = "_self"
 
         arg_decl = stringify_decl(
             arg_name,
             arg.ctype,
-            isinstance(func, GenericFunc) and arg.cursor.spelling in func.generic_args,
+            isinstance(func, GenericFunc) and arg.name in func.generic_args,
         )
 
         if arg.default:
@@ -302,9 +650,11 @@ def write_func(writer: Writer, func: Func, name: str, kind: FuncKind) -> None:
 
     with writer.indent():
         if "RZ_DEPRECATE" in func.cfunc.attrs:
-            writer.line(
-                f'rizin_try_warn_deprecate("{name}", "{func.cfunc.cursor.spelling}");'
-            )
+            writer.line(f'rizin_try_warn_deprecate("{name}", "{func.cfunc.name}");')
+
+        # Reacquired once the result was returned
+        if func.release_gil:
+            writer.line("RizinAllowThreads allow_threads;")
 
         if kind == FuncKind.GENERIC:
             typecast = stringify_decl(
@@ -312,11 +662,9 @@ def write_func(writer: Writer, func: Func, name: str, kind: FuncKind) -> None:
                 func.cfunc.result_ctype,
                 isinstance(func, GenericFunc) and func.generic_ret,
             )
-            writer.line(
-                f"return ({typecast}){func.cfunc.cursor.spelling}({args_inner_str});"
-            )
+            writer.line(f"return ({typecast}){func.cfunc.name}({args_inner_str});")
         else:
-            writer.line(f"return {func.cfunc.cursor.spelling}({args_inner_str});")
+            writer.line(f"return {func.cfunc.name}({args_inner_str});")
 
     writer.line("}")
 
@@ -350,10 +698,12 @@ def write_director(writer: Writer, director: Director) -> None:
         writer.line(f"virtual ~{director.name}Director() {{}}")
     writer.line("};", "%}")
 
-    # Global
+    # Rizin does not pass the plugin to its functions, so each slot gets
+    # its own functions, which call into the director built in that slot
     writer.line(
         "%{",
-        f"static {director.name}Director *SWIG_{director.name}Director = NULL;",
+        f"static {director.name}Director *SWIG_{director.name}Directors[{director.slots}];",
+        f"static {director.name} *SWIG_{director.name}Plugins[{director.slots}];",
         "%}",
     )
 
@@ -365,14 +715,31 @@ def write_director(writer: Writer, director: Director) -> None:
             stringify_decl(arg.name, arg.ctype) for arg in func.args
         )
         args_inner_str = ", ".join(arg.name for arg in func.args)
+        slot_funcs = ", ".join(
+            f"SWIG_{director.name}_{name}<{slot}>" for slot in range(director.slots)
+        )
         writer.line(
-            f"{decl}({args_outer_str}) {{",
-            f"    return SWIG_{director.name}Director->{name}({args_inner_str});",
+            "template <size_t slot>",
+            f"static {decl}({args_outer_str}) {{",
+            "    RizinGILState gil_state;",
+            f"    return SWIG_{director.name}Directors[slot]->{name}({args_inner_str});",
             "}",
+            f"static decltype(&SWIG_{director.name}_{name}<0>) const "
+            f"SWIG_{director.name}_{name}_slots[] = {{{slot_funcs}}};",
         )
     writer.line("%}")
 
     # Builder struct
+    writer.line(
+        f"%exception {director.name}Builder::build {{",
+        "    $action",
+        "    if (!result) {",
+        "        PyErr_SetString(PyExc_RuntimeError,",
+        f'            "All {director.slots} {director.name} slots are in use");',
+        "        SWIG_fail;",
+        "    }",
+        "}",
+    )
     writer.line("%inline %{", f"struct {director.name}Builder {{")
     with writer.indent():
         for func_name in director.funcs.keys():
@@ -385,13 +752,31 @@ def write_director(writer: Writer, director: Director) -> None:
         writer.line(f"{director.name} *build({director.name}Director *director) {{")
         with writer.indent():
             writer.line(
-                f"SWIG_{director.name}Director = director;",
+                "size_t slot = 0;",
+                f"while (slot < {director.slots} && SWIG_{director.name}Directors[slot]) {{",
+                "    slot++;",
+                "}",
+                f"if (slot == {director.slots}) {{",
+                "    return NULL;",
+                "}",
                 f"{director.name} *result = ({director.name}*)calloc(1, sizeof({director.name}));",
+                f"SWIG_{director.name}Directors[slot] = director;",
+                f"SWIG_{director.name}Plugins[slot] = result;",
+                "",
+                "// The slot owns the director until release",
+                "Swig::Director *owner = dynamic_cast<Swig::Director *>(director);",
+                "if (owner) {",
+                "    PyObject *self = owner->swig_get_self();",
+                '    if (PyObject_SetAttrString(self, "thisown", Py_False) < 0) {',
+                "        PyErr_Clear();",
+                "    }",
+                "    owner->swig_disown();",
+                "}",
             )
             for func_name in director.funcs.keys():
                 writer.line(
                     f"if (this->enable_{func_name}) {{",
-                    f"    result->{func_name} = SWIG_{director.name}_{func_name};",
+                    f"    result->{func_name} = SWIG_{director.name}_{func_name}_slots[slot];",
                     "}",
                 )
 
@@ -400,6 +785,25 @@ def write_director(writer: Writer, director: Director) -> None:
 
             writer.line("return result;")
         writer.line("}")
+
+        # Once the plugin was removed from Rizin
+        writer.line(f"static void release({director.name} *plugin) {{")
+        with writer.indent():
+            writer.line(
+                f"for (size_t slot = 0; slot < {director.slots}; slot++) {{",
+                f"    if (SWIG_{director.name}Plugins[slot] == plugin) {{",
+                f"        {director.name}Director *director = SWIG_{director.name}Directors[slot];",
+                "        // Also releases the python object of the director",
+                "        if (dynamic_cast<Swig::Director *>(director)) {",
+                "            delete director;",
+                "        }",
+                f"        SWIG_{director.name}Directors[slot] = NULL;",
+                f"        SWIG_{director.name}Plugins[slot] = NULL;",
+                "    }",
+                "}",
+                "free(plugin);",
+            )
+        writer.line("}")
     writer.line("};", "%}")
 
     # Python helper
@@ -0,0 +1,229 @@
+"""
+SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+SPDX-License-Identifier: LGPL-3.0-only
+
+The SWIG modules being generated, and which of them
+each part of the bindings is written to
+"""
+
+from typing import Iterator, List, Dict, OrderedDict, Set, Optional
+
+import io
+from contextlib import contextmanager
+
+from cparser_header import Header, headers
+from cparser_types import (
+    CType,
+    CPointerType,
+    CRecordType,
+    CFunctionType,
+    CArrayType,
+    CTypedefType,
+    CPrimitiveType,
+    assert_never,
+)
+from binding_generic import Generic, generics
+from binding_class import classes, class_structs
+from binding_func import Func, GenericFunc
+from binding_director import directors
+from binding_enum import enums, macro_enums
+from writer import Writer
+
+
+class Output:
+    """
+    The SWIG interface files being generated, and the
+    header each of their sections was generated from
+
+    By default, everything is written to the rizin module. With
+    split_modules, each group of headers (see threaded_header in
+    binding_header.py) gets its own rizin_<group> module, which %import's
+    the others, so that the wrappers can be compiled in parallel.
+    The first group holds the shared prologue.
+    """
+
+    split_modules: bool
+    modules: List[str]
+    writers: OrderedDict[str, Writer]
+    section_headers: Dict[str, Dict[str, Optional[str]]]
+
+    def __init__(self, split_modules: bool):
+        self.split_modules = split_modules
+        self.modules = []
+        for header in headers:
+            if header.module not in self.modules:
+                self.modules.append(header.module)
+        if not split_modules:
+            self.modules = self.modules[:1]
+
+        self.writers = OrderedDict()
+        self.section_headers = {}
+        for module in self.modules:
+            swig_module = self.swig_module(module)
+            self.writers[swig_module] = Writer(io.StringIO())
+            self.section_headers[swig_module] = {}
+
+    @property
+    def shared_module(self) -> str:
+        """
+        Get the group holding the shared prologue
+        """
+        return self.modules[0]
+
+    def swig_module(self, module: str) -> str:
+        """
+        Get the SWIG module name of a group of headers
+        """
+        return f"rizin_{module}" if self.split_modules else "rizin"
+
+    @contextmanager
+    def section(
+        self, name: str, header: Optional[Header], module: Optional[str] = None
+    ) -> Iterator[Writer]:
+        """
+        Write a section to the module of the given group, which defaults
+        to the group of header, or the shared group if header is None
+        """
+        if not module:
+            module = header.module if header else self.shared_module
+
+        swig_module = self.swig_module(module)
+        self.section_headers[swig_module][name] = header.name if header else None
+
+        writer = self.writers[swig_module]
+        with writer.section(name):
+            yield writer
+
+
+def module_names(output: Output) -> Dict[str, List[str]]:
+    """
+    Get the Python names generated for each group
+    """
+    names: Dict[str, List[str]] = {module: [] for module in output.modules}
+
+    for generic in generics.values():
+        for specialization in sorted(
+            generic.specializations | generic.specialization_extensions.keys()
+        ):
+            module = specialization_module(output, generic, specialization)
+            names[module].append(f"{generic.name}_{specialization}")
+
+    for cls in classes.values():
+        names[cls.header.module].append(cls.name)
+
+    for director in directors.values():
+        names[director.header.module] += [
+            f"{director.name}Director",
+            f"{director.name}Builder",
+            f"register_{director.name}",
+        ]
+
+    for enum in enums:
+        names[enum.header.module] += enum.fields.keys()
+
+    for macro_enum in macro_enums:
+        names[macro_enum.header.module] += macro_enum.defines.keys()
+
+    return names
+
+
+def module_dependencies(output: Output, module: str) -> List[str]:
+    """
+    Get the groups with classes used by the wrappers of a group
+
+    Their Python modules must be imported along with it, since SWIG
+    can only return instances of classes whose module was imported
+    """
+    dependencies = {output.shared_module}
+
+    for cls in classes.values():
+        if cls.header.module != module:
+            continue
+
+        for field in cls.fields.values():
+            dependencies |= ctype_modules(output, field.ctype)
+
+        funcs = [cls.constructor, cls.destructor]
+        funcs += [*cls.funcs.values(), *cls.methods.values()]
+        for func in funcs:
+            if func:
+                dependencies |= func_modules(output, func)
+
+    for generic in generics.values():
+        for specialization in generic.specializations:
+            if specialization_module(output, generic, specialization) != module:
+                continue
+
+            # Generic args and results are instances of the specialization
+            specialization_cls = classes.get(specialization)
+            if specialization_cls:
+                dependencies.add(specialization_cls.header.module)
+
+            for method in generic.methods.values():
+                dependencies |= func_modules(output, method)
+
+    return [other for other in output.modules if other in dependencies - {module}]
+
+
+def func_modules(output: Output, func: Func) -> Set[str]:
+    """
+    Get the groups with classes used by a function's args and result
+    """
+    result: Set[str] = set()
+
+    if not (isinstance(func, GenericFunc) and func.generic_ret):
+        result |= ctype_modules(output, func.cfunc.result_ctype)
+
+    for arg in func.cfunc.args:
+        if not (isinstance(func, GenericFunc) and arg.name in func.generic_args):
+            result |= ctype_modules(output, arg.ctype)
+
+    return result
+
+
+def ctype_modules(output: Output, ctype: CType) -> Set[str]:
+    """
+    Get the groups with classes used by a type
+    """
+    if isinstance(ctype, CPointerType):
+        return ctype_modules(output, ctype.pointee)
+    if isinstance(ctype, CArrayType):
+        return ctype_modules(output, ctype.element)
+    if isinstance(ctype, CTypedefType):
+        return ctype_modules(output, ctype.canonical)
+    if isinstance(ctype, CFunctionType):
+        result = ctype_modules(output, ctype.result)
+        for arg in ctype.args:
+            result |= ctype_modules(output, arg)
+        return result
+    if isinstance(ctype, CRecordType):
+        if ctype.generic and ctype.specialization:
+            return {specialization_module(output, ctype.generic, ctype.specialization)}
+
+        module = struct_module(ctype.decl_spelling)
+        return {module} if module else set()
+    if isinstance(ctype, CPrimitiveType):
+        return set()
+    assert_never(ctype)
+
+
+def struct_module(struct_name: str) -> Optional[str]:
+    """
+    Get the group of the class bound to a struct, if any
+    """
+    cls = class_structs.get(struct_name)
+    return cls.header.module if cls else None
+
+
+def specialization_module(output: Output, generic: Generic, specialization: str) -> str:
+    """
+    Get the group a specialization is written to
+
+    With split modules, specializations of bound classes
+    (eg. RzList_RzBinSymbol) go to the module of that class,
+    so they are not all compiled in the generic's module
+    """
+    cls = classes.get(specialization)
+    if output.split_modules and cls:
+        return cls.header.module
+    return generic.header.module
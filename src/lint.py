@@ -22,16 +22,37 @@ The linter also enforces consistency in type comments between function declarati
 and definitions. It also does this for Rizin annotations, such as RZ_OWN. This works
 by defining the RZ_BINDINGS preprocessor flag, which sets the annotations to expand to
 __attribute__((annotate)), which can be picked up by libclang.
+
+Translation units can be linted in parallel worker processes (--jobs),
+and the warnings of each are cached (--cache-dir) until it or one of the
+files it includes changes. Warnings are printed in the order of
+compile_commands.json either way.
+
+Declarations are identified by their file, line and USR, so that those of
+headers are only checked in the first translation unit including them.
+Functions with external linkage are compared in a table shared by all
+translation units, so that a declaration and a definition in different
+files are still compared.
+
+The annotations and type comments of RZ_API functions can be kept in an
+SQLite index (--index), which is updated with the declarations that changed.
+With --missing-ownership, the pointers returned or taken by those functions
+without an RZ_OWN or RZ_BORROW annotation are listed from the index.
 """
 
-from typing import List, Dict, Set, TypedDict, Optional, cast
+from typing import List, Dict, Set, Iterable, TypedDict, Optional, cast
 
 import os
 import sys
 import json
 import shlex
+import threading
+import sqlite3
+import concurrent.futures
 from argparse import ArgumentParser
-from dataclasses import dataclass
+from contextlib import closing
+from dataclasses import dataclass, asdict
+from functools import partial
 from itertools import zip_longest
 
 from clang.cindex import (
@@ -40,21 +61,37 @@ from clang.cindex import (
     TranslationUnitLoadError,
     Cursor,
     CursorKind,
+    LinkageKind,
     SourceRange,
     SourceLocation,
+    TypeKind,
 )
 
+import cparser_cache
 
-warnings = set()
+# Warnings of the translation unit being linted (see lint_file),
+# or of the function being compared (see merge)
+found: List[str] = []
 
 
 def warn(warning: str) -> None:
     """
-    Print a warning only once
+    Record a warning of the translation unit being linted
+    """
+    found.append(warning)
+
+
+warnings: Set[str] = set()
+
+
+def report(file_warnings: List[str]) -> None:
+    """
+    Print warnings, each only once
     """
-    if warning not in warnings:
-        print(warning)
-        warnings.add(warning)
+    for warning in file_warnings:
+        if warning not in warnings:
+            print(warning)
+            warnings.add(warning)
 
 
 def stringify_location(location: SourceLocation) -> str:
@@ -191,34 +228,51 @@ class Arg:
     Groups an argument's annotations and comment
     """
 
+    name: str
+    pointer: bool
     annotations: List[str]
     comment: Optional[str]
 
 
+@dataclass
 class Function:
     """
     Represents a libclang function cursor and facilitates diffing with other functions
     """
 
     name: str
+    location: str
+    api: bool  # Declared with RZ_API
+    pointer: bool  # Returns a pointer
     annotations: List[str]
     comment: Optional[str]
     args: List[Arg]
-    location: str
-
-    def __init__(self, cursor: Cursor):
-        self.name = cursor.spelling
-        self.location = stringify_location(cursor.location)
 
-        self.annotations = cursor_get_annotations(cursor)
-        self.comment = cursor_get_comment(cursor)
-
-        self.args = [
-            Arg(
-                annotations=cursor_get_annotations(arg), comment=cursor_get_comment(arg)
-            )
-            for arg in cursor.get_arguments()
-        ]
+    @staticmethod
+    def from_cursor(cursor: Cursor) -> "Function":
+        """
+        Read the annotations and comments of a function cursor
+        """
+        return Function(
+            name=cursor.spelling,
+            location=stringify_location(cursor.location),
+            api=any(
+                child.kind == CursorKind.VISIBILITY_ATTR
+                for child in cursor.get_children()
+            ),
+            pointer=cursor.result_type.get_canonical().kind == TypeKind.POINTER,
+            annotations=cursor_get_annotations(cursor),
+            comment=cursor_get_comment(cursor),
+            args=[
+                Arg(
+                    name=arg.spelling,
+                    pointer=arg.type.get_canonical().kind == TypeKind.POINTER,
+                    annotations=cursor_get_annotations(arg),
+                    comment=cursor_get_comment(arg),
+                )
+                for arg in cursor.get_arguments()
+            ],
+        )
 
     def diff(self, new: "Function") -> None:
         """
@@ -265,11 +319,46 @@ class Function:
                     )
 
 
+class Declaration(TypedDict):
+    """
+    A top-level declaration of a translation unit, identified across translation
+    units by its file, line and USR
+
+    Its warnings are None if it was checked in an earlier translation unit.
+    Its function is only set for functions with external linkage, which are
+    compared with their other declarations in the global function table.
+    """
+
+    key: str
+    warnings: Optional[List[str]]
+    function: Optional[Function]
+
+
+class Result(TypedDict):
+    """
+    The warnings of a translation unit (eg. diagnostics) and of its declarations
+    """
+
+    warnings: List[str]
+    declarations: List[Declaration]
+
+
+# Keys of the declarations checked by this process, so that
+# the declarations of headers are checked once per run
+checked: Set[str] = set()
+
+
 def check_translation_unit(
-    translation_unit: TranslationUnit, *, skipped_paths: Set[str], rizin_path: str
-) -> None:
+    translation_unit: TranslationUnit,
+    *,
+    skipped_paths: Set[str],
+    rizin_path: str,
+    deduplicate: bool,
+) -> List[Declaration]:
     """
     Check for issues in translation_unit
+
+    Declarations which were already checked are skipped if deduplicate is set
     """
 
     for diagnostic in translation_unit.diagnostics:
@@ -278,9 +367,16 @@ def check_translation_unit(
             f"{stringify_location(diagnostic.location)}: {diagnostic.spelling}"
         )
 
-    functions: Dict[str, Function] = {}
+    declarations: List[Declaration] = []
+
+    # Functions without external linkage are only declared again
+    # in the same translation unit, so they are compared here
+    local_functions: Dict[str, Function] = {}
 
     for cursor in translation_unit.cursor.get_children():
+        if cursor.kind not in [CursorKind.FUNCTION_DECL, CursorKind.STRUCT_DECL]:
+            continue
+
         cursor_file = cursor.location.file
         if not cursor_file:
             continue
@@ -292,13 +388,23 @@ def check_translation_unit(
         if abspath in skipped_paths:
             continue
 
-        if cursor.kind == CursorKind.FUNCTION_DECL:
-            function = Function(cursor)
+        key = f"{abspath}:{cursor.location.line}:{cursor.get_usr()}"
+        if deduplicate and key in checked:
+            declarations.append({"key": key, "warnings": None, "function": None})
+            continue
+        checked.add(key)
 
-            if function.name in functions:
-                function.diff(functions[function.name])
-            functions[function.name] = function
-        elif cursor.kind == CursorKind.STRUCT_DECL:
+        start = len(found)
+        function = None
+        if cursor.kind == CursorKind.FUNCTION_DECL:
+            function = Function.from_cursor(cursor)
+
+            if cursor.linkage != LinkageKind.EXTERNAL:
+                if function.name in local_functions:
+                    function.diff(local_functions[function.name])
+                local_functions[function.name] = function
+                function = None
+        else:
             packed = False
             for field in cursor.get_children():
                 if field.kind == CursorKind.PACKED_ATTR:
@@ -312,6 +418,13 @@ def check_translation_unit(
                 ]:
                     warn(f"Unknown field cursor kind: {field.kind}")
 
+        declarations.append(
+            {"key": key, "warnings": found[start:], "function": function}
+        )
+        del found[start:]
+
+    return declarations
+
 
 class Command(TypedDict):
     """
@@ -323,6 +436,261 @@ class Command(TypedDict):
     command: str
 
 
+class Job(TypedDict):
+    """
+    A translation unit to lint, with its clang arguments
+    """
+
+    path: str
+    relpath: str
+    clang_args: List[str]
+
+
+def load_result(key: str) -> Optional[Result]:
+    """
+    Load the cached result of a translation unit, or
+    None if it is missing or any of its files changed
+    """
+    assert cparser_cache.cache_dir
+    path = os.path.join(cparser_cache.cache_dir, f"{key}.lint.json")
+    try:
+        with open(path, encoding="utf-8") as file:
+            entry = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    mtimes = cparser_cache.touched_dependencies(entry["dependencies"])
+    if mtimes is None:
+        return None
+    if mtimes:
+        cparser_cache.refresh_manifest(path, entry, entry["dependencies"], mtimes)
+
+    for declaration in entry["declarations"]:
+        function = declaration["function"]
+        if function:
+            function["args"] = [Arg(**arg) for arg in function["args"]]
+            declaration["function"] = Function(**function)
+    return {"warnings": entry["warnings"], "declarations": entry["declarations"]}
+
+
+def store_result(key: str, translation_unit: TranslationUnit, result: Result) -> None:
+    """
+    Save the result of a translation unit and the files it depends on
+    """
+    assert cparser_cache.cache_dir
+    os.makedirs(cparser_cache.cache_dir, exist_ok=True)
+
+    declarations = [
+        {
+            "key": declaration["key"],
+            "warnings": declaration["warnings"],
+            "function": declaration["function"] and asdict(declaration["function"]),
+        }
+        for declaration in result["declarations"]
+    ]
+
+    # Write to a temporary file first, as cparser_cache.store does
+    path = os.path.join(cparser_cache.cache_dir, f"{key}.lint.json")
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "dependencies": cparser_cache.file_dependencies(translation_unit),
+                "warnings": result["warnings"],
+                "declarations": declarations,
+            },
+            file,
+        )
+    os.replace(tmp_path, path)
+
+
+def lint_file(
+    job: Job,
+    *,
+    skipped_paths: Set[str],
+    rizin_path: str,
+    version: str,
+    deduplicate: bool = True,
+) -> Result:
+    """
+    Lint a translation unit, in a worker process if --jobs is given
+
+    Returns its result, from the cache if it did not change (unless
+    deduplicate is False, as cached results may skip declarations)
+    """
+    key = None
+    if cparser_cache.cache_dir:
+        # The linter itself is part of the key, so that changing the
+        # checks invalidates the cache, and so is the working directory,
+        # which warnings are relative to
+        key = cparser_cache.cache_key(
+            job["path"], job["clang_args"] + [rizin_path, os.getcwd(), version], 0, []
+        )
+
+        # Without deduplication, the cached result may have skipped declarations,
+        # so the translation unit is linted again and its full result replaces it
+        cached = load_result(key) if deduplicate else None
+        if cached is not None:
+            checked.update(
+                declaration["key"]
+                for declaration in cached["declarations"]
+                if declaration["warnings"] is not None
+            )
+            return cached
+
+    found.clear()
+    try:
+        translation_unit = TranslationUnit.from_source(job["path"], job["clang_args"])
+    except TranslationUnitLoadError:
+        return {
+            "warnings": [f"Failed to parse file {job['relpath']}"],
+            "declarations": [],
+        }
+
+    declarations = check_translation_unit(
+        translation_unit,
+        skipped_paths=skipped_paths,
+        rizin_path=rizin_path,
+        deduplicate=deduplicate,
+    )
+    result: Result = {
+        "warnings": list(dict.fromkeys(found)),
+        "declarations": declarations,
+    }
+
+    if key:
+        store_result(key, translation_unit, result)
+    return result
+
+
+def init_worker(library_path: str, cache_dir: Optional[str]) -> None:
+    """
+    Copy linter configuration into a worker process
+    """
+    if not Config.loaded:
+        Config.set_library_path(library_path)
+    cparser_cache.cache_dir = cache_dir
+
+
+# Keys of the declarations reported so far, and the functions with external
+# linkage, to compare declarations and definitions across translation units
+reported: Set[str] = set()
+functions: Dict[str, Function] = {}
+
+# RZ_API functions by declaration key, for the index (see store_index)
+api_functions: Dict[str, Function] = {}
+
+
+def skips_unreported(result: Result) -> bool:
+    """
+    Check if a translation unit skipped declarations which were not reported,
+    as they were checked by a cached translation unit that is not linted again
+    """
+    return any(
+        declaration["warnings"] is None and declaration["key"] not in reported
+        for declaration in result["declarations"]
+    )
+
+
+def merge(result: Result) -> None:
+    """
+    Report the warnings of a translation unit and of its declarations,
+    and compare its functions with those of earlier translation units
+    """
+    report(result["warnings"])
+
+    for declaration in result["declarations"]:
+        if declaration["key"] in reported:
+            continue
+        reported.add(declaration["key"])
+
+        assert declaration["warnings"] is not None
+        report(declaration["warnings"])
+
+        function = declaration["function"]
+        if function:
+            if function.api:
+                api_functions[declaration["key"]] = function
+
+            found.clear()
+            if function.name in functions:
+                function.diff(functions[function.name])
+            functions[function.name] = function
+            report(found)
+
+
+def store_index(path: str) -> None:
+    """
+    Update the SQLite index of RZ_API functions at path, only
+    writing the declarations which were added, changed or removed
+
+    Annotations and arguments are stored as JSON
+    """
+    with closing(sqlite3.connect(path)) as connection:
+        # Commit the changes at once
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS functions ("
+                "key TEXT PRIMARY KEY, name TEXT NOT NULL, location TEXT NOT NULL, "
+                "pointer INTEGER NOT NULL, annotations TEXT NOT NULL, comment TEXT, "
+                "args TEXT NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS functions_name ON functions(name)"
+            )
+
+            rows = {
+                row[0]: row for row in connection.execute("SELECT * FROM functions")
+            }
+            new_rows = {
+                key: (
+                    key,
+                    function.name,
+                    function.location,
+                    function.pointer,
+                    json.dumps(function.annotations),
+                    function.comment,
+                    json.dumps([asdict(arg) for arg in function.args]),
+                )
+                for key, function in api_functions.items()
+            }
+
+            connection.executemany(
+                "DELETE FROM functions WHERE key = ?",
+                [(key,) for key in rows.keys() - new_rows.keys()],
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO functions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [row for key, row in new_rows.items() if rows.get(key) != row],
+            )
+
+
+ownership_annotations = {"RZ_OWN", "RZ_BORROW"}
+
+
+def report_missing_ownership(path: str) -> None:
+    """
+    Print the pointers returned or taken by the functions in
+    the index which lack an RZ_OWN or RZ_BORROW annotation
+    """
+    with closing(sqlite3.connect(path)) as connection:
+        rows = connection.execute(
+            "SELECT name, location, pointer, annotations, args "
+            "FROM functions ORDER BY name, location"
+        ).fetchall()
+
+    for name, location, pointer, annotations, args in rows:
+        if pointer and not ownership_annotations & set(json.loads(annotations)):
+            print(f"Missing ownership annotation for {name} result at {location}")
+
+        for arg in json.loads(args):
+            if arg["pointer"] and not ownership_annotations & set(arg["annotations"]):
+                print(
+                    f"Missing ownership annotation for {name} argument "
+                    f"{arg['name']} at {location}"
+                )
+
+
 def main() -> int:
     """
     CLI Entrypoint
@@ -331,9 +699,16 @@ def main() -> int:
     parser.add_argument("--clang-path", required=True)
     parser.add_argument("--clang-args", required=True)
     parser.add_argument("--rizin-path", required=True)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--cache-dir")
+    parser.add_argument("--index")
+    parser.add_argument("--missing-ownership", action="store_true")
     args = parser.parse_args()
+    if args.missing_ownership and not args.index:
+        parser.error("--missing-ownership requires --index")
 
     Config.set_library_path(cast(str, args.clang_path))
+    cparser_cache.cache_dir = cast(Optional[str], args.cache_dir)
     clang_base_args = shlex.split(cast(str, args.clang_args)) + ["-DRZ_BINDINGS"]
     rizin_path = os.path.abspath(cast(str, args.rizin_path))
 
@@ -365,34 +740,54 @@ def main() -> int:
     ) as compile_commands:
         commands: List[Command] = json.loads(compile_commands.read())
 
-        for command in commands:
-            abspath = os.path.abspath(
-                os.path.join(command["directory"], command["file"])
-            )
-            relpath = os.path.relpath(abspath, rizin_path)
-
-            if relpath.startswith("subproject") or relpath.startswith("test"):
-                continue
-
-            namespace, _ = cmd_parser.parse_known_args(shlex.split(command["command"]))
-            defines = cast(List[str], namespace.D)
-            includes = cast(List[str], namespace.I)
-
-            clang_args = clang_base_args.copy()
-            clang_args += ["-D" + define for define in defines]
-            clang_args += [
-                "-I" + os.path.join(command["directory"], include)
-                for include in includes
-            ]
-
-            try:
-                check_translation_unit(
-                    TranslationUnit.from_source(abspath, clang_args),
-                    skipped_paths=skipped_paths,
-                    rizin_path=rizin_path,
-                )
-            except TranslationUnitLoadError:
-                warn(f"Failed to parse file {relpath}")
+    jobs: List[Job] = []
+    for command in commands:
+        abspath = os.path.abspath(os.path.join(command["directory"], command["file"]))
+        relpath = os.path.relpath(abspath, rizin_path)
+
+        if relpath.startswith("subproject") or relpath.startswith("test"):
+            continue
+
+        namespace, _ = cmd_parser.parse_known_args(shlex.split(command["command"]))
+        defines = cast(List[str], namespace.D)
+        includes = cast(List[str], namespace.I)
+
+        clang_args = clang_base_args.copy()
+        clang_args += ["-D" + define for define in defines]
+        clang_args += [
+            "-I" + os.path.join(command["directory"], include) for include in includes
+        ]
+        jobs.append({"path": abspath, "relpath": relpath, "clang_args": clang_args})
+
+    lint = partial(
+        lint_file,
+        skipped_paths=skipped_paths,
+        rizin_path=rizin_path,
+        version=cparser_cache.hash_file(__file__),
+    )
+
+    # Results are merged in the order of the jobs, so
+    # that the output does not depend on the number of jobs
+    if args.jobs > 1:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=cast(int, args.jobs),
+            initializer=init_worker,
+            initargs=(cast(str, args.clang_path), cparser_cache.cache_dir),
+        ) as executor:
+            results: Iterable[Result] = list(executor.map(lint, jobs))
+    else:
+        results = map(lint, jobs)
+
+    for job, result in zip(jobs, results):
+        if skips_unreported(result):
+            result = lint(job, deduplicate=False)
+        merge(result)
+
+    index = cast(Optional[str], args.index)
+    if index:
+        store_index(index)
+        if args.missing_ownership:
+            report_missing_ownership(index)
 
     return len(warnings)
 
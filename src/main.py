@@ -6,58 +6,116 @@ SPDX-License-Identifier: LGPL-3.0-only
 from typing import Optional, cast
 
 import os
+import sys
 import shlex
+import importlib
 from argparse import ArgumentParser
 
 import cparser_header
-import bindings
+import cparser_cache
+import binding_header
+from cparser_header import headers
+from writer import write_depfile
 
 from clang.cindex import Config
 
-parser = ArgumentParser()
-parser.add_argument("--output-dir", "-o", required=True)
-parser.add_argument("--clang-path", required=True)
-parser.add_argument("--clang-args", required=True)
-parser.add_argument("--rizin-include-path", required=True)
-parser.add_argument("--targets", required=True)
-parser.add_argument("--doxygen-path")
-args = parser.parse_args()
-
-output_dir = cast(str, args.output_dir)
-Config.set_library_path(cast(str, args.clang_path))
-cparser_header.clang_args = clang_args = shlex.split(cast(str, args.clang_args))
-cparser_header.rizin_include_path = rizin_include_path = cast(
-    str, args.rizin_include_path
-)
-targets = set(cast(str, args.targets).split(","))
-
-# Add additional include directories
-for segments in [
-    # already isntalled `include/librz` directory
-    ["."],
-    ["sdb"],
-    # not yet installed meson project `include` directory
-    ["..", "..", "build"],
-    ["..", "util", "sdb", "src"],
-]:
-    path = os.path.abspath(os.path.join(rizin_include_path, *segments))
-    if os.path.exists(path):
-        clang_args += ["-I", path]
-
-# Enable certain annotation definitions in rz_types.h
-clang_args.append("-DRZ_BINDINGS")
-
-# Run binding specifications
-bindings.run()
-
-# Generator(s)
-if "SWIG" in targets:
-    import generator_swig
-
-    generator_swig.generate(output_dir)
-
-if "sphinx" in targets:
-    import generator_sphinx
-
-    generator_sphinx.doxygen_path = cast(Optional[str], args.doxygen_path)
-    generator_sphinx.generate(output_dir)
+
+def main() -> None:
+    """
+    CLI Entrypoint
+    """
+    parser = ArgumentParser()
+    parser.add_argument("--output-dir", "-o", required=True)
+    parser.add_argument("--clang-path", required=True)
+    parser.add_argument("--clang-args", required=True)
+    parser.add_argument("--rizin-include-path", required=True)
+    parser.add_argument("--targets", required=True)
+    parser.add_argument("--doxygen-path")
+    parser.add_argument("--sphinx-jobs", type=int)
+    parser.add_argument("--cache-dir")
+    parser.add_argument("--parse-mode", default="threads")
+    parser.add_argument("--depfile")
+    parser.add_argument("--split-modules", action="store_true")
+    parser.add_argument(
+        "--bindings",
+        default=os.path.join(os.path.dirname(__file__), "bindings.py"),
+        help="Binding specification file",
+    )
+    args = parser.parse_args()
+
+    output_dir = cast(str, args.output_dir)
+    Config.set_library_path(cast(str, args.clang_path))
+    cparser_header.clang_args = clang_args = shlex.split(cast(str, args.clang_args))
+    cparser_header.rizin_include_path = rizin_include_path = cast(
+        str, args.rizin_include_path
+    )
+    targets = set(cast(str, args.targets).split(","))
+    cparser_cache.cache_dir = cast(Optional[str], args.cache_dir)
+    split_modules = cast(bool, args.split_modules)
+
+    # Add additional include directories
+    for segments in [
+        # already isntalled `include/librz` directory
+        ["."],
+        ["sdb"],
+        # not yet installed meson project `include` directory
+        ["..", "..", "build"],
+        ["..", "util", "sdb", "src"],
+    ]:
+        path = os.path.abspath(os.path.join(rizin_include_path, *segments))
+        if os.path.exists(path):
+            clang_args += ["-I", path]
+
+    # Enable certain annotation definitions in rz_types.h
+    clang_args.append("-DRZ_BINDINGS")
+
+    # Run binding specifications, which register
+    # their headers with threaded_header when imported
+    bindings_path = os.path.abspath(cast(str, args.bindings))
+    sys.path.append(os.path.dirname(bindings_path))
+    importlib.import_module(os.path.splitext(os.path.basename(bindings_path))[0])
+    binding_header.run(cast(str, args.parse_mode))
+
+    if cparser_cache.cache_dir:
+        print(
+            f"[INFO] AST cache: {cparser_cache.stats.hits} hits, "
+            f"{cparser_cache.stats.misses} misses"
+        )
+
+    # Generator(s)
+    if "SWIG" in targets:
+        import generator_swig  # pylint: disable=import-outside-toplevel
+
+        generator_swig.generate(output_dir, split_modules=split_modules)
+
+    if "sphinx" in targets:
+        import generator_sphinx  # pylint: disable=import-outside-toplevel
+
+        generator_sphinx.doxygen_path = cast(Optional[str], args.doxygen_path)
+        generator_sphinx.generate(
+            output_dir, jobs=cast(Optional[int], args.sphinx_jobs)
+        )
+
+    # Dependency file, so that the build system regenerates
+    # the outputs when a parsed header changes
+    depfile = cast(Optional[str], args.depfile)
+    if depfile:
+        # The first output (as listed in meson.build) is the rule target
+        write_depfile(
+            depfile,
+            os.path.join(
+                output_dir,
+                (
+                    ("rizin.py" if split_modules else "rizin.i")
+                    if "SWIG" in targets
+                    else "sphinx"
+                ),
+            ),
+            {dependency for header in headers for dependency in header.dependencies},
+        )
+
+
+# Worker processes (see binding_header.run and generator_sphinx.generate)
+# import this module under another name when they are spawned
+if __name__ == "__main__":
+    main()
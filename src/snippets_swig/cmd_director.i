@@ -10,18 +10,194 @@ struct CmdDirector {
 };
 %}
 
+%fragment("SWIG_FromCharPtr");
 %{
 #include <unordered_map>
+#include <vector>
 
-static auto SWIGCmds = std::unordered_map<std::string, std::pair<RzCmdDesc*, CmdDirector*> >();
+// Commands are keyed by a copy of the name of their RzCmdDesc, owned by
+// SWIGCmds, so that argv[0] can be looked up without copying it. The name
+// of the RzCmdDesc itself is freed with its RzCmd, which may happen
+// without unregistering the command
+struct SWIGCmdNameHash {
+    size_t operator()(const char *name) const {
+        size_t hash = (size_t)14695981039346656037ULL; // FNV-1a
+        for (; *name; name++) {
+            hash = (hash ^ (unsigned char)*name) * (size_t)1099511628211ULL;
+        }
+        return hash;
+    }
+};
+
+struct SWIGCmdNameEqual {
+    bool operator()(const char *a, const char *b) const {
+        return !strcmp(a, b);
+    }
+};
+
+static auto SWIGCmds = std::unordered_map<const char *, std::pair<RzCmdDesc*, CmdDirector*>,
+                                          SWIGCmdNameHash, SWIGCmdNameEqual>();
 
 RzCmdStatus SWIG_Cmd_run(RzCore *core, int argc, const char **argv) {
-    std::string cmd(argv[0]);
-    bool result = SWIGCmds.at(cmd).second->run(core, argc, argv);
+    RizinGILState gil_state;
+    auto it = SWIGCmds.find(argv[0]);
+    if (it == SWIGCmds.end() || !it->second.second) { // Groups have no director
+        return RZ_CMD_STATUS_INVALID;
+    }
+    bool result = it->second.second->run(core, argc, argv);
     return result ? RZ_CMD_STATUS_OK : RZ_CMD_STATUS_ERROR;
 }
 
+// Whether desc is ancestor, or one of its (grand)children
+static bool rz_swig_cmd_desc_is_in(const RzCmdDesc *desc, const RzCmdDesc *ancestor) {
+    for (; desc; desc = desc->parent) {
+        if (desc == ancestor) {
+            return true;
+        }
+    }
+    return false;
+}
+
+// Argument of a CmdFunction, converted from argv according to its type
+struct CmdFunctionArg {
+    PyObject *name;
+    RzCmdArgType type;
+    swig_type_info *descriptor; // Of the RzFlagItem or RzAnalysisFunction
+};
+
+static PyObject *rz_swig_cmd_arg_convert(RzCore *core, const CmdFunctionArg &arg,
+                                         const char *value) {
+    switch (arg.type) {
+    case RZ_CMD_ARG_TYPE_RZNUM:
+        if (!rz_num_is_valid_input(core->num, value)) {
+            return PyErr_Format(PyExc_ValueError,
+                                "Could not convert '%s' to RzNum value", value);
+        }
+        return PyLong_FromUnsignedLongLong(rz_num_math(core->num, value));
+    case RZ_CMD_ARG_TYPE_NUM: {
+        PyObject *result = PyLong_FromString(value, NULL, 10);
+        if (!result && PyErr_ExceptionMatches(PyExc_ValueError)) {
+            PyErr_Format(PyExc_ValueError, "Could not convert '%s' to int", value);
+        }
+        return result;
+    }
+    case RZ_CMD_ARG_TYPE_FLAG: {
+        RzFlagItem *item = rz_flag_get(core->flags, value);
+        if (!item) {
+            return PyErr_Format(PyExc_ValueError,
+                                "Could not find a flag named '%s'", value);
+        }
+        return SWIG_NewPointerObj(item, arg.descriptor, 0);
+    }
+    case RZ_CMD_ARG_TYPE_FCN: {
+        RzAnalysisFunction *fcn = rz_analysis_get_function_byname(core->analysis, value);
+        if (!fcn) {
+            return PyErr_Format(PyExc_ValueError,
+                                "Could not find a function named '%s'", value);
+        }
+        return SWIG_NewPointerObj(fcn, arg.descriptor, 0);
+    }
+    default: // RZ_CMD_ARG_TYPE_STRING, RZ_CMD_ARG_TYPE_FILE
+        return SWIG_FromCharPtr(value);
+    }
+}
+
+// Prints the message of the raised exception, as print(e) would
+static void rz_swig_cmd_print_error() {
+#if PY_VERSION_HEX >= 0x030C0000
+    PyObject *value = PyErr_GetRaisedException();
+#else
+    PyObject *type, *value, *traceback;
+    PyErr_Fetch(&type, &value, &traceback);
+    PyErr_NormalizeException(&type, &value, &traceback);
+    Py_XDECREF(type);
+    Py_XDECREF(traceback);
+#endif
+    if (value) {
+        PySys_FormatStdout("%S\n", value);
+        Py_DECREF(value);
+    }
+    PyErr_Clear();
+}
+
+// Command calling a Python function with the arguments given by its
+// annotations, which are converted in C following a plan built once
+struct CmdFunction : CmdDirector {
+    PyObject *fn;
+    PyObject *core_arg = NULL;
+    swig_type_info *core_descriptor = NULL;
+    std::vector<CmdFunctionArg> args;
+
+    CmdFunction(PyObject *fn) : fn(fn) {
+        Py_INCREF(fn);
+    }
+
+    virtual ~CmdFunction() {
+        RizinGILState gil_state;
+        Py_DECREF(fn);
+        Py_XDECREF(core_arg);
+        for (const CmdFunctionArg &arg : args) {
+            Py_DECREF(arg.name);
+        }
+    }
+
+    virtual bool run(RzCore *core, int argc, const char **argv) {
+        PyObject *kwargs = set_args(core, argc, argv);
+        PyObject *empty = kwargs ? PyTuple_New(0) : NULL;
+        PyObject *result = empty ? PyObject_Call(fn, empty, kwargs) : NULL;
+        Py_XDECREF(empty);
+        Py_XDECREF(kwargs);
+
+        int truth = result ? PyObject_IsTrue(result) : -1;
+        Py_XDECREF(result);
+        if (truth < 0) {
+            rz_swig_cmd_print_error();
+            return false;
+        }
+        return truth;
+    }
+
+private:
+    PyObject *set_args(RzCore *core, int argc, const char **argv) {
+        PyObject *kwargs = PyDict_New();
+        if (!kwargs) {
+            return NULL;
+        }
+
+        if (core_arg) {
+            PyObject *value = SWIG_NewPointerObj(core, core_descriptor, 0);
+            if (!value || PyDict_SetItem(kwargs, core_arg, value) < 0) {
+                Py_XDECREF(value);
+                Py_DECREF(kwargs);
+                return NULL;
+            }
+            Py_DECREF(value);
+        }
+
+        for (size_t i = 0; i < args.size(); i++) {
+            const CmdFunctionArg &arg = args[i];
+            if ((size_t)argc <= i + 1) {
+                PyErr_Format(PyExc_ValueError, "Missing argument '%U'", arg.name);
+                Py_DECREF(kwargs);
+                return NULL;
+            }
+
+            PyObject *value = rz_swig_cmd_arg_convert(core, arg, argv[i + 1]);
+            if (!value || PyDict_SetItem(kwargs, arg.name, value) < 0) {
+                Py_XDECREF(value);
+                Py_DECREF(kwargs);
+                return NULL;
+            }
+            Py_DECREF(value);
+        }
+        return kwargs;
+    }
+};
+
 void rz_swig_cmd_desc_help_free(const RzCmdDescHelp *help) {
+    if (!help) {
+        return;
+    }
     free((char*) help->summary);
     free((char*) help->description);
     free((char*) help->args_str);
@@ -36,9 +212,33 @@ void rz_swig_cmd_desc_help_free(const RzCmdDescHelp *help) {
         free((char*) arg->default_value);
     }
     free((RzCmdDesc*) help->args);
+    delete help; // Allocated by the RzCmdDescHelp constructor
 }
 %}
 
+// Only the plan is built from SWIG
+struct CmdFunction : CmdDirector {
+    CmdFunction(PyObject *fn);
+};
+
+%extend CmdFunction {
+    void set_core_arg(const char *name) {
+        Py_XDECREF($self->core_arg);
+        $self->core_arg = PyUnicode_InternFromString(name);
+        $self->core_descriptor = $descriptor(RzCore *);
+    }
+
+    void add_arg(const char *name, RzCmdArgType type) {
+        swig_type_info *descriptor = NULL;
+        if (type == RZ_CMD_ARG_TYPE_FLAG) {
+            descriptor = $descriptor(RzFlagItem *);
+        } else if (type == RZ_CMD_ARG_TYPE_FCN) {
+            descriptor = $descriptor(RzAnalysisFunction *);
+        }
+        $self->args.push_back({PyUnicode_InternFromString(name), type, descriptor});
+    }
+}
+
 // CArrays
 %include <carrays.i>
 %array_class(RzCmdDescArg, Array_RzCmdDescArg);
@@ -0,0 +1,37 @@
+# typing is not imported, as it takes longer to import than this module
+_names = {
+    name: module for module, names in _module_names.items() for name in names
+}
+
+
+def _public_names():
+    result = {}
+    for module in _module_names:
+        for name in vars(importlib.import_module(module)):
+            if not name.startswith("_"):
+                result[name] = None
+    return list(result)
+
+
+def __getattr__(name):
+    if name == "__all__":
+        # from rizin import *
+        return _public_names()
+
+    if name in _names:
+        value = getattr(importlib.import_module(_names[name]), name)
+    else:
+        for module in _module_names:
+            loaded = importlib.import_module(module)
+            if hasattr(loaded, name):
+                value = getattr(loaded, name)
+                break
+        else:
+            raise AttributeError(f"module 'rizin' has no attribute '{name}'")
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_names))
@@ -0,0 +1,30 @@
+// Deprecation warnings, using the config variables
+// defined by prologue.i in the shared module
+%{
+static bool rizin_shared_config(const char *name) {
+    bool result = true;
+    PyObject *module = PyImport_ImportModule(RIZIN_SHARED_MODULE);
+    PyObject *cvar = module ? PyObject_GetAttrString(module, "cvar") : NULL;
+    PyObject *value = cvar ? PyObject_GetAttrString(cvar, name) : NULL;
+    if (value) {
+        result = PyObject_IsTrue(value) == 1;
+    } else {
+        PyErr_Clear();
+    }
+    Py_XDECREF(value);
+    Py_XDECREF(cvar);
+    Py_XDECREF(module);
+    return result;
+}
+
+SWIGUNUSED static void rizin_try_warn_deprecate(const char *name, const char *c_name) {
+    if (rizin_shared_config("rizin_warn_deprecate")) {
+        printf("Warning: `%s` calls deprecated function `%s`\n", name, c_name);
+        if (rizin_shared_config("rizin_warn_deprecate_instructions")) {
+            puts("To disable this warning, set rizin_warn_deprecate to false");
+            puts("The way to do this depends on the SWIG language being used");
+            puts("For python, do `rizin.cvar.rizin_warn_deprecate = False`");
+        }
+    }
+}
+%}
@@ -0,0 +1,96 @@
+// Buffer protocol over the element storage of a container
+%{
+struct RizinBuffer {
+    PyObject_HEAD
+    PyObject *owner; // Keeps the container alive
+    void *data;
+    Py_ssize_t shape;
+    Py_ssize_t itemsize;
+    const char *format;
+    bool readonly;
+};
+
+// struct module format of primitive element types, NULL for other types
+template <typename T> static const char *rizin_buffer_format() { return NULL; }
+template <> SWIGUNUSED const char *rizin_buffer_format<char>() { return "c"; }
+template <> SWIGUNUSED const char *rizin_buffer_format<signed char>() { return "b"; }
+template <> SWIGUNUSED const char *rizin_buffer_format<unsigned char>() { return "B"; }
+template <> SWIGUNUSED const char *rizin_buffer_format<bool>() { return "?"; }
+template <> SWIGUNUSED const char *rizin_buffer_format<short>() { return "h"; }
+template <> SWIGUNUSED const char *rizin_buffer_format<unsigned short>() { return "H"; }
+template <> SWIGUNUSED const char *rizin_buffer_format<int>() { return "i"; }
+template <> SWIGUNUSED const char *rizin_buffer_format<unsigned int>() { return "I"; }
+template <> SWIGUNUSED const char *rizin_buffer_format<long>() { return "l"; }
+template <> SWIGUNUSED const char *rizin_buffer_format<unsigned long>() { return "L"; }
+template <> SWIGUNUSED const char *rizin_buffer_format<long long>() { return "q"; }
+template <> SWIGUNUSED const char *rizin_buffer_format<unsigned long long>() { return "Q"; }
+template <> SWIGUNUSED const char *rizin_buffer_format<float>() { return "f"; }
+template <> SWIGUNUSED const char *rizin_buffer_format<double>() { return "d"; }
+
+static int rizin_buffer_getbuffer(PyObject *self, Py_buffer *view, int flags) {
+    RizinBuffer *buffer = (RizinBuffer *)self;
+    if (buffer->readonly && flags & PyBUF_WRITABLE) {
+        PyErr_SetString(PyExc_BufferError, "Buffer is read-only");
+        view->obj = NULL;
+        return -1;
+    }
+    view->obj = self;
+    Py_INCREF(self);
+    view->buf = buffer->data;
+    view->len = buffer->shape * buffer->itemsize;
+    view->readonly = buffer->readonly;
+    view->itemsize = buffer->itemsize;
+    view->format = flags & PyBUF_FORMAT ? (char *)buffer->format : NULL;
+    view->ndim = 1;
+    view->shape = flags & PyBUF_ND ? &buffer->shape : NULL;
+    view->strides = (flags & PyBUF_STRIDES) == PyBUF_STRIDES ? &buffer->itemsize : NULL;
+    view->suboffsets = NULL;
+    view->internal = NULL;
+    return 0;
+}
+
+static void rizin_buffer_dealloc(PyObject *self) {
+    Py_XDECREF(((RizinBuffer *)self)->owner);
+    PyObject_Del(self);
+}
+
+// memoryview of length elements at data, which belong to owner
+SWIGUNUSED static PyObject *rizin_buffer_memoryview(PyObject *owner, void *data,
+    size_t length, const char *format, size_t itemsize, bool readonly) {
+    static PyBufferProcs buffer_procs = {rizin_buffer_getbuffer, NULL};
+    static PyTypeObject buffer_type = {PyVarObject_HEAD_INIT(NULL, 0)};
+    if (!buffer_type.tp_name) {
+        buffer_type.tp_name = "rizin.RizinBuffer";
+        buffer_type.tp_basicsize = sizeof(RizinBuffer);
+        buffer_type.tp_flags = Py_TPFLAGS_DEFAULT;
+        buffer_type.tp_dealloc = rizin_buffer_dealloc;
+        buffer_type.tp_as_buffer = &buffer_procs;
+        if (PyType_Ready(&buffer_type) < 0) {
+            buffer_type.tp_name = NULL;
+            return NULL;
+        }
+    }
+
+    if (!format) {
+        PyErr_SetString(PyExc_TypeError, "Elements are not of a primitive type");
+        return NULL;
+    }
+
+    RizinBuffer *buffer = PyObject_New(RizinBuffer, &buffer_type);
+    if (!buffer) {
+        return NULL;
+    }
+    Py_INCREF(owner);
+    buffer->owner = owner;
+    // Empty containers may not have storage
+    buffer->data = data ? data : (void *)"";
+    buffer->shape = length;
+    buffer->itemsize = itemsize;
+    buffer->format = format;
+    buffer->readonly = readonly;
+
+    PyObject *view = PyMemoryView_FromObject((PyObject *)buffer);
+    Py_DECREF(buffer);
+    return view;
+}
+%}
@@ -0,0 +1,438 @@
+// Conversions between the fields of struct elements and columns
+// (Python sequences or buffers holding one field of every element)
+%{
+#include <algorithm>
+#include <limits>
+#include <vector>
+
+// Either a Python object, or a number read from a buffer
+struct RizinValue {
+    PyObject *object;
+    char kind; // If object is NULL: 'i' (signed), 'u' (unsigned) or 'f'
+    union {
+        long long i;
+        unsigned long long u;
+        double f;
+    };
+};
+
+// Integer fields, which must be in range
+template <typename F>
+static int rizin_value_as(RizinValue value, F *result) {
+    if (value.object) {
+        PyObject *index = PyNumber_Index(value.object);
+        if (!index) {
+            return -1;
+        }
+        int overflow;
+        value.kind = 'i';
+        value.i = PyLong_AsLongLongAndOverflow(index, &overflow);
+        if (overflow > 0) {
+            value.kind = 'u';
+            value.u = PyLong_AsUnsignedLongLong(index);
+        }
+        Py_DECREF(index);
+        if (PyErr_Occurred()) {
+            return -1;
+        }
+        if (overflow < 0) {
+            PyErr_SetString(PyExc_OverflowError, "integer out of range");
+            return -1;
+        }
+    }
+
+    bool in_range;
+    if (value.kind == 'f') {
+        PyErr_SetString(PyExc_TypeError, "integer expected");
+        return -1;
+    } else if (value.kind == 'i' && value.i < 0) {
+        in_range = std::numeric_limits<F>::is_signed &&
+            value.i >= (long long)std::numeric_limits<F>::min();
+    } else {
+        unsigned long long u = value.kind == 'i' ? (unsigned long long)value.i : value.u;
+        in_range = u <= (unsigned long long)std::numeric_limits<F>::max();
+    }
+    if (!in_range) {
+        PyErr_SetString(PyExc_OverflowError, "integer out of range");
+        return -1;
+    }
+    *result = value.kind == 'i' ? (F)value.i : (F)value.u;
+    return 0;
+}
+
+SWIGUNUSED static int rizin_value_as(RizinValue value, bool *result) {
+    int truth = 0;
+    if (value.object) {
+        truth = PyObject_IsTrue(value.object);
+    } else {
+        truth = value.kind == 'f' ? value.f != 0 : value.u != 0;
+    }
+    *result = truth > 0;
+    return truth < 0 ? -1 : 0;
+}
+
+SWIGUNUSED static int rizin_value_as(RizinValue value, double *result) {
+    if (value.object) {
+        *result = PyFloat_AsDouble(value.object);
+        return *result == -1.0 && PyErr_Occurred() ? -1 : 0;
+    }
+    *result = value.kind == 'f' ? value.f : value.kind == 'i' ? (double)value.i : (double)value.u;
+    return 0;
+}
+
+SWIGUNUSED static int rizin_value_as(RizinValue value, float *result) {
+    double number;
+    if (rizin_value_as(value, &number) < 0) {
+        return -1;
+    }
+    *result = (float)number;
+    return 0;
+}
+
+// Strings are copied, to be freed by Rizin
+SWIGUNUSED static int rizin_value_as(RizinValue value, const char **result) {
+    if (value.object == Py_None) {
+        *result = NULL;
+        return 0;
+    }
+    if (!value.object || !PyUnicode_Check(value.object)) {
+        PyErr_SetString(PyExc_TypeError, "str expected");
+        return -1;
+    }
+    const char *str = PyUnicode_AsUTF8(value.object);
+    if (!str) {
+        return -1;
+    }
+    *result = strdup(str);
+    return 0;
+}
+
+SWIGUNUSED static int rizin_value_as(RizinValue value, char **result) {
+    return rizin_value_as(value, (const char **)result);
+}
+
+// Numbers are written to out, strings converted to a PyObject * at out
+template <typename F>
+static int rizin_value_to(F value, void *out) {
+    memcpy(out, &value, sizeof(value));
+    return 0;
+}
+
+SWIGUNUSED static int rizin_value_to(const char *value, void *out) {
+    PyObject *object = SWIG_FromCharPtr(value);
+    *(PyObject **)out = object;
+    return object ? 0 : -1;
+}
+
+SWIGUNUSED static int rizin_value_to(char *value, void *out) {
+    return rizin_value_to((const char *)value, out);
+}
+
+// Only strings are owned by their element
+template <typename F>
+static void rizin_value_free(F) {}
+
+SWIGUNUSED static void rizin_value_free(const char *value) {
+    free((void *)value);
+}
+
+SWIGUNUSED static void rizin_value_free(char *value) {
+    free(value);
+}
+
+typedef int (*RizinColumnSet)(void *element, RizinValue value);
+typedef int (*RizinColumnGet)(void *element, void *out);
+typedef void (*RizinColumnClear)(void *element);
+
+// A field of the elements of a container
+struct RizinColumn {
+    const char *name;
+    const char *format; // struct module format of numbers, NULL for strings
+    size_t itemsize;
+    RizinColumnSet set;
+    RizinColumnGet get;
+    RizinColumnClear clear; // Frees what set allocated, for elements which are not kept
+};
+
+#define RIZIN_COLUMN(T, NAME, FIELD) \
+    {NAME, rizin_buffer_format<decltype(((T *)NULL)->FIELD)>(), \
+        sizeof(decltype(((T *)NULL)->FIELD)), \
+        [](void *element, RizinValue value) -> int { \
+            decltype(((T *)NULL)->FIELD) result; \
+            if (rizin_value_as(value, &result) < 0) { \
+                return -1; \
+            } \
+            ((T *)element)->FIELD = result; \
+            return 0; \
+        }, \
+        [](void *element, void *out) -> int { \
+            return rizin_value_to(((T *)element)->FIELD, out); \
+        }, \
+        [](void *element) { \
+            rizin_value_free(((T *)element)->FIELD); \
+        }}
+
+// The fields of a struct which can be converted to and from columns
+struct RizinColumns {
+    size_t size; // Of the struct
+    const RizinColumn *fields; // Up to one without a name
+};
+
+// Specialized for the elements of each class (see Class.column_fields)
+template <typename T>
+static const RizinColumns *rizin_columns() {
+    return NULL;
+}
+
+static const RizinColumn *rizin_columns_find(const RizinColumns *columns, PyObject *key) {
+    const char *name = PyUnicode_AsUTF8(key);
+    if (!name) {
+        return NULL;
+    }
+    for (const RizinColumn *field = columns->fields; field->name; field++) {
+        if (!strcmp(field->name, name)) {
+            return field;
+        }
+    }
+    PyErr_Format(PyExc_KeyError, "no column for field '%s'", name);
+    return NULL;
+}
+
+// The values of a column, from a buffer of numbers or any other sequence
+struct RizinColumnValues {
+    PyObject *sequence = NULL;
+    Py_buffer buffer = {};
+    char format = 0;
+
+    ~RizinColumnValues() {
+        Py_XDECREF(sequence);
+        if (buffer.obj) {
+            PyBuffer_Release(&buffer);
+        }
+    }
+
+    int init(PyObject *object) {
+        if (PyObject_CheckBuffer(object) &&
+            PyObject_GetBuffer(object, &buffer, PyBUF_FORMAT | PyBUF_C_CONTIGUOUS) == 0) {
+            const char *code = buffer.format ? buffer.format : "B";
+            if (*code == '@') {
+                code++;
+            }
+            if (buffer.ndim == 1 && code[0] && !code[1] && strchr("bBhHiIlLqQnN?fd", code[0])) {
+                format = code[0];
+                return 0;
+            }
+            PyBuffer_Release(&buffer);
+        }
+        PyErr_Clear();
+
+        sequence = PySequence_Fast(object, "columns must be sequences");
+        return sequence ? 0 : -1;
+    }
+
+    Py_ssize_t length() {
+        return sequence ? PySequence_Fast_GET_SIZE(sequence) : buffer.shape[0];
+    }
+
+    RizinValue at(Py_ssize_t index) {
+        RizinValue value = {};
+        if (sequence) {
+            value.object = PySequence_Fast_GET_ITEM(sequence, index);
+            return value;
+        }
+
+        char *item = (char *)buffer.buf + index * buffer.itemsize;
+#define RIZIN_COLUMN_READ(CODE, C_TYPE, KIND, MEMBER) \
+        case CODE: { \
+            C_TYPE number; \
+            memcpy(&number, item, sizeof(number)); \
+            value.kind = KIND; \
+            value.MEMBER = number; \
+            break; \
+        }
+        switch (format) {
+            RIZIN_COLUMN_READ('b', signed char, 'i', i)
+            RIZIN_COLUMN_READ('B', unsigned char, 'u', u)
+            RIZIN_COLUMN_READ('h', short, 'i', i)
+            RIZIN_COLUMN_READ('H', unsigned short, 'u', u)
+            RIZIN_COLUMN_READ('i', int, 'i', i)
+            RIZIN_COLUMN_READ('I', unsigned int, 'u', u)
+            RIZIN_COLUMN_READ('l', long, 'i', i)
+            RIZIN_COLUMN_READ('L', unsigned long, 'u', u)
+            RIZIN_COLUMN_READ('q', long long, 'i', i)
+            RIZIN_COLUMN_READ('Q', unsigned long long, 'u', u)
+            RIZIN_COLUMN_READ('n', Py_ssize_t, 'i', i)
+            RIZIN_COLUMN_READ('N', size_t, 'u', u)
+            RIZIN_COLUMN_READ('?', bool, 'u', u)
+            RIZIN_COLUMN_READ('f', float, 'f', f)
+            RIZIN_COLUMN_READ('d', double, 'f', f)
+        }
+#undef RIZIN_COLUMN_READ
+        return value;
+    }
+};
+
+typedef void (*RizinElementAppend)(void *container, void *element);
+
+static bool rizin_columns_check(const RizinColumns *columns) {
+    if (!columns) {
+        PyErr_SetString(PyExc_TypeError, "Elements are not of a class with columns");
+    }
+    return columns;
+}
+
+// Append a new element to container for each row of columns
+// (a dict of field names to columns), setting the given fields
+SWIGUNUSED static PyObject *rizin_columns_extend(void *container, RizinElementAppend append,
+    const RizinColumns *fields, PyObject *columns) {
+    if (!rizin_columns_check(fields)) {
+        return NULL;
+    }
+    Py_ssize_t count = PyDict_Size(columns);
+    if (count < 0) {
+        return NULL;
+    }
+    std::vector<RizinColumnValues> values(count);
+    std::vector<const RizinColumn *> selected(count);
+
+    Py_ssize_t rows = 0;
+    Py_ssize_t position = 0;
+    PyObject *key, *column;
+    for (Py_ssize_t i = 0; PyDict_Next(columns, &position, &key, &column); i++) {
+        const RizinColumn *field = rizin_columns_find(fields, key);
+        if (!field) {
+            return NULL;
+        }
+        selected[i] = field;
+
+        if (values[i].init(column) < 0) {
+            return NULL;
+        }
+        if (i && values[i].length() != rows) {
+            PyErr_SetString(PyExc_ValueError, "columns must have the same length");
+            return NULL;
+        }
+        rows = values[i].length();
+    }
+
+    // Elements are only appended once all their fields are set,
+    // so that a failed row is freed instead of left half-set
+    for (Py_ssize_t row = 0; row < rows; row++) {
+        void *element = calloc(1, fields->size);
+        if (!element) {
+            return PyErr_NoMemory();
+        }
+        for (Py_ssize_t i = 0; i < count; i++) {
+            if (selected[i]->set(element, values[i].at(row)) < 0) {
+                for (const RizinColumn *field : selected) {
+                    field->clear(element);
+                }
+                free(element);
+                return NULL;
+            }
+        }
+        append(container, element);
+    }
+    Py_RETURN_NONE;
+}
+
+// Dict of the given fields (an iterable of names, or None for all)
+// of every element, each a list of strings, or a (format, bytearray)
+// tuple of numbers, to be wrapped by _rizin_columns
+SWIGUNUSED static PyObject *rizin_columns_get(RizinElements elements,
+    const RizinColumns *fields, PyObject *names) {
+    if (!rizin_columns_check(fields)) {
+        return NULL;
+    }
+    std::vector<const RizinColumn *> selected;
+    if (names == Py_None) {
+        for (const RizinColumn *field = fields->fields; field->name; field++) {
+            selected.push_back(field);
+        }
+    } else {
+        PyObject *sequence = PySequence_Fast(names, "fields must be an iterable of names");
+        if (!sequence) {
+            return NULL;
+        }
+        for (Py_ssize_t i = 0; i < PySequence_Fast_GET_SIZE(sequence); i++) {
+            const RizinColumn *field =
+                rizin_columns_find(fields, PySequence_Fast_GET_ITEM(sequence, i));
+            if (!field) {
+                Py_DECREF(sequence);
+                return NULL;
+            }
+            if (std::find(selected.begin(), selected.end(), field) == selected.end()) {
+                selected.push_back(field);
+            }
+        }
+        Py_DECREF(sequence);
+    }
+
+    PyObject *result = PyDict_New();
+    std::vector<char *> outs;
+    for (const RizinColumn *field : selected) {
+        PyObject *column = field->format
+            ? PyByteArray_FromStringAndSize(NULL, elements.length * field->itemsize)
+            : PyList_New(elements.length);
+        if (!result || !column || PyDict_SetItemString(result, field->name, column) < 0) {
+            Py_XDECREF(column);
+            Py_XDECREF(result);
+            return NULL;
+        }
+        Py_DECREF(column);
+        outs.push_back(field->format
+            ? PyByteArray_AS_STRING(column)
+            : (char *)((PyListObject *)column)->ob_item);
+    }
+
+    for (size_t row = 0; row < elements.length; row++) {
+        void *element = elements.step(&elements.cursor);
+        if (!element) {
+            PyErr_SetString(PyExc_ValueError, "Container holds a NULL element");
+            Py_DECREF(result);
+            return NULL;
+        }
+        for (size_t i = 0; i < selected.size(); i++) {
+            size_t itemsize = selected[i]->format ? selected[i]->itemsize : sizeof(PyObject *);
+            if (selected[i]->get(element, outs[i] + row * itemsize) < 0) {
+                Py_DECREF(result);
+                return NULL;
+            }
+        }
+    }
+
+    for (size_t i = 0; i < selected.size(); i++) {
+        if (selected[i]->format) {
+            PyObject *column = PyDict_GetItemString(result, selected[i]->name);
+            PyObject *tuple = Py_BuildValue("(sO)", selected[i]->format, column);
+            if (!tuple || PyDict_SetItemString(result, selected[i]->name, tuple) < 0) {
+                Py_XDECREF(tuple);
+                Py_DECREF(result);
+                return NULL;
+            }
+            Py_DECREF(tuple);
+        }
+    }
+    return result;
+}
+%}
+
+%pythoncode %{
+def _rizin_columns(columns):
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+    import array
+
+    for name, column in columns.items():
+        if isinstance(column, tuple):
+            typecode, data = column
+            if numpy:
+                columns[name] = numpy.frombuffer(data, dtype=typecode)
+            else:
+                # array does not support bools and chars
+                typecode = {"?": "B", "c": "b"}.get(typecode, typecode)
+                columns[name] = array.array(typecode, data)
+    return columns
+%}
@@ -0,0 +1,128 @@
+// Python iterator stepping through a container in C,
+// and bulk conversions of a container to Python lists
+%fragment("SWIG_FromCharPtr");
+%{
+typedef void *(*RizinElementStep)(void **cursor);
+typedef PyObject *(*RizinElementConvert)(void *data, swig_type_info *type);
+
+// The elements of a container, from the one at cursor
+struct RizinElements {
+    void *cursor;
+    size_t length;
+    RizinElementStep step; // Returns the element at cursor and advances it
+    RizinElementConvert convert;
+    swig_type_info *type;
+};
+
+struct RizinIterator {
+    PyObject_HEAD
+    RizinElements elements;
+};
+
+// Elements are wrapped the same way as a TYPE * return value
+template <typename T>
+static PyObject *rizin_element_convert(void *data, swig_type_info *type) {
+    return SWIG_NewPointerObj(data, type, 0);
+}
+
+template <>
+SWIGUNUSED PyObject *rizin_element_convert<char>(void *data, swig_type_info *type) {
+    return SWIG_FromCharPtr((const char *)data);
+}
+
+static PyObject *rizin_iterator_next(PyObject *self) {
+    RizinElements *elements = &((RizinIterator *)self)->elements;
+    if (!elements->length) {
+        return NULL; // StopIteration
+    }
+    elements->length--;
+    return elements->convert(elements->step(&elements->cursor), elements->type);
+}
+
+static void rizin_iterator_dealloc(PyObject *self) {
+    PyObject_Del(self);
+}
+
+SWIGUNUSED static PyObject *rizin_iterator_new(RizinElements elements) {
+    static PyTypeObject iterator_type = {PyVarObject_HEAD_INIT(NULL, 0)};
+    if (!iterator_type.tp_name) {
+        iterator_type.tp_name = "rizin.RizinIterator";
+        iterator_type.tp_basicsize = sizeof(RizinIterator);
+        iterator_type.tp_flags = Py_TPFLAGS_DEFAULT;
+        iterator_type.tp_dealloc = rizin_iterator_dealloc;
+        iterator_type.tp_iter = PyObject_SelfIter;
+        iterator_type.tp_iternext = rizin_iterator_next;
+        if (PyType_Ready(&iterator_type) < 0) {
+            iterator_type.tp_name = NULL;
+            return NULL;
+        }
+    }
+
+    RizinIterator *iterator = PyObject_New(RizinIterator, &iterator_type);
+    if (!iterator) {
+        return NULL;
+    }
+    iterator->elements = elements;
+    return (PyObject *)iterator;
+}
+
+// List of the elements at start, start + step, ... (as with a slice)
+static PyObject *rizin_elements_slice(
+    RizinElements elements, Py_ssize_t start, Py_ssize_t step, Py_ssize_t slicelength) {
+    PyObject *list = PyList_New(slicelength);
+    if (!list || !slicelength) {
+        return list;
+    }
+
+    // Elements can only be stepped through in order, so
+    // walk up to the furthest one, keeping those in the slice
+    Py_ssize_t last = step > 0 ? start + (slicelength - 1) * step : start;
+    for (Py_ssize_t i = 0; i <= last; i++) {
+        void *data = elements.step(&elements.cursor);
+        Py_ssize_t offset = i - start;
+        if (offset % step || offset / step < 0 || offset / step >= slicelength) {
+            continue;
+        }
+
+        PyObject *item = elements.convert(data, elements.type);
+        if (!item) {
+            Py_DECREF(list);
+            return NULL;
+        }
+        PyList_SET_ITEM(list, offset / step, item);
+    }
+    return list;
+}
+
+SWIGUNUSED static PyObject *rizin_elements_list(RizinElements elements) {
+    return rizin_elements_slice(elements, 0, 1, elements.length);
+}
+
+SWIGUNUSED static PyObject *rizin_elements_getitem(RizinElements elements, PyObject *key) {
+    Py_ssize_t length = elements.length;
+    if (PySlice_Check(key)) {
+        Py_ssize_t start, stop, step;
+        if (PySlice_Unpack(key, &start, &stop, &step) < 0) {
+            return NULL;
+        }
+        Py_ssize_t slicelength = PySlice_AdjustIndices(length, &start, &stop, step);
+        return rizin_elements_slice(elements, start, step, slicelength);
+    }
+
+    Py_ssize_t index = PyNumber_AsSsize_t(key, PyExc_IndexError);
+    if (index == -1 && PyErr_Occurred()) {
+        return NULL;
+    }
+    if (index < 0) {
+        index += length;
+    }
+    if (index < 0 || index >= length) {
+        PyErr_SetString(PyExc_IndexError, "index out of range");
+        return NULL;
+    }
+    for (; index > 0; index--) {
+        elements.step(&elements.cursor);
+    }
+    return elements.convert(elements.step(&elements.cursor), elements.type);
+}
+%}
@@ -4,8 +4,13 @@ def register_group(self, cmd, summary):
     help_desc.summary = summary
     self.rcmd.register_swig_command(cmd, None, None, help_desc)
 
+def unregister_command(self, cmd):
+    self.rcmd.unregister_swig_command(cmd)
+
 def register_command(self, cmd, fn):
     import inspect
+    # Defined in other modules when the bindings are split
+    from rizin import RzAnalysisFunction
     params = list(inspect.signature(fn).parameters.values())
 
     core_arg = None
@@ -13,6 +18,11 @@ def register_command(self, cmd, fn):
         core_arg = params[0].name
         params = params[1:]
 
+    # The arguments are converted in C, following the plan of the CmdFunction
+    function = CmdFunction(fn)
+    if core_arg:
+        function.set_core_arg(core_arg)
+
     desc_args = Array_RzCmdDescArg(len(params) + 1)
     desc_args.thisown = False
     for i, param in enumerate(params):
@@ -39,6 +49,7 @@ def register_command(self, cmd, fn):
                 f"Parameter {param.name} has unknown type {param.annotation}"
             )
 
+        function.add_arg(param.name, desc_arg.type)
         desc_arg.thisown = False
         desc_args[i] = desc_arg
 
@@ -50,40 +61,5 @@ def register_command(self, cmd, fn):
     help_desc.thisown = False
     help_desc.args = desc_args.cast()
 
-    class wrapper(CmdDirector):
-        def run(self, core, argc, argv):
-            try:
-                args = {}
-                args_array = Array_String.frompointer(argv)
-                if core_arg:
-                    args[core_arg] = core
-                for i, param in enumerate(params):
-                    orig_arg = args_array[i + 1]
-                    arg = orig_arg
-                    if param.annotation == RzNumArg:
-                        if not core.num.is_valid_input(arg):
-                            raise ValueError(f"Could not convert '{orig_arg}' to RzNum value")
-
-                        arg = core.num.math(arg)
-                    elif param.annotation == int:
-                        try:
-                            arg = int(arg)
-                        except ValueError:
-                            raise ValueError(f"Could not convert '{orig_arg}' to int") from e
-                    elif param.annotation == RzFlagItem:
-                        arg = core.flags.get(arg)
-                        if arg is None:
-                            raise ValueError(f"Could not find a flag named '{orig_arg}'")
-                    elif param.annotation == RzAnalysisFunction:
-                        arg = core.analysis.get_function_byname(arg)
-                        if arg is None:
-                            raise ValueError(f"Could not find a function named '{orig_arg}'")
-                    args[param.name] = arg
-                return fn(**args)
-            except Exception as e:
-                print(e)
-                return False
-
-    director = wrapper()
-    director.__disown__()
-    self.rcmd.register_swig_command(cmd, director, help_desc)
+    function.thisown = False
+    self.rcmd.register_swig_command(cmd, function, help_desc)
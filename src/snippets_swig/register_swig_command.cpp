@@ -22,9 +22,8 @@ void register_swig_command(const char *str, CmdDirector *director,
         }
 
         RzCmdDesc *prev = (RzCmdDesc *)ht_sp_find($self->ht_cmds, str, NULL);
-        std::string cmd(str);
         if (prev) { // Update existing RzCmdDesc
-                auto it = SWIGCmds.find(cmd);
+                auto it = SWIGCmds.find(str);
                 if (it == SWIGCmds.end()) {
                         throw "Builtin command already bound";
                 }
@@ -66,6 +65,36 @@ void register_swig_command(const char *str, CmdDirector *director,
                         throw "Could not create binding";
                 }
 
-                SWIGCmds[cmd] = std::make_pair(result, director);
+                auto it = SWIGCmds.find(result->name);
+                if (it != SWIGCmds.end()) { // Left by a freed RzCmd
+                        delete it->second.second;
+                        it->second = std::make_pair(result, director);
+                } else {
+                        SWIGCmds.emplace(strdup(result->name),
+                                         std::make_pair(result, director));
+                }
+        }
+}
+
+void unregister_swig_command(const char *str) {
+        auto it = SWIGCmds.find(str);
+        if (it == SWIGCmds.end()) {
+                throw "Not a SWIG command";
         }
+
+        // Rizin also removes the children of a group
+        RzCmdDesc *desc = it->second.first;
+        for (it = SWIGCmds.begin(); it != SWIGCmds.end();) {
+                if (rz_swig_cmd_desc_is_in(it->second.first, desc)) {
+                        rz_swig_cmd_desc_help_free(it->second.first->help);
+                        delete it->second.second;
+                        const char *name = it->first;
+                        it = SWIGCmds.erase(it);
+                        free((char *)name);
+                } else {
+                        ++it;
+                }
+        }
+
+        rz_cmd_desc_remove($self, desc);
 }
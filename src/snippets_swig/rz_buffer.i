@@ -0,0 +1,59 @@
+// Read-only memoryview of the bytes of a buffer, which is not copied
+// for buffers over memory (eg. bytes or mmap buffers). Other buffers
+// are read in chunks, instead of into a copy owned by the buffer
+PyObject *_memoryview(PyObject *owner) {
+    if ($self->methods->get_whole_buf) {
+        ut64 size;
+        const ut8 *data = rz_buf_data($self, &size);
+        if (data) {
+            return rizin_buffer_memoryview(owner, (void *)data, size, "B", 1, true);
+        }
+    }
+
+    const ut64 chunk_size = 1 << 20;
+    ut64 size = rz_buf_size($self);
+    PyObject *bytes = PyBytes_FromStringAndSize(NULL, size);
+    if (!bytes) {
+        return NULL;
+    }
+    ut8 *data = (ut8 *)PyBytes_AS_STRING(bytes);
+    for (ut64 offset = 0; offset < size; offset += chunk_size) {
+        ut64 len = size - offset < chunk_size ? size - offset : chunk_size;
+        if (rz_buf_read_at($self, offset, data + offset, len) != (st64)len) {
+            Py_DECREF(bytes);
+            PyErr_SetString(PyExc_OSError, "Could not read RzBuffer");
+            return NULL;
+        }
+    }
+
+    PyObject *view = PyMemoryView_FromObject(bytes);
+    Py_DECREF(bytes);
+    return view;
+}
+
+// Read into a writable Python buffer, returning the number of bytes read
+PyObject *_readinto(unsigned long long offset, PyObject *target) {
+    Py_buffer view;
+    if (PyObject_GetBuffer(target, &view, PyBUF_WRITABLE) < 0) {
+        return NULL;
+    }
+    st64 read = rz_buf_read_at($self, offset, (ut8 *)view.buf, view.len);
+    PyBuffer_Release(&view);
+    if (read < 0) {
+        PyErr_SetString(PyExc_OSError, "Could not read RzBuffer");
+        return NULL;
+    }
+    return PyLong_FromLongLong(read);
+}
+
+unsigned long long _size() {
+    return rz_buf_size($self);
+}
+
+%pythoncode %{
+    def memoryview(self):
+        return self._memoryview(self)
+
+    def file(self):
+        return RzBufferFile(self)
+%}
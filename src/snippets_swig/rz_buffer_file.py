@@ -0,0 +1,46 @@
+import io
+
+
+class RzBufferFile(io.RawIOBase):
+    """
+    Read-only file over an RzBuffer, with its own position
+    """
+
+    def __init__(self, buf):
+        super().__init__()
+        self.buf = buf
+        self.pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def size(self):
+        return self.buf._size()
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.pos
+        elif whence == io.SEEK_END:
+            offset += self.size()
+        elif whence != io.SEEK_SET:
+            raise ValueError(f"invalid whence ({whence})")
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self.pos = offset
+        return offset
+
+    def readinto(self, b):
+        read = self.buf._readinto(self.pos, b)
+        self.pos += read
+        return read
+
+    def readall(self):
+        data = bytes(self.buf.memoryview()[self.pos :])
+        self.pos += len(data)
+        return data
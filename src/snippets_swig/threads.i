@@ -0,0 +1,17 @@
+// GIL handling for C code called from, and calling into, Python
+%{
+// Holds the GIL while in scope, for C functions called by Rizin,
+// possibly from a thread other than the one which released it
+struct RizinGILState {
+    PyGILState_STATE state;
+    RizinGILState() : state(PyGILState_Ensure()) {}
+    ~RizinGILState() { PyGILState_Release(state); }
+};
+
+// Releases the GIL while in scope, for long-running calls into Rizin
+struct RizinAllowThreads {
+    PyThreadState *state;
+    RizinAllowThreads() : state(PyEval_SaveThread()) {}
+    ~RizinAllowThreads() { PyEval_RestoreThread(state); }
+};
+%}
@@ -3,8 +3,9 @@ SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
 SPDX-License-Identifier: LGPL-3.0-only
 """
 
-from typing import Iterator, TextIO
+from typing import Iterable, Iterator, TextIO, OrderedDict
 
+import io
 import os
 from contextlib import contextmanager
 
@@ -17,11 +18,13 @@ class Writer:
     output: TextIO
     indent_level: int
     indent_amount: int
+    sections: OrderedDict[str, str]
 
     def __init__(self, output: TextIO, *, indent_amount: int = 4):
         self.output = output
         self.indent_level = 0
         self.indent_amount = indent_amount
+        self.sections = OrderedDict()
 
     def line(self, *lines: str) -> None:
         """
@@ -42,6 +45,23 @@ class Writer:
         yield
         self.indent_level -= 1
 
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        """
+        Record the text written for the duration of context
+        in sections, under the given name
+        """
+        assert name not in self.sections, f"Duplicate section {name}"
+        output = self.output
+        self.output = io.StringIO()
+        try:
+            yield
+        finally:
+            text = self.output.getvalue()
+            self.output = output
+        self.output.write(text)
+        self.sections[name] = text
+
     def snippet(self, path: str) -> None:
         """
         Write a snippet file at current indentation
@@ -52,3 +72,43 @@ class Writer:
         filename = os.path.join(os.path.dirname(__file__), *path_segments)
         with open(filename, encoding="utf-8") as snippet:
             self.line(*snippet.read().splitlines())
+
+
+def write_if_changed(path: str, content: str) -> bool:
+    """
+    Write content to a file, unless the file already has that exact
+    content, in which case it is left untouched (keeping its mtime)
+
+    Returns whether the file was written
+    """
+    data = content.encode("utf-8")
+    try:
+        with open(path, "rb") as file:
+            if file.read() == data:
+                return False
+    except OSError:
+        pass
+
+    # Replace atomically, so an interrupted run never
+    # leaves a truncated file with a fresh mtime
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def write_depfile(path: str, target: str, dependencies: Iterable[str]) -> None:
+    """
+    Write a Makefile-style dependency file (as read by ninja)
+    listing the files target was generated from
+    """
+
+    def escape(filename: str) -> str:
+        return filename.replace("$", "$$").replace("#", "\\#").replace(" ", "\\ ")
+
+    with open(path, "w", encoding="utf-8") as output:
+        output.write(f"{escape(target)}:")
+        for dependency in sorted(dependencies):
+            output.write(f" \\\n  {escape(dependency)}")
+        output.write("\n")
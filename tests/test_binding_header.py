@@ -0,0 +1,117 @@
+"""
+SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+SPDX-License-Identifier: LGPL-3.0-only
+
+Tests for src/binding_header.py, on a small Rizin-like include directory
+
+The libclang directory is read from the CLANG_PATH environment variable,
+or found in the libclang Python package
+"""
+
+from typing import Dict, List
+
+import os
+import sys
+import importlib.util
+
+import pytest
+from clang.cindex import Config
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+
+# Not through sys.path, where the stubs in src/clang would shadow libclang
+for module_name in ["cparser_cache", "cparser_types", "cparser_header"]:
+    SPEC = importlib.util.spec_from_file_location(
+        module_name, os.path.join(SRC, f"{module_name}.py")
+    )
+    assert SPEC and SPEC.loader
+    module = importlib.util.module_from_spec(SPEC)
+    sys.modules[module_name] = module  # For the imports of the next ones
+    SPEC.loader.exec_module(module)
+
+SPEC = importlib.util.spec_from_file_location(
+    "binding_header", os.path.join(SRC, "binding_header.py")
+)
+assert SPEC and SPEC.loader
+binding_header = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(binding_header)
+cparser_header = sys.modules["cparser_header"]
+
+# Included once by each ht_*.h header, with its own HT_ macro
+HT_INC = """
+int HT_(insert)(int key);
+int HT_(find)(int key);
+#undef HT_
+"""
+
+HT_HEADER = """
+#define HT_(name) ht_{kind}_##name
+#include "ht_inc.h"
+int ht_{kind}_size(void);
+"""
+
+HEADER = """
+int rz_a_get(void);
+"""
+
+
+def load_clang() -> None:
+    """
+    Load libclang, or skip the test if it is not found
+    """
+    if Config.loaded:
+        return
+
+    path = os.environ.get("CLANG_PATH")
+    if not path:
+        spec = importlib.util.find_spec("clang")
+        if not spec or not spec.origin:
+            pytest.skip("libclang not found, set CLANG_PATH")
+        path = os.path.join(os.path.dirname(spec.origin), "native")
+    if not os.path.isdir(path):
+        pytest.skip("libclang not found, set CLANG_PATH")
+    Config.set_library_path(path)
+
+
+def parse(parse_mode: str) -> Dict[str, List[str]]:
+    """
+    Parse the registered headers, and get their functions by header name
+    """
+    cparser_header.headers.clear()
+    binding_header.run(parse_mode)
+    return {header.name: list(header.cfuncs) for header in cparser_header.headers}
+
+
+def test_umbrella_ht_headers(
+    tmp_path: "os.PathLike[str]", monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Each ht_*.h header gets the declarations of its own expansion
+    of ht_inc.h, when parsed along with other ht_*.h headers
+    """
+    load_clang()
+    root = os.fspath(tmp_path)
+    files = {
+        "ht_inc.h": HT_INC,
+        "ht_pp.h": HT_HEADER.format(kind="pp"),
+        "ht_up.h": HT_HEADER.format(kind="up"),
+        "rz_a.h": HEADER,
+    }
+    for filename, source in files.items():
+        with open(os.path.join(root, filename), "w", encoding="utf-8") as file:
+            file.write(source)
+
+    monkeypatch.setattr(cparser_header, "rizin_include_path", root)
+    monkeypatch.setattr(
+        binding_header, "threaded_headers", type(binding_header.threaded_headers)()
+    )
+    for name in ["ht_pp.h", "rz_a.h", "ht_up.h"]:
+        binding_header.threaded_header(name, module="util")(lambda header: None)
+
+    cfuncs = parse("umbrella")
+    assert cfuncs == {
+        "ht_pp.h": ["ht_pp_insert", "ht_pp_find", "ht_pp_size"],
+        "rz_a.h": ["rz_a_get"],
+        "ht_up.h": ["ht_up_insert", "ht_up_find", "ht_up_size"],
+    }
+    assert parse("threads") == cfuncs
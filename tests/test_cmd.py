@@ -0,0 +1,62 @@
+"""
+SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+SPDX-License-Identifier: LGPL-3.0-only
+
+Tests for the commands registered from Python (see src/snippets_swig/cmd_director.i),
+run on the bindings of the stub Rizin, built with -Dbenchmarks=true
+
+The build directory must be on PYTHONPATH
+"""
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+# Run in a child process, with freed memory overwritten by glibc
+FREED_CORE = """
+import sys
+import rizin
+
+def command() -> bool:
+    return True
+
+refs = sys.getrefcount(command)
+core = rizin.RzCore()
+core.register_command("x", command)
+del core  # Without unregistering x
+
+# Takes the memory of the freed RzCore, so that it is not reused as is
+other = rizin.RzCore()
+other.register_command("y", lambda: True)
+
+core = rizin.RzCore()
+core.register_command("x", command)
+assert core.cmd_repeat("x", 1) == rizin.RZ_CMD_STATUS_OK
+core.unregister_command("x")
+assert core.cmd_repeat("x", 1) == rizin.RZ_CMD_STATUS_INVALID
+
+# The director of the freed RzCore was deleted as well
+assert sys.getrefcount(command) == refs
+"""
+
+
+def test_command_of_freed_core() -> None:
+    """
+    A command can be registered again once the RzCore it was
+    registered to was freed without unregistering it, which
+    deletes the director left by the freed RzCore
+    """
+    rizin = pytest.importorskip("rizin")
+    if not hasattr(rizin, "RzBench"):
+        pytest.skip("bindings not built with -Dbenchmarks=true")
+
+    result = subprocess.run(
+        [sys.executable, "-c", FREED_CORE],
+        env={**os.environ, "MALLOC_PERTURB_": "165"},
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,30 @@
+"""
+SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+SPDX-License-Identifier: LGPL-3.0-only
+
+Tests for the column methods of generics (see src/snippets_swig/native_columns.i),
+run on the bindings of the stub Rizin, built with -Dbenchmarks=true
+
+The build directory must be on PYTHONPATH
+"""
+
+import pytest
+
+
+def test_extend_columns_failed_row() -> None:
+    """
+    A row with a field which fails to convert is not appended
+    """
+    rizin = pytest.importorskip("rizin")
+    if not hasattr(rizin, "RzList_RzBenchItem"):
+        pytest.skip("bindings not built with -Dbenchmarks=true")
+
+    items = rizin.RzList_RzBenchItem()
+    items.extend_columns(addr=[1], name=["a"])
+
+    with pytest.raises(OverflowError):
+        items.extend_columns(name=["b", "c"], addr=[2, -1])
+
+    columns = items.to_columns()
+    assert columns["name"] == ["a", "b"]
+    assert list(columns["addr"]) == [1, 2]
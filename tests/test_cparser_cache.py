@@ -0,0 +1,54 @@
+"""
+SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+SPDX-License-Identifier: LGPL-3.0-only
+
+Tests for src/cparser_cache.py
+"""
+
+from typing import Dict
+
+import os
+import json
+import importlib.util
+
+# Not through sys.path, where the stubs in src/clang would shadow libclang
+SPEC = importlib.util.spec_from_file_location(
+    "cparser_cache",
+    os.path.join(os.path.dirname(__file__), "..", "src", "cparser_cache.py"),
+)
+assert SPEC and SPEC.loader
+cparser_cache = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(cparser_cache)
+
+
+def test_touched_dependency_refreshed(tmp_path: str) -> None:
+    """
+    A touched but unchanged dependency is still valid, and its new mtime
+    is written to the manifest so that it is not hashed again
+    """
+    header = os.path.join(tmp_path, "a.h")
+    with open(header, "w", encoding="utf-8") as file:
+        file.write("int a;\n")
+    mtime = os.stat(header).st_mtime_ns
+    dependencies: Dict[str, cparser_cache.Dependency] = {
+        header: {"mtime": mtime, "sha256": cparser_cache.hash_file(header)}
+    }
+
+    manifest_path = os.path.join(tmp_path, "manifest.json")
+    cparser_cache.write_json(manifest_path, dependencies)
+
+    os.utime(header, ns=(mtime + 10**9, mtime + 10**9))
+    assert cparser_cache.dependencies_valid(dependencies)
+    assert dependencies[header]["mtime"] == mtime
+
+    mtimes = cparser_cache.touched_dependencies(dependencies)
+    assert mtimes == {header: mtime + 10**9}
+    cparser_cache.refresh_manifest(manifest_path, dependencies, dependencies, mtimes)
+    with open(manifest_path, encoding="utf-8") as file:
+        assert json.load(file)[header]["mtime"] == mtime + 10**9
+    assert cparser_cache.touched_dependencies(dependencies) == {}
+
+    with open(header, "w", encoding="utf-8") as file:
+        file.write("int b;\n")
+    assert cparser_cache.touched_dependencies(dependencies) is None
+    assert not cparser_cache.dependencies_valid(dependencies)
@@ -0,0 +1,79 @@
+"""
+SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+SPDX-License-Identifier: LGPL-3.0-only
+
+Tests for src/cparser_types.py
+
+The libclang directory is read from the CLANG_PATH environment variable,
+or found in the libclang Python package
+"""
+
+import os
+import sys
+import importlib.util
+
+import pytest
+from clang.cindex import Config, Cursor, TranslationUnit
+
+# Not through sys.path, where the stubs in src/clang would shadow libclang
+SPEC = importlib.util.spec_from_file_location(
+    "cparser_types",
+    os.path.join(os.path.dirname(__file__), "..", "src", "cparser_types.py"),
+)
+assert SPEC and SPEC.loader
+cparser_types = importlib.util.module_from_spec(SPEC)
+sys.modules["cparser_types"] = cparser_types  # For its dataclasses
+SPEC.loader.exec_module(cparser_types)
+
+SOURCE = """
+struct a { int a1; int a2; };
+struct b { char b1; };
+int f(int x, int y);
+"""
+
+
+def parse() -> TranslationUnit:
+    """
+    Parse SOURCE, or skip the test if libclang is not found
+    """
+    if not Config.loaded:
+        path = os.environ.get("CLANG_PATH")
+        if not path:
+            spec = importlib.util.find_spec("clang")
+            if not spec or not spec.origin:
+                pytest.skip("libclang not found, set CLANG_PATH")
+            path = os.path.join(os.path.dirname(spec.origin), "native")
+        if not os.path.isdir(path):
+            pytest.skip("libclang not found, set CLANG_PATH")
+        Config.set_library_path(path)
+
+    return TranslationUnit.from_source("x.c", unsaved_files=[("x.c", SOURCE)])
+
+
+def test_colliding_cursor_hashes(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Cursors with the same hash keep their own children
+    """
+    translation_unit = parse()
+    monkeypatch.setattr(Cursor, "hash", property(lambda cursor: 0))
+
+    index = cparser_types.CursorIndex(translation_unit, lambda file_name: True)
+    children = {
+        cursor.spelling: [child.spelling for child in index.get_children(cursor)]
+        for cursor, _ in index.top_level
+    }
+    assert children == {"a": ["a1", "a2"], "b": ["b1"], "f": ["x", "y"]}
+
+
+def test_colliding_cursor_map(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Cursors with the same hash keep their own values
+    """
+    translation_unit = parse()
+    monkeypatch.setattr(Cursor, "hash", property(lambda cursor: 0))
+
+    cursors = list(translation_unit.cursor.get_children())
+    structs: "cparser_types.CursorMap[str]" = cparser_types.CursorMap()
+    for cursor in cursors[:2]:
+        structs.set(cursor, cursor.spelling)
+    assert [structs.get(cursor) for cursor in cursors] == ["a", "b", None]
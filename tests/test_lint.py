@@ -0,0 +1,152 @@
+"""
+SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+SPDX-License-Identifier: LGPL-3.0-only
+
+Tests for src/lint.py, run on a small Rizin-like source tree
+
+The libclang directory is read from the CLANG_PATH environment variable,
+or found in the libclang Python package
+"""
+
+from typing import List
+
+import os
+import sys
+import json
+import subprocess
+import importlib.util
+
+import pytest
+
+LINT = os.path.join(os.path.dirname(__file__), "..", "src", "lint.py")
+
+HEADER = """
+#define RZ_API __attribute__((visibility("default")))
+#define RZ_OWN __attribute__((annotate("RZ_OWN")))
+typedef struct rz_list_t { int x; } RzList;
+RZ_API RZ_OWN RzList /*<char *>*/ *rz_x_list(void);
+RZ_API RzList *rz_x_nocomment(void);
+"""
+
+
+def clang_path() -> str:
+    """
+    Get the directory of libclang, or skip the test
+    """
+    path = os.environ.get("CLANG_PATH")
+    if path:
+        return path
+
+    spec = importlib.util.find_spec("clang")
+    if not spec or not spec.origin:
+        pytest.skip("libclang not found, set CLANG_PATH")
+
+    path = os.path.join(os.path.dirname(spec.origin), "native")
+    if not os.path.isdir(path):
+        pytest.skip("libclang not found, set CLANG_PATH")
+    return path
+
+
+def write_tree(rizin_path: str, sources: List[str]) -> None:
+    """
+    Write librz/include/rz_x.h, a source file including it for each
+    of sources, and a compile_commands.json listing those files
+    """
+    os.makedirs(os.path.join(rizin_path, "librz", "include"), exist_ok=True)
+    os.makedirs(os.path.join(rizin_path, "librz", "util"), exist_ok=True)
+    os.makedirs(os.path.join(rizin_path, "build"), exist_ok=True)
+
+    with open(
+        os.path.join(rizin_path, "librz", "include", "rz_x.h"), "w", encoding="utf-8"
+    ) as file:
+        file.write(HEADER)
+
+    commands = []
+    for source in sources:
+        with open(
+            os.path.join(rizin_path, "librz", "util", source), "w", encoding="utf-8"
+        ) as file:
+            file.write(f"#include <rz_x.h>\nRZ_API int rz_x_{source[0]}(void);\n")
+        commands.append(
+            {
+                "directory": os.path.join(rizin_path, "build"),
+                "file": f"../librz/util/{source}",
+                "command": f"cc -I../librz/include -DX=1 -c ../librz/util/{source}",
+            }
+        )
+
+    with open(
+        os.path.join(rizin_path, "build", "compile_commands.json"),
+        "w",
+        encoding="utf-8",
+    ) as file:
+        json.dump(commands, file)
+
+
+def lint(rizin_path: str, *args: str) -> "subprocess.CompletedProcess[str]":
+    """
+    Run lint.py on rizin_path
+    """
+    return subprocess.run(
+        [
+            sys.executable,
+            LINT,
+            "--clang-path",
+            clang_path(),
+            "--clang-args=",
+            "--rizin-path",
+            rizin_path,
+            *args,
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+
+def test_cached_removed_translation_unit(tmp_path: "os.PathLike[str]") -> None:
+    """
+    The header is checked with a.c, so b.c's cached result skips it. Once
+    a.c is removed, b.c must be linted again rather than reusing its result
+    """
+    rizin_path = os.fspath(tmp_path)
+    cache_dir = os.path.join(rizin_path, "cache")
+
+    write_tree(rizin_path, ["a.c", "b.c"])
+    first = lint(rizin_path, "--cache-dir", cache_dir)
+    assert first.stderr == ""
+    assert "Missing type comment at <" in first.stdout
+
+    write_tree(rizin_path, ["b.c"])
+    for _ in range(2):
+        result = lint(rizin_path, "--cache-dir", cache_dir)
+        assert result.stderr == ""
+        assert result.stdout == first.stdout
+
+    # Without a cache, the output is the same
+    assert lint(rizin_path).stdout == first.stdout
+
+
+def test_cached_touched_header(tmp_path: "os.PathLike[str]") -> None:
+    """
+    A touched but unchanged header keeps the cached results, which
+    record its new mtime so that it is not hashed again
+    """
+    rizin_path = os.fspath(tmp_path)
+    cache_dir = os.path.join(rizin_path, "cache")
+
+    write_tree(rizin_path, ["a.c"])
+    first = lint(rizin_path, "--cache-dir", cache_dir)
+    assert first.stderr == ""
+
+    header = os.path.join(rizin_path, "librz", "include", "rz_x.h")
+    mtime = os.stat(header).st_mtime_ns + 10**9
+    os.utime(header, ns=(mtime, mtime))
+    result = lint(rizin_path, "--cache-dir", cache_dir)
+    assert result.stderr == ""
+    assert result.stdout == first.stdout
+
+    for name in os.listdir(cache_dir):
+        if name.endswith(".lint.json"):
+            with open(os.path.join(cache_dir, name), encoding="utf-8") as file:
+                assert json.load(file)["dependencies"][header]["mtime"] == mtime
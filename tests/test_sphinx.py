@@ -0,0 +1,129 @@
+"""
+SPDX-FileCopyrightText: 2022 wingdeans <wingdeans@protonmail.com>
+SPDX-License-Identifier: LGPL-3.0-only
+
+Tests for src/generator_sphinx.py, run through src/main.py
+on a small Rizin-like include directory
+
+The libclang directory is read from the CLANG_PATH environment variable,
+or found in the libclang Python package
+"""
+
+from typing import Dict
+
+import os
+import sys
+import subprocess
+import importlib.util
+
+import pytest
+
+MAIN = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "main.py"))
+
+HEADER = """
+#define RZ_API __attribute__((annotate("RZ_API")))
+typedef struct rz_{name}_t {{ int x; int y; }} Rz{Name};
+RZ_API int rz_{name}_get(Rz{Name} *{name});
+RZ_API void rz_{name}_set(Rz{Name} *{name}, int x);
+"""
+
+NAMES = ["alpha", "beta", "gamma", "delta"]
+
+BINDINGS = """
+from binding_header import threaded_header
+from binding_class import Class
+
+def bind(name):
+    @threaded_header(f"rz_{name}.h", module="util")
+    def bind_header(header):
+        cls = Class(header, typedef=f"Rz{name.capitalize()}")
+        cls.add_prefixed_methods(f"rz_{name}_")
+
+for name in %r:
+    bind(name)
+""" % (NAMES,)
+
+# Workers started with spawn import the main module again, which
+# is the default on Windows and macOS (see main.py's __main__ guard)
+SPAWN = f"""
+import sys, runpy, multiprocessing
+multiprocessing.set_start_method("spawn")
+sys.path.insert(0, sys.argv[1])
+sys.argv = sys.argv[1:]
+sys.argv[0] = {MAIN!r}
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+
+def clang_path() -> str:
+    """
+    Get the directory of libclang, or skip the test
+    """
+    path = os.environ.get("CLANG_PATH")
+    if path:
+        return path
+
+    spec = importlib.util.find_spec("clang")
+    if not spec or not spec.origin:
+        pytest.skip("libclang not found, set CLANG_PATH")
+
+    path = os.path.join(os.path.dirname(spec.origin), "native")
+    if not os.path.isdir(path):
+        pytest.skip("libclang not found, set CLANG_PATH")
+    return path
+
+
+def generate(root: str, output_dir: str, jobs: int) -> Dict[str, str]:
+    """
+    Generate the Sphinx pages of the classes in root with jobs
+    worker processes, and get their contents by file name
+    """
+    os.makedirs(output_dir)
+    args = [
+        "-o",
+        output_dir,
+        "--clang-path",
+        clang_path(),
+        "--clang-args=",
+        "--rizin-include-path",
+        os.path.join(root, "include"),
+        "--bindings",
+        os.path.join(root, "tree_bindings.py"),
+        "--targets",
+        "sphinx",
+        "--sphinx-jobs",
+        str(jobs),
+    ]
+    if jobs == 1:
+        command = [sys.executable, MAIN, *args]
+    else:
+        command = [sys.executable, "-c", SPAWN, os.path.dirname(MAIN), *args]
+    result = subprocess.run(command, capture_output=True, text=True, check=False)
+    assert result.returncode == 0, result.stderr
+
+    pages = {}
+    classes_dir = os.path.join(output_dir, "sphinx", "classes")
+    for filename in os.listdir(classes_dir):
+        with open(os.path.join(classes_dir, filename), encoding="utf-8") as file:
+            pages[filename] = file.read()
+    return pages
+
+
+def test_generate_classes_jobs(tmp_path: "os.PathLike[str]") -> None:
+    """
+    Class pages written by spawned worker processes are
+    the same as the ones written by the main process
+    """
+    root = os.fspath(tmp_path)
+    os.makedirs(os.path.join(root, "include"))
+    for name in NAMES:
+        path = os.path.join(root, "include", f"rz_{name}.h")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(HEADER.format(name=name, Name=name.capitalize()))
+    with open(os.path.join(root, "tree_bindings.py"), "w", encoding="utf-8") as file:
+        file.write(BINDINGS)
+
+    pages = generate(root, os.path.join(root, "jobs1"), 1)
+    assert sorted(pages) == [f"Rz{name.capitalize()}.rst" for name in sorted(NAMES)]
+    assert "set(x: int) -> None" in pages["RzAlpha.rst"]
+    assert generate(root, os.path.join(root, "jobs2"), 2) == pages